@@ -1,6 +1,9 @@
 import math
 
+from deeplodocus.data.transform.deterministic import deterministic
 
+
+@deterministic
 def dangle_to_cos_and_sin(angle: float):
     """
     AUTHORS:
@@ -28,6 +31,7 @@ def dangle_to_cos_and_sin(angle: float):
     return (math.cos(rad), math.sin(rad)), None
 
 
+@deterministic
 def rangle_to_cos_and_sin(angle: float):
     """
     AUTHORS:
@@ -1,4 +1,7 @@
+from deeplodocus.data.transform.deterministic import deterministic
 
+
+@deterministic
 def rect2xywh(rect, indices=(0, 1, 2, 3)):
     a, b, c, d = indices
     rect = rect.T
@@ -10,6 +13,7 @@ def rect2xywh(rect, indices=(0, 1, 2, 3)):
     return xywh.T, None
 
 
+@deterministic
 def normalize_boxes(box, image_shape, indices=(0, 1, 2, 3)):
     a, b, c, d = indices
     box = box.T
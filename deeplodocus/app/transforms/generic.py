@@ -3,7 +3,12 @@ from typing import Tuple
 from typing import Any
 from typing import Union
 
+from deeplodocus.data.transform.batched import batched
+from deeplodocus.data.transform.deterministic import deterministic
 
+
+@batched()
+@deterministic
 def scale(item: Any, multiply: Union[float, int]=1, divide: Union[float, int]=1) -> Tuple[Any, None]:
     """
     AUTHORS:
@@ -32,10 +37,13 @@ def scale(item: Any, multiply: Union[float, int]=1, divide: Union[float, int]=1)
     return item * multiply / divide, None
 
 
+@batched()
+@deterministic
 def bias(item, plus=0, minus=0):
     return item + plus - minus, None
 
 
+@deterministic
 def string2array(item, delimiter=",", cols=4, rows=50):
     output = np.zeros((rows, cols), dtype=np.float32)
     item = tuple(map(float, item.split(delimiter)))
@@ -45,6 +53,7 @@ def string2array(item, delimiter=",", cols=4, rows=50):
     return output, None
 
 
+@deterministic
 def reshape(item, shape):
     item = item.reshape(*shape)
     return item, None
@@ -1,7 +1,7 @@
-import random
 import numpy as np
 import cv2
 from typing import Union, List
+from typing import Optional
 from typing import Any
 from typing import Tuple
 from collections import OrderedDict
@@ -10,6 +10,8 @@ from collections import OrderedDict
 from deeplodocus.utils.notification import Notification
 from deeplodocus.flags.notif import *
 from deeplodocus.data.transform.transform_data import TransformData
+from deeplodocus.data.transform.batched import batched
+from deeplodocus.data.transform.deterministic import deterministic
 from deeplodocus.flags.lib import *
 """
 This file contains all the default transforms for images
@@ -21,7 +23,8 @@ def random_crop(
         crop_size=None,
         crop_ratio=None,
         scale=None,
-        resize=False
+        resize=False,
+        rng: Optional[np.random.RandomState] = None
 ) -> Tuple[np.array, TransformData]:
     """
     AUTHORS:
@@ -42,6 +45,7 @@ def random_crop(
     :param crop_ratio:
     :param scale:
     :param resize: (bool) Whether or not to resize the image to the original shape after cropping
+    :param rng: (Optional[np.random.RandomState]) The random generator of the item (the global random state if None)
 
     RETURN:
     -------
@@ -49,15 +53,17 @@ def random_crop(
     :return (np.array): The cropped image
     :return transform(dict): The parameters of the crop
     """
+    rng = np.random if rng is None else rng
+
     # Set the cropped image width and height (dx, dy)
     if crop_size is not None:
         # If crop_size is a list of lists, i.e. ((lower_bound, upper_bound), (lower_bound, upper_bound))
         if any(isinstance(item, list) or isinstance(item, tuple) for item in crop_size):
             # Define a random crop_size between the given bounds
-            crop_size = {
-                np.random.randint(*crop_size[0]),
-                np.random.randint(*crop_size[1])
-            }
+            crop_size = (
+                rng.randint(*crop_size[0]),
+                rng.randint(*crop_size[1])
+            )
         # Calculate the height and width of the cropped patch
         dx = crop_size[0]
         dy = crop_size[1]
@@ -66,8 +72,8 @@ def random_crop(
         if any(isinstance(item, list) or isinstance(item, tuple) for item in crop_ratio):
             # Define a random crop_ratio between the given bounds
             crop_ratio = (
-                image.shape[1] / np.random.randint(*crop_size[0]),
-                image.shape[0] / np.random.randint(*crop_size[1])
+                image.shape[1] / rng.randint(*crop_size[0]),
+                image.shape[0] / rng.randint(*crop_size[1])
             )
         # Calculate the height and width of the cropped patch
         dx = int(image.shape[1] / crop_ratio[0])
@@ -77,7 +83,7 @@ def random_crop(
             Notification(DEEP_NOTIF_FATAL, " : random_crop : scale must be less than 1")
         if isinstance(scale, list) or isinstance(scale, tuple):
             # Define a random scale between the given bounds
-            scale = np.random.random() * (scale[1] - scale[0]) + scale[0]
+            scale = rng.random_sample() * (scale[1] - scale[0]) + scale[0]
         # Calculate the height and width of the cropped patch
         dx = int(image.shape[1] * scale)
         dy = int(image.shape[0] * scale)
@@ -86,8 +92,8 @@ def random_crop(
         dx, dy = image.shape[0:2]
 
     # Define the coordinates of the crop
-    x0 = np.random.randint(0, image.shape[1] - dx)
-    y0 = np.random.randint(0, image.shape[0] - dy)
+    x0 = rng.randint(0, image.shape[1] - dx)
+    y0 = rng.randint(0, image.shape[0] - dy)
     x1 = x0 + dx
     y1 = y0 + dy
 
@@ -107,6 +113,7 @@ def random_crop(
     return cropped_image, transform
 
 
+@deterministic
 def crop(image: np.array, coords: Union[List, Tuple], resize: bool = False) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -141,7 +148,7 @@ def crop(image: np.array, coords: Union[List, Tuple], resize: bool = False) -> T
         return image[y0: y1, x0: x1, ...], None
 
 
-def random_blur(image: np.array, kernel_size_min: int, kernel_size_max: int) -> Tuple[Any, TransformData]:
+def random_blur(image: np.array, kernel_size_min: int, kernel_size_max: int, rng: Optional[np.random.RandomState] = None) -> Tuple[Any, TransformData]:
     """
     AUTHORS:
     --------
@@ -160,6 +167,7 @@ def random_blur(image: np.array, kernel_size_min: int, kernel_size_max: int) ->
     :param image: np.array: The image to transform
     :param kernel_size_min: int: Min size of the kernel
     :param kernel_size_max: int: Max size of the kernel
+    :param rng: Optional[np.random.RandomState]: The random generator of the item (the global random state if None)
 
 
     RETURN:
@@ -168,8 +176,10 @@ def random_blur(image: np.array, kernel_size_min: int, kernel_size_max: int) ->
     :return: The blurred image
     :return: The last transform data
     """
+    rng = np.random if rng is None else rng
+
     # Compute kernel size
-    kernel_size = (random.randint(kernel_size_min // 2, kernel_size_max // 2)) * 2 + 1
+    kernel_size = (rng.randint(kernel_size_min // 2, kernel_size_max // 2 + 1)) * 2 + 1
 
     # Blur the image
     image, _ = blur(image, kernel_size)
@@ -187,6 +197,7 @@ def random_blur(image: np.array, kernel_size_min: int, kernel_size_max: int) ->
     return image, transform
 
 
+@deterministic
 def blur(image: np.array, kernel_size: int) -> Tuple[Any, None]:
     """
     AUTHORS:
@@ -214,6 +225,33 @@ def blur(image: np.array, kernel_size: int) -> Tuple[Any, None]:
     return cv2.blur(image, (int(kernel_size), int(kernel_size))), None
 
 
+def adjust_gamma_batch(images: np.array, gamma) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Modify the gamma of a batch of images (see adjust_gamma)
+
+    PARAMETERS:
+    -----------
+
+    :param images: np.array: The images to transform (N x H x W x C)
+    :param gamma: float: Gamma value
+
+    RETURN:
+    -------
+
+    :return: The transformed images
+    :return: None
+    """
+    inv_gamma = 1.0 / gamma
+    table = np.array([((i / 255.0) ** inv_gamma) * 255
+                      for i in np.arange(0, 256)]).astype("uint8")
+    return table[images], None
+
+
+@batched(adjust_gamma_batch)
+@deterministic
 def adjust_gamma(image, gamma) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -244,6 +282,7 @@ def adjust_gamma(image, gamma) -> Tuple[np.array, None]:
     return cv2.LUT(image, table), None
 
 
+@deterministic
 def resize(image: np.array, shape, keep_aspect: bool = False, padding: int = 0, method=None) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -304,6 +343,7 @@ def resize(image: np.array, shape, keep_aspect: bool = False, padding: int = 0,
     return image, None
 
 
+@deterministic
 def pad(image, shape, value: int = 0) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -346,6 +386,35 @@ def pad(image, shape, value: int = 0) -> Tuple[np.array, None]:
     return padded, None
 
 
+def channel_shift_batch(images: np.array, shift) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Shift the channels of a batch of images (see channel_shift)
+
+    PARAMETERS:
+    -----------
+
+    :param images (np.array): The input images (N x H x W x C)
+    :param shift: The intensity of the shift of each channel (or of each channel of each image, N x C)
+
+    RETURN:
+    -------
+
+    :return images(np.array): The images with the shifted channels
+    :return: None
+    """
+    shift = np.asarray(shift)
+    shift = shift[:, None, None, :images.shape[3]] if shift.ndim == 2 else shift[:images.shape[3]]
+
+    # Shift in a wider data type and saturate the channels, so that the values do not wrap around
+    dtype = np.promote_types(np.promote_types(images.dtype, np.int16), shift.dtype)
+    return np.clip(images.astype(dtype) + shift, 0, 255).astype(images.dtype), None
+
+
+@batched(channel_shift_batch)
+@deterministic
 def channel_shift(image: np.array, shift: int)-> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -372,17 +441,38 @@ def channel_shift(image: np.array, shift: int)-> Tuple[np.array, None]:
     :return: None
     """
 
-    # Shift the channel of X intensity
-    for ch in range(image.shape[2]):
-        image[:, :, ch] += shift[ch]
+    # Shift the channel of X intensity in a wider data type and saturate the channels, so that the values do not wrap around
+    shift = np.asarray(shift)[:image.shape[2]]
+    dtype = np.promote_types(np.promote_types(image.dtype, np.int16), shift.dtype)
+    return np.clip(image.astype(dtype) + shift, 0, 255).astype(image.dtype), None
 
-    # Saturate channels too large
-    image[image < 0] = 0
-    image[image > 255] = 255
-    return image, None
 
+def random_channel_shift_batch(images: np.array, shift: int, rng: List[np.random.RandomState]) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Shift the channels of each image of a batch of a random value (see random_channel_shift)
+
+    PARAMETERS:
+    -----------
+
+    :param images (np.array): The input images (N x H x W x C)
+    :param shift (int): The index
+    :param rng (List[np.random.RandomState]): The random generator of each image
+
+    RETURN:
+    -------
 
-def random_channel_shift(image: np.array, shift: int) ->Tuple[np.array, TransformData]:
+    :return images(np.array): The images with the channels shifted
+    :return: None
+    """
+    shifts = np.stack([r.randint(-shift, shift, images.shape[3]) for r in rng])
+    return channel_shift_batch(images, shifts)
+
+
+@batched(random_channel_shift_batch)
+def random_channel_shift(image: np.array, shift: int, rng: Optional[np.random.RandomState] = None) ->Tuple[np.array, TransformData]:
     """
     AUTHORS:
     --------
@@ -400,6 +490,7 @@ def random_channel_shift(image: np.array, shift: int) ->Tuple[np.array, Transfor
 
     :param image:
     :param shift (int): The index
+    :param rng (Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
 
     RETURN:
     -------
@@ -408,7 +499,8 @@ def random_channel_shift(image: np.array, shift: int) ->Tuple[np.array, Transfor
     :return transform (TransformData): The parameters of the random shift
     """
     # Get the shifting value
-    shift = np.random.randint(-shift, shift, image.shape[2])
+    rng = np.random if rng is None else rng
+    shift = rng.randint(-shift, shift, image.shape[2])
 
     # Shift the channel
     image, _ = channel_shift(image, shift)
@@ -426,7 +518,7 @@ def random_channel_shift(image: np.array, shift: int) ->Tuple[np.array, Transfor
     return image, transform
 
 
-def random_rotate(image: np.array) ->Tuple[np.array, TransformData]:
+def random_rotate(image: np.array, rng: Optional[np.random.RandomState] = None) ->Tuple[np.array, TransformData]:
     """
     AUTHORS:
     --------
@@ -442,7 +534,7 @@ def random_rotate(image: np.array) ->Tuple[np.array, TransformData]:
     -----------
 
     :param image: The image
-    :param angle: The given angle
+    :param rng: The random generator of the item (the global random state if None)
 
     RETURN:
     -------
@@ -450,8 +542,10 @@ def random_rotate(image: np.array) ->Tuple[np.array, TransformData]:
     :return image (np.array): The rotated image
     :return transform (TransformData): The info of the random transform
     """
+    rng = np.random if rng is None else rng
+
     # Pick a random angle value
-    angle = (np.random.uniform(0.0, 360.0))
+    angle = (rng.uniform(0.0, 360.0))
 
     # Rotate the image
     image, _ = rotate(image, angle)
@@ -469,7 +563,7 @@ def random_rotate(image: np.array) ->Tuple[np.array, TransformData]:
     return image, transform
 
 
-def semi_random_rotate(image: np.array, angle: float) -> Tuple[np.array, TransformData]:
+def semi_random_rotate(image: np.array, angle: float, rng: Optional[np.random.RandomState] = None) -> Tuple[np.array, TransformData]:
     """
     AUTHORS:
     --------
@@ -487,6 +581,7 @@ def semi_random_rotate(image: np.array, angle: float) -> Tuple[np.array, Transfo
 
     :param image: The image
     :param angle: The given angle
+    :param rng: The random generator of the item (the global random state if None)
 
     RETURN:
     -------
@@ -494,9 +589,10 @@ def semi_random_rotate(image: np.array, angle: float) -> Tuple[np.array, Transfo
     :return image(np.array): The rotated image
     :return transform(TransformData): The info of the random transform
     """
+    rng = np.random if rng is None else rng
 
     # Select a random angle within a given range
-    angle = (2 * np.random.rand() - 1) * angle
+    angle = (2 * rng.rand() - 1) * angle
 
     # Rotate the image
     image, _ = rotate(image, angle)
@@ -514,6 +610,7 @@ def semi_random_rotate(image: np.array, angle: float) -> Tuple[np.array, Transfo
     return image, transform
 
 
+@deterministic
 def rotate(image: np.array, angle: float) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -551,6 +648,179 @@ def rotate(image: np.array, angle: float) -> Tuple[np.array, None]:
     return cv2.warpAffine(image, m, (cols, rows)), None
 
 
+def flip_batch(images: np.array, horizontal: bool = True, vertical: bool = False) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Flip a batch of images (see flip)
+
+    PARAMETERS:
+    -----------
+
+    :param images (np.array): The input images (N x H x W x C)
+    :param horizontal (bool): Whether to flip the images horizontally (left-right)
+    :param vertical (bool): Whether to flip the images vertically (up-down)
+
+    RETURN:
+    -------
+
+    :return: The flipped images
+    :return: None
+    """
+    if horizontal:
+        images = images[:, :, ::-1]
+    if vertical:
+        images = images[:, ::-1]
+    return np.ascontiguousarray(images), None
+
+
+@batched(flip_batch)
+@deterministic
+def flip(image: np.array, horizontal: bool = True, vertical: bool = False) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Flip an image
+
+    PARAMETERS:
+    -----------
+
+    :param image (np.array): The input image
+    :param horizontal (bool): Whether to flip the image horizontally (left-right)
+    :param vertical (bool): Whether to flip the image vertically (up-down)
+
+    RETURN:
+    -------
+
+    :return: The flipped image
+    :return: None
+    """
+    if horizontal:
+        image = image[:, ::-1]
+    if vertical:
+        image = image[::-1]
+    return np.ascontiguousarray(image), None
+
+
+def random_flip_batch(images: np.array, rng: List[np.random.RandomState], horizontal: float = 0.5, vertical: float = 0) -> Tuple[np.array, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Flip each image of a batch at random (see random_flip)
+
+    PARAMETERS:
+    -----------
+
+    :param images (np.array): The input images (N x H x W x C)
+    :param rng (List[np.random.RandomState]): The random generator of each image
+    :param horizontal (float): The probability to flip each image horizontally
+    :param vertical (float): The probability to flip each image vertically
+
+    RETURN:
+    -------
+
+    :return: The images
+    :return: None
+    """
+    flips = np.array([r.rand(2) for r in rng]) < (horizontal, vertical)
+    images[flips[:, 0]] = images[flips[:, 0], :, ::-1]
+    images[flips[:, 1]] = images[flips[:, 1], ::-1]
+    return images, None
+
+
+@batched(random_flip_batch)
+def random_flip(image: np.array, horizontal: float = 0.5, vertical: float = 0, rng: Optional[np.random.RandomState] = None) -> Tuple[np.array, TransformData]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Flip an image horizontally and / or vertically at random
+
+    PARAMETERS:
+    -----------
+
+    :param image (np.array): The input image
+    :param horizontal (float): The probability to flip the image horizontally
+    :param vertical (float): The probability to flip the image vertically
+    :param rng (Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+
+    RETURN:
+    -------
+
+    :return: The image
+    :return transform (TransformData): The parameters of the random flip
+    """
+    # Both draws are always made, so the batched implementation draws the same values
+    rng = np.random if rng is None else rng
+    flip_horizontal, flip_vertical = rng.rand(2) < (horizontal, vertical)
+
+    image, _ = flip(image, horizontal=bool(flip_horizontal), vertical=bool(flip_vertical))
+
+    # Store the parameters
+    transform = TransformData(name="flip",
+                              method=flip,
+                              module_path=__name__,
+                              kwargs={
+                                  "horizontal": bool(flip_horizontal),
+                                  "vertical": bool(flip_vertical)
+                                  }
+                              )
+    return image, transform
+
+
+def normalize_image_batch(
+        images,
+        mean: Union[None, list, int, float],
+        standard_deviation: Union[float, int],
+        cv_library: int = DEEP_LIB_OPENCV
+) -> Tuple[Any, None]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Normalize a batch of images (see normalize_image)
+    The mean and the standard deviation computed online are computed for each image
+
+    PARAMETERS:
+    -----------
+
+    :param images: the images (N x H x W x C)
+    :param mean: Union[None, list, int]: The mean of the channel(s)
+    :param standard_deviation: int: The standard deviation of the channel(s)
+    :param cv_library:
+
+    RETURN:
+    -------
+    :return normalized_images (np.array): the normalized images
+    :return: None
+    """
+    if standard_deviation is None:
+        standard_deviation = images.std(axis=(1, 2), keepdims=True)
+
+    if DEEP_LIB_OPENCV.corresponds(cv_library):
+        channels = images.shape[-1]
+
+        if mean is None:
+            # Same means as normalize_image
+            mean = np.array([cv2.mean(image)[:channels] for image in images])
+            mean = mean.reshape((len(images),) + (1,) * (images.ndim - 2) + (-1,))
+
+        if isinstance(mean, list) or isinstance(mean, tuple):
+            mean = mean[:channels]
+    else:
+        if mean is None:
+            mean = images.mean(axis=(1, 2), keepdims=True)
+
+    normalized_images = (images - mean) / standard_deviation
+
+    return normalized_images.astype(np.float32), None
+
+
+@batched(normalize_image_batch)
+@deterministic
 def normalize_image(
         image,
         mean: Union[None, list, int, float],
@@ -616,6 +886,7 @@ def normalize_image(
     return normalized_image.astype(np.float32), None
 
 
+@deterministic
 def gaussian_blur(image: np.array, kernel_size: int) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -642,6 +913,7 @@ def gaussian_blur(image: np.array, kernel_size: int) -> Tuple[np.array, None]:
     return cv2.GaussianBlur(image, (int(kernel_size), int(kernel_size)), 0), None
 
 
+@deterministic
 def median_blur(image: np.array, kernel_size: int) -> Tuple[np.array, None]:
 
     """
@@ -673,6 +945,7 @@ def median_blur(image: np.array, kernel_size: int) -> Tuple[np.array, None]:
     return cv2.medianBlur(image, int(kernel_size)), None
 
 
+@deterministic
 def bilateral_blur(image: np.array, diameter: int, sigma_color: int, sigma_space: int) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -704,6 +977,7 @@ def bilateral_blur(image: np.array, diameter: int, sigma_color: int, sigma_space
     return cv2.bilateralFilter(image, diameter, sigma_color, sigma_space), None
 
 
+@deterministic
 def grayscale(image: np.array) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -740,6 +1014,7 @@ def grayscale(image: np.array) -> Tuple[np.array, None]:
         return image, None
 
 
+@deterministic
 def convert_bgra2rgba(image: np.array) ->Tuple[np.array, None]:
     """
     AUTHORS:
@@ -774,6 +1049,7 @@ def convert_bgra2rgba(image: np.array) ->Tuple[np.array, None]:
     return image, None
 
 
+@deterministic
 def convert_rgba2bgra(image) ->Tuple[np.array, None]:
     """
     AUTHORS:
@@ -810,6 +1086,7 @@ def convert_rgba2bgra(image) ->Tuple[np.array, None]:
     return image, None
 
 
+@deterministic
 def remove_channel(image: np.array, index_channel: int)->Tuple[np.array, None]:
     """
     AUTHORS:
@@ -843,6 +1120,7 @@ def remove_channel(image: np.array, index_channel: int)->Tuple[np.array, None]:
 """
 
 
+@deterministic
 def color2label(image: np.array, dict_labels: OrderedDict) -> Tuple[np.array, None]:
     """
     AUTHORS:
@@ -895,6 +1173,7 @@ def color2label(image: np.array, dict_labels: OrderedDict) -> Tuple[np.array, No
     return labels, None
 
 
+@deterministic
 def label2color(labels: np.array, dict_labels: OrderedDict) -> Tuple[np.array, None]:
     """
     AUTHORS:
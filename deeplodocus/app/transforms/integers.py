@@ -1,7 +1,12 @@
 import numpy as np
 from typing import Tuple
 
+from deeplodocus.data.transform.batched import batched
+from deeplodocus.data.transform.deterministic import deterministic
 
+
+@batched()
+@deterministic
 def one_hot_encode(class_ids: int, num_classes: int) -> Tuple[np.array, None]:
     """
     AUTHORS:
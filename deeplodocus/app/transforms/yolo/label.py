@@ -2,9 +2,15 @@ import numpy as np
 
 from deeplodocus.utils.notification import Notification
 from deeplodocus.flags.notif import DEEP_NOTIF_WARNING
+from deeplodocus.data.transform.deterministic import deterministic
 
 
+@deterministic
 def reformat(x, image_shape, n_obj=100):
+    # One row per object if n_obj is None (the labels of a batch are then padded, see dataloader: bucket_by)
+    if n_obj is None:
+        n_obj = len(x) if np.any(x) else 0
+
     # Initialize label array
     label = np.empty((n_obj, 5), dtype=np.float32)
     label.fill(-1)
@@ -35,6 +41,7 @@ def reformat(x, image_shape, n_obj=100):
     return label, None
 
 
+@deterministic
 def scale(label, image_shape):
     # Where label box is not all -1, multiple by (w, h, w, h)
     label[~ np.all(label == -1, axis=1), 0:4] *= np.tile(np.array(image_shape), 2).reshape(1, -1)
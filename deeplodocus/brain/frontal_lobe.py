@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 
 # Python imports
+import os
 import inspect
+import yaml
+from typing import Optional
 
 # Back-end imports
 import torch.nn.functional
@@ -21,7 +24,10 @@ from deeplodocus.data.load.dataset import Dataset
 from deeplodocus.data.transform.output import OutputTransformer
 from deeplodocus.data.transform.transform_manager import TransformManager
 from deeplodocus.utils.notification import Notification
-from deeplodocus.utils.generic_utils import get_module
+from deeplodocus.utils.generic_utils import get_module, get_corresponding_flag
+from deeplodocus.utils import get_main_path
+from deeplodocus.utils.file import convert_npz_to_npy
+from deeplodocus.utils import distributed
 
 # Deeplodocus flags
 from deeplodocus.flags import *
@@ -69,6 +75,9 @@ class FrontalLobe(object):
     :method load_losses:
     :method load_metrics:
     :method load_memory:
+    :method compile_dataset: Compile a dataset into packed binary shards
+    :method convert_npz: Convert .npz files into .npy files which can be memory-mapped
+    :method scan_dataset: Scan a dataset for unreadable items and profile its loading
     :method summary:
 
     PRIVATE METHODS:
@@ -130,6 +139,9 @@ class FrontalLobe(object):
         If multiple device ids are specified (or found when device_ids = "auto"), the output_device, self.device
         will be self.device_ids[0]. Note that nn.DataParallel uses this as the output device by default.
 
+        If the process was started by a distributed launcher (e.g. torchrun), the process group is initialised and
+        the process only uses the device corresponding to its local rank.
+
         RETURN:
         -------
 
@@ -141,6 +153,10 @@ class FrontalLobe(object):
         else:
             self.device_ids = self.config.project.device_ids
 
+        # If started by a distributed launcher, each process uses a single device (selected by its local rank)
+        if distributed.init_distributed(backend=self.config.project.distributed_backend) and self.device_ids:
+            self.device_ids = [self.device_ids[distributed.get_local_rank() % len(self.device_ids)]]
+
         # If device is auto, set as 'cuda:x' or cpu as appropriate, else use specified value
         try:
             if self.config.project.device == "auto":
@@ -810,6 +826,117 @@ class FrontalLobe(object):
             )
         )
 
+    def compile_dataset(
+            self,
+            dataset: str = "train",
+            directory: Optional[str] = None,
+            decoded: bool = True,
+            shard_size: int = 1024
+    ) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compile a configured dataset into packed binary shards (see Dataset.compile)
+        The configuration of the Shard Source instances to use instead of the original sources is displayed
+
+        PARAMETERS:
+        -----------
+
+        :param dataset (str): The type of the dataset to compile (train, validation, test or predict)
+        :param directory (Optional[str]): The directory to write the shards into (default: data/shards/<dataset name>)
+        :param decoded (bool): Whether to store the loaded items or the raw content of the files
+        :param shard_size (int): The maximum size of a shard (in MB)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        i = self.get_dataset_index(get_corresponding_flag(DEEP_LIST_DATASET, dataset))
+        config = self.config.data.datasets[i]
+        if directory is None:
+            directory = "%s/data/shards/%s" % (get_main_path(), config.name)
+
+        # The shards store the items before any transform
+        data = Dataset(**config.get(ignore=["batch_size"]), transform_manager=None)
+        sources = data.compile(directory=directory, decoded=decoded, shard_size=shard_size)
+
+        Notification(DEEP_NOTIF_SUCCESS, "Dataset %s compiled into %s" % (config.name, directory))
+        Notification(DEEP_NOTIF_INFO, "Use the following sources in the configuration of each entry :")
+        for entry, entry_sources in zip(config.entries, sources):
+            Notification(DEEP_NOTIF_INFO, "%s :" % entry.name)
+            for line in yaml.dump({"sources": entry_sources}, default_flow_style=False).splitlines():
+                Notification(DEEP_NOTIF_INFO, "  %s" % line)
+
+    def scan_dataset(
+            self,
+            dataset: str = "train",
+            report: Optional[str] = None,
+            num_workers: Optional[int] = None,
+            chunk_size: int = 256,
+            restart: bool = False
+    ) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Scan a configured dataset with its input transforms in a pool of processes (see Dataset.summary)
+        The unreadable items, the statistics of the decoded items and the latencies are written into a JSON report
+
+        PARAMETERS:
+        -----------
+
+        :param dataset (str): The type of the dataset to scan (train, validation, test or predict)
+        :param report (Optional[str]): The path of the report (default: data/reports/<dataset name>_<type>.json)
+        :param num_workers (Optional[int]): The number of processes (number of CPUs by default, 0 to scan in the current process)
+        :param chunk_size (int): The number of instances scanned by a process at once
+        :param restart (bool): Whether to scan the whole dataset again instead of resuming the previous scan
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        flag = get_corresponding_flag(DEEP_LIST_DATASET, dataset)
+        config = self.config.data.datasets[self.get_dataset_index(flag)]
+        transform_manager = TransformManager(**self.config.transform.get(flag.names[0]).get(ignore="outputs"))
+        data = Dataset(**config.get(ignore=["batch_size"]), transform_manager=transform_manager)
+        data.summary(report=report, num_workers=num_workers, chunk_size=chunk_size, restart=restart)
+
+    @staticmethod
+    def convert_npz(path: str, directory: Optional[str] = None) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Convert .npz files into uncompressed .npy files which can be memory-mapped (see the mmap_mode of the entries)
+        A file with a single array is converted into <name>.npy, so the paths in the sources only need a new extension
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): A .npz file, or a directory searched recursively for .npz files
+        :param directory (Optional[str]): The directory to write the .npy files into (default: next to the .npz files)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if os.path.isfile(path):
+            filenames = [(path, directory)]
+        else:
+            filenames = []
+            for root, _, files in os.walk(path):
+                output = None if directory is None else os.path.join(directory, os.path.relpath(root, path))
+                filenames += [(os.path.join(root, f), output) for f in sorted(files) if f.endswith(DEEP_EXT_NPZ)]
+
+        num_arrays = 0
+        for filename, output in filenames:
+            num_arrays += len(convert_npz_to_npy(filename, output))
+        Notification(DEEP_NOTIF_SUCCESS, "%i .npz files converted into %i .npy files" % (len(filenames), num_arrays))
+
     def summary(self):
         """
         AUTHORS:
@@ -1,12 +1,21 @@
 from typing import Union
+import torch
 from torch.utils.data import DataLoader
+from torch.utils.data import BatchSampler
+from torch.utils.data import SequentialSampler
 from math import ceil
+import numpy as np
 
 from deeplodocus.core.metrics import Losses, Metrics
+from deeplodocus.core.inference.prefetcher import Prefetcher
 from deeplodocus.data.load.dataset import Dataset
+from deeplodocus.data.load.stream_dataset import StreamDataset
+from deeplodocus.data.load.bucket_sampler import BucketBatchSampler
 from deeplodocus.flags import *
 from deeplodocus.utils.generic_utils import get_corresponding_flag
+from deeplodocus.utils.notification import Notification
 from deeplodocus.utils.namespace import Namespace
+from deeplodocus.utils import distributed
 
 
 class Inferer(object):
@@ -21,9 +30,17 @@ class Inferer(object):
             batch_size: int = 32,
             num_workers: int = 1,
             shuffle: Flag = DEEP_SHUFFLE_NONE,
-            name: str = "Inferer"
+            name: str = "Inferer",
+            batched: bool = False,
+            prefetch: int = 0,
+            seed: Union[int, None] = None,
+            drop_last: bool = False,
+            bucket_by: Union[Flag, None] = None,
+            num_buckets: int = 8,
+            bucket_entry: int = 0,
+            pin_memory: bool = False
     ):
-        self.dataset = dataset
+        self.dataset = StreamDataset(dataset) if dataset.is_unlimited() else dataset  # Unlimited data is streamed
         self.model = model
         self.transform_manager = transform_manager
         self.losses = losses
@@ -36,14 +53,230 @@ class Inferer(object):
             fatal=False,
             default=DEEP_SHUFFLE_NONE
         )
-        self.dataloader = DataLoader(
-            dataset=self.dataset,
+        self.batched = batched
+        self.shard_dataset(seed=seed, drop_last=drop_last)
+        self.sampler = self.create_sampler(bucket_by, num_buckets, bucket_entry, seed=seed, drop_last=drop_last)
+        self.dataloader = self.create_dataloader(pin_memory=pin_memory)
+        self.prefetcher = Prefetcher(self.dataloader, self.to_device, depth=prefetch) if prefetch > 0 else None
+
+    def shard_dataset(self, seed: Union[int, None] = None, drop_last: bool = False) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Split the dataset between the processes of the distributed process group (if any)
+        Each process iterates over a disjoint slice of each epoch, the processes must agree on the seed of the shuffling :
+        if no seed is given, the seed of the first process is sent to the others
+
+        PARAMETERS:
+        -----------
+
+        :param seed (Union[int, None]): The seed of the shuffling
+        :param drop_last (bool): Whether to drop the last instances instead of padding each slice to the same length
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        world_size = distributed.get_world_size()
+        if world_size > 1 and seed is None:
+            seed = distributed.broadcast_object(int(np.random.randint(2 ** 31)))
+        self.dataset.set_shard(
+            rank=distributed.get_rank(),
+            world_size=world_size,
+            seed=seed,
+            drop_last=drop_last
+        )
+
+    def create_sampler(
+            self,
+            bucket_by: Union[Flag, None],
+            num_buckets: int = 8,
+            bucket_entry: int = 0,
+            seed: Union[int, None] = None,
+            drop_last: bool = False
+    ) -> Union[BucketBatchSampler, None]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the sampler grouping the instances into buckets of similar items (if enabled)
+        The items of each batch are then padded to the largest item of the batch
+
+        PARAMETERS:
+        -----------
+
+        :param bucket_by (Union[Flag, None]): Whether to group the instances by aspect ratio or by length (None to disable)
+        :param num_buckets (int): The number of buckets
+        :param bucket_entry (int): The index of the entry whose items define the buckets
+        :param seed (Union[int, None]): The seed of the shuffling of the batches
+        :param drop_last (bool): Whether to drop the incomplete batch of each bucket
+
+        RETURN:
+        -------
+
+        :return (Union[BucketBatchSampler, None]): The sampler, None if disabled
+        """
+        if bucket_by is None:
+            return None
+        if isinstance(self.dataset, StreamDataset):
+            Notification(DEEP_NOTIF_WARNING, "%s : the instances of a streamed dataset cannot be grouped into buckets" % self.name)
+            return None
+        self.dataset.set_padding(True)
+        return BucketBatchSampler(
+            self.dataset,
             batch_size=self.batch_size,
-            shuffle=False,
-            num_workers=self.num_workers
+            bucket_by=bucket_by,
+            num_buckets=num_buckets,
+            entry=bucket_entry,
+            shuffle=not DEEP_SHUFFLE_NONE.corresponds(self.shuffle),
+            drop_last=drop_last,
+            seed=seed
         )
 
+    def create_dataloader(self, pin_memory: bool = False) -> DataLoader:
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the DataLoader
+        If batched, each worker receives all the indices of a mini-batch and calls Dataset.get_batch() once
+        If the dataset is streamed, each worker streams its own partition of the data
+        If the instances are grouped into buckets, the batches are given by the BucketBatchSampler and padded
+        Otherwise, the instances are collated straight into a contiguous tensor for each entry (see Dataset.create_collate)
+
+        If pin_memory, the batches are in pinned memory, so that they are copied asynchronously to the GPU :
+        without workers the collate function allocates the batches in pinned memory,
+        with workers the batches are allocated in shared memory and pinned by the DataLoader
+
+        PARAMETERS:
+        -----------
+
+        :param pin_memory (bool): Whether the batches are in pinned memory
+
+        RETURN:
+        -------
+
+        :return (DataLoader): The DataLoader of the dataset
+        """
+        if isinstance(self.dataset, StreamDataset):
+            # Each worker streams and batches its own partition of the data
+            return DataLoader(
+                dataset=self.dataset,
+                batch_size=self.batch_size,
+                num_workers=self.num_workers,
+                pin_memory=pin_memory
+            )
+        elif self.sampler is not None and self.batched:
+            return DataLoader(
+                dataset=self.dataset,
+                batch_size=None,
+                sampler=self.sampler,
+                num_workers=self.num_workers,
+                pin_memory=pin_memory
+            )
+        elif self.sampler is not None:
+            return DataLoader(
+                dataset=self.dataset,
+                batch_sampler=self.sampler,
+                collate_fn=self.dataset.create_collate(pin_memory=pin_memory and self.num_workers == 0),
+                num_workers=self.num_workers,
+                pin_memory=pin_memory and self.num_workers > 0
+            )
+        elif self.batched:
+            return DataLoader(
+                dataset=self.dataset,
+                batch_size=None,
+                sampler=BatchSampler(SequentialSampler(self.dataset), batch_size=self.batch_size, drop_last=False),
+                num_workers=self.num_workers,
+                pin_memory=pin_memory
+            )
+        else:
+            return DataLoader(
+                dataset=self.dataset,
+                batch_size=self.batch_size,
+                shuffle=False,
+                collate_fn=self.dataset.create_collate(pin_memory=pin_memory and self.num_workers == 0),
+                num_workers=self.num_workers,
+                pin_memory=pin_memory and self.num_workers > 0
+            )
+
+    def get_batches(self):
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the batches of a pass over the dataset
+        If prefetching, the pass is started unless it was started in advance (see start_prefetch)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: The DataLoader, or the Prefetcher yielding batches already on the device of the model
+        """
+        if self.prefetcher is None:
+            return self.dataloader
+        if not self.prefetcher.is_started():
+            self.prefetcher.start(self.model.device)
+        return self.prefetcher
+
+    def start_prefetch(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Start to prefetch the next pass over the dataset in the background (if prefetching is enabled)
+        The dataset must be ready for the pass (e.g. shuffled) as the DataLoader workers copy it when they start
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.start(self.model.device)
+
+    def print_prefetch(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Print the time the model waited for the batches during the last pass (if prefetching is enabled)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.prefetcher is not None:
+            Notification(
+                DEEP_NOTIF_INFO,
+                "%s : waited %.3fs for data (%i empty queue(s) over %i batches)" % (
+                    self.name, self.prefetcher.wait_time, self.prefetcher.num_waits, self.get_num_batches()
+                )
+            )
+
     def get_num_batches(self) -> int:
+        if isinstance(self.dataset, StreamDataset):
+            return self.dataset.get_num_batches(self.batch_size, self.num_workers)
+        if self.sampler is not None:
+            return len(self.sampler)
         return int(ceil(len(self.dataset) / self.batch_size))
 
     def to_device(self, x, device):
@@ -56,6 +289,9 @@ class Inferer(object):
         elif isinstance(x, Namespace):
             x.__dict__ = {k: self.to_device(i, device) for k, i in x.__dict__.items()}
             return x
+        elif isinstance(x, torch.Tensor):
+            # Copies from pinned memory do not block the host (see create_dataloader)
+            return x.to(device, non_blocking=x.is_pinned())
         else:
             try:
                 return x.to(device)
@@ -0,0 +1,219 @@
+import time
+import queue
+import threading
+from typing import Any
+from typing import Callable
+
+import torch
+from torch.utils.data import DataLoader
+
+
+class Prefetcher(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Prefetch the batches of a DataLoader in a background thread
+    The batches are moved to the device by the thread and kept in a bounded queue,
+    so the model does not wait for a slow batch or for the workers to start at the beginning of an epoch.
+    A pass over the DataLoader can be started before it is iterated (e.g. while validating the previous epoch).
+    The time spent waiting for an empty queue is measured at each pass.
+    """
+
+    def __init__(self, dataloader: DataLoader, to_device: Callable, depth: int = 2):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the Prefetcher
+
+        PARAMETERS:
+        -----------
+
+        :param dataloader (DataLoader): The DataLoader to prefetch
+        :param to_device (Callable): The function moving a batch to a device, called as to_device(batch, device)
+        :param depth (int): The maximum number of batches ready in the queue
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.dataloader = dataloader
+        self.to_device = to_device
+        self.depth = depth
+        self.queue = None
+        self.thread = None
+        self.stop_event = None
+
+        # CUDA stream used to copy the batches (the copies do not wait for the model)
+        self.stream = None
+
+        # Time waited for a batch (s) and number of times the queue was empty during the last pass
+        self.wait_time = 0.0
+        self.num_waits = 0
+
+    def __iter__(self):
+        """
+        DESCRIPTION:
+        ------------
+
+        Iterate over the batches of the current pass (the pass has to be started first)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: A generator of batches already moved to the device
+        """
+        try:
+            while True:
+                if self.queue.empty():
+                    start = time.perf_counter()
+                    batch = self.queue.get()
+                    self.wait_time += time.perf_counter() - start
+                    self.num_waits += 1
+                else:
+                    batch = self.queue.get()
+
+                # End of the pass, or error in the background thread
+                if batch is None:
+                    break
+                elif isinstance(batch, BaseException):
+                    raise batch
+
+                # Make sure the copies to the device are done before using the batch
+                if self.stream is not None:
+                    torch.cuda.current_stream().wait_stream(self.stream)
+                    self.__record_stream(batch)
+                yield batch
+        finally:
+            self.stop()
+
+    def __len__(self) -> int:
+        return len(self.dataloader)
+
+    def is_started(self) -> bool:
+        return self.thread is not None
+
+    def start(self, device: Any) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Start a pass over the DataLoader
+        The iterator of the DataLoader (and its workers) is created in the calling thread,
+        the batches are then fetched and moved to the device in a background thread
+
+        PARAMETERS:
+        -----------
+
+        :param device (Any): The device to move the batches to
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.stop()
+        self.wait_time = 0.0
+        self.num_waits = 0
+        self.queue = queue.Queue(maxsize=self.depth)
+        self.stop_event = threading.Event()
+        if torch.cuda.is_available() and torch.device(device).type == "cuda":
+            self.stream = torch.cuda.Stream(device=device)
+        else:
+            self.stream = None
+        self.thread = threading.Thread(
+            target=self.__fill,
+            args=(iter(self.dataloader), device, self.queue, self.stop_event),
+            daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Stop the current pass (if any) and wait for the background thread
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.thread is not None:
+            self.stop_event.set()
+            # Free a place in the queue if the thread is waiting for one
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.thread.join()
+            self.thread = None
+
+    def __fill(self, iterator, device: Any, batches: queue.Queue, stop_event: threading.Event) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Fetch the batches of a pass, move them to the device and put them in the queue (run by the background thread)
+        None is put in the queue at the end of the pass, the exception is put in the queue if an error occurs
+
+        PARAMETERS:
+        -----------
+
+        :param iterator: The iterator of the DataLoader
+        :param device (Any): The device to move the batches to
+        :param batches (queue.Queue): The queue of ready batches
+        :param stop_event (threading.Event): Event set when the pass is stopped
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        try:
+            for batch in iterator:
+                if self.stream is not None:
+                    with torch.cuda.stream(self.stream):
+                        batch = self.to_device(batch, device)
+                else:
+                    batch = self.to_device(batch, device)
+                if not self.__put(batches, batch, stop_event):
+                    return
+            self.__put(batches, None, stop_event)
+        except BaseException as e:
+            self.__put(batches, e, stop_event)
+
+    @staticmethod
+    def __put(batches: queue.Queue, item: Any, stop_event: threading.Event) -> bool:
+        # Wait for a free place in the queue unless the pass is stopped
+        while not stop_event.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __record_stream(self, x: Any) -> None:
+        # Tell the caching allocator the tensors copied on the side stream are used by the current stream
+        if isinstance(x, (list, tuple)):
+            for item in x:
+                self.__record_stream(item)
+        elif isinstance(x, dict):
+            for item in x.values():
+                self.__record_stream(item)
+        elif isinstance(x, torch.Tensor) and x.is_cuda:
+            x.record_stream(torch.cuda.current_stream())
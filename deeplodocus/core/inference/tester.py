@@ -20,7 +20,15 @@ class Tester(Inferer):
             batch_size: int = 32,
             num_workers: int = 1,
             shuffle: Flag = DEEP_SHUFFLE_NONE,
-            name: str = "Tester"
+            name: str = "Tester",
+            batched: bool = False,
+            prefetch: int = 0,
+            seed: Union[int, None] = None,
+            drop_last: bool = False,
+            bucket_by: Union[Flag, None] = None,
+            num_buckets: int = 8,
+            bucket_entry: int = 0,
+            pin_memory: bool = False
     ):
         super(Tester, self).__init__(
             dataset, model, transform_manager, losses,
@@ -28,13 +36,21 @@ class Tester(Inferer):
             batch_size=batch_size,
             num_workers=num_workers,
             shuffle=shuffle,
-            name=name
+            name=name,
+            batched=batched,
+            prefetch=prefetch,
+            seed=seed,
+            drop_last=drop_last,
+            bucket_by=bucket_by,
+            num_buckets=num_buckets,
+            bucket_entry=bucket_entry,
+            pin_memory=pin_memory
         )
         self.progress_bar = None
 
     def evaluate(self, silent: bool = False, progress_bar: Union[ProgressBar, bool] = True, prefix: str = "Evaluation :"):
         self.evaluation_start(silent=silent, progress_bar=progress_bar, prefix="DEEP PROGRESS : %s" % prefix)
-        for batch in self.dataloader:
+        for batch in self.get_batches():
             self.evaluation_batch(batch)
         return self.evaluation_end(silent=silent)
 
@@ -56,6 +72,7 @@ class Tester(Inferer):
         if not silent:
             Notification(DEEP_NOTIF_SUCCESS, DEEP_MSG_EVALUATION_FINISHED)
             Notification(DEEP_NOTIF_RESULT, self.compose_text(loss, losses, metrics))
+            self.print_prefetch()
         return loss, losses, metrics
 
     def evaluation_batch(self, batch):
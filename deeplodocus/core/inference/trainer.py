@@ -9,6 +9,7 @@ from deeplodocus.data.load.dataset import Dataset
 from deeplodocus.flags import *
 from deeplodocus.utils.generic_utils import ProgressBar
 from deeplodocus.utils.notification import Notification
+from deeplodocus.utils import distributed
 from deeplodocus.core.inference import Inferer, Tester
 
 
@@ -29,10 +30,20 @@ class Trainer(Inferer):
             accumulate=1,
             num_workers: int = 1,
             shuffle: Flag = DEEP_SHUFFLE_NONE,
+            shuffle_block_size: int = 64,
+            shuffle_window: int = 1024,
             name: str = "Trainer",
             verbose: Flag = DEEP_VERBOSE_BATCH,
             validator: Union[Tester, None] = None,
-            enable_metrics=True
+            enable_metrics=True,
+            batched: bool = False,
+            prefetch: int = 0,
+            seed: Union[int, None] = None,
+            drop_last: bool = False,
+            bucket_by: Union[Flag, None] = None,
+            num_buckets: int = 8,
+            bucket_entry: int = 0,
+            pin_memory: bool = False
     ):
         super(Trainer, self).__init__(
             dataset, model, transform_manager, losses,
@@ -40,8 +51,18 @@ class Trainer(Inferer):
             batch_size=batch_size,
             num_workers=num_workers,
             shuffle=shuffle,
-            name=name
+            name=name,
+            batched=batched,
+            prefetch=prefetch,
+            seed=seed,
+            drop_last=drop_last,
+            bucket_by=bucket_by,
+            num_buckets=num_buckets,
+            bucket_entry=bucket_entry,
+            pin_memory=pin_memory
         )
+        self.shuffle_block_size = shuffle_block_size
+        self.shuffle_window = shuffle_window
         self.optimizer = optimizer
         self.scheduler = scheduler
         self.num_epochs = num_epochs
@@ -80,7 +101,7 @@ class Trainer(Inferer):
         self.training_start()
         for self.epoch in range(self.initial_epoch + 1, self.num_epochs + self.initial_epoch + 1):
             self.epoch_start()
-            for self.batch_index, batch in enumerate(self.dataloader, 1):
+            for self.batch_index, batch in enumerate(self.get_batches(), 1):
                 self.forward(batch) if self.accumulate == 1 else self.forward2(batch)
             self.epoch_end()
         self.training_end()
@@ -109,6 +130,7 @@ class Trainer(Inferer):
                 total=n,
                 prefix="DEEP PROGRESS : Epoch %s :" % str(self.epoch).rjust(4)
             )
+        distributed.broadcast_parameters(self.model)  # Start from the same weights in every process
         Notification(DEEP_NOTIF_INFO, DEEP_MSG_TRAINING_STARTED)
         self.send_training_start_signal()
 
@@ -124,7 +146,8 @@ class Trainer(Inferer):
         v = DEEP_VERBOSE_BATCH.corresponds(self.verbose) or DEEP_VERBOSE_EPOCH.corresponds(self.verbose)
         if v:
             Notification(DEEP_NOTIF_INFO, DEEP_MSG_EPOCH_START % self.epoch)
-        self.dataset.shuffle(self.shuffle, verbose=v)  # Shuffle dataset
+        if self.prefetcher is None or not self.prefetcher.is_started():
+            self.shuffle_dataset(verbose=v, epoch=self.epoch)  # Shuffle dataset (unless shuffled before prefetching)
         self.model.train()  # Put model into train mode
         self.losses.reset(self.dataset.type)  # Reset training losses
         self.metrics.reset(self.dataset.type)  # Reset training metrics
@@ -134,6 +157,15 @@ class Trainer(Inferer):
             "Learning rates : %s" % (" : ".join([("param group %i : %.3e" % (i, lr)) for i, lr in enumerate(learnrates)]))
         )
 
+    def shuffle_dataset(self, verbose: bool = True, epoch: Union[int, None] = None):
+        self.dataset.shuffle(
+            self.shuffle,
+            verbose=verbose,
+            epoch=epoch,
+            block_size=self.shuffle_block_size,
+            window=self.shuffle_window
+        )
+
     def forward(self, batch):
         inputs, labels, additional_data = self.clean_single_element_list(batch)  # Clean the given data
 
@@ -157,6 +189,7 @@ class Trainer(Inferer):
 
         # Backward pass
         loss.backward()
+        distributed.average_gradients(self.model)  # Average the gradients of all the processes
         self.optimizer.step()
         self.optimizer.zero_grad()
 
@@ -260,6 +293,7 @@ class Trainer(Inferer):
         metrics = {key: vars(self.metrics)[key].reduce_method(item) for key, item in metrics.items()}
 
         # Update parameters
+        distributed.average_gradients(self.model)  # Average the gradients of all the processes
         self.optimizer.step()
         self.optimizer.zero_grad()
 
@@ -284,10 +318,14 @@ class Trainer(Inferer):
         self.train_metrics = self.metrics.reduce(self.dataset.type)  # Calculate total metric values
         if not DEEP_VERBOSE_TRAINING.corresponds(self.verbose):
             self.print_epoch()  # Print training epoch results
+            self.print_prefetch()  # Print the time spent waiting for data
         self.send_epoch_end_signal()
         # Call finish method on sources
         [s.finish() for e in self.dataloader.dataset.entries for s in e.sources if hasattr(s, "finish")]
         self.transform_manager.finish()  # Call finish method on output transforms
+        if self.prefetcher is not None and self.epoch < self.num_epochs + self.initial_epoch:
+            self.shuffle_dataset(verbose=False, epoch=self.epoch + 1)  # Shuffle the next epoch
+            self.start_prefetch()  # Prepare the first batches of the next epoch during the validation
         self.evaluate()  # Validate
         if self.scheduler is not None:
             self.scheduler.step()
@@ -336,31 +374,38 @@ class Trainer(Inferer):
 
     @staticmethod
     def send_batch_start_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_BATCH_START, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_BATCH_START, args=kwargs))
 
     @staticmethod
     def send_batch_end_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_BATCH_END, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_BATCH_END, args=kwargs))
 
     def send_epoch_end_signal(self, **kwargs):
         kwargs["epoch_index"] = self.epoch
         kwargs["loss"] = self.train_loss
         kwargs["losses"] = self.train_losses
         kwargs["metrics"] = self.train_metrics
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_EPOCH_END, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_EPOCH_END, args=kwargs))
 
     @staticmethod
     def send_training_start_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_TRAINING_START, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_TRAINING_START, args=kwargs))
 
     @staticmethod
     def send_training_end_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_TRAINING_END, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_TRAINING_END, args=kwargs))
 
     @staticmethod
     def send_validation_start_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_VALIDATION_START, args=kwargs))
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_VALIDATION_START, args=kwargs))
 
     @staticmethod
     def send_validation_end_signal(**kwargs):
-        Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_VALIDATION_END, args=kwargs))
\ No newline at end of file
+        if distributed.is_main_process():
+            Thalamus().add_signal(signal=Signal(event=DEEP_EVENT_VALIDATION_END, args=kwargs))
\ No newline at end of file
@@ -7,6 +7,7 @@ from deeplodocus.flags.flag_lists import DEEP_LIST_DATASET
 from deeplodocus.utils.deep_error import DeepError
 from deeplodocus.utils.notification import Notification
 from deeplodocus.utils.generic_utils import get_corresponding_flag, get_module
+from deeplodocus.utils import distributed
 
 UNDERLINE = 50
 
@@ -112,7 +113,8 @@ class Metrics(GenericMetrics):
     def reduce(self, flag):
         flag = get_corresponding_flag(DEEP_LIST_DATASET, flag, fatal=False)
         reduced_metrics = {}
-        for metric_name, values in self.values[flag.name.lower()].items():
+        # Reduce the values of all the processes (if distributed)
+        for metric_name, values in distributed.gather_values(self.values[flag.name.lower()]).items():
             if self.__dict__[metric_name].ignore_value is not None:
                 values = list(filter(lambda i: i != self.__dict__[metric_name].ignore_value, values))
             try:
@@ -177,9 +179,15 @@ class Losses(GenericMetrics):
 
     def reduce(self, flag):
         flag = get_corresponding_flag(DEEP_LIST_DATASET, flag, fatal=False)
+        # Reduce the values of all the processes (if distributed)
+        values = self.values[flag.name.lower()]
+        if distributed.is_distributed():
+            values = distributed.gather_values({
+                loss_name: [float(value) for value in loss_values] for loss_name, loss_values in values.items()
+            })
         losses = {
-            loss_name: (sum(values) / len(values)).item()
-            for loss_name, values in self.values[flag.name.lower()].items()
+            loss_name: float(sum(loss_values) / len(loss_values))
+            for loss_name, loss_values in values.items()
         }
         loss = sum([value for _, value in losses.items()])
         return loss, losses
@@ -81,6 +81,10 @@ DEEP_CONFIG = {
             DEEP_CONFIG_DTYPE: [int],
             DEEP_CONFIG_DEFAULT: "auto"
         },
+        "distributed_backend": {
+            DEEP_CONFIG_DTYPE: str,
+            DEEP_CONFIG_DEFAULT: "auto"
+        },
         "on_wake": {
             DEEP_CONFIG_DTYPE: [str],
             DEEP_CONFIG_DEFAULT: None,
@@ -175,6 +179,14 @@ DEEP_CONFIG = {
             DEEP_CONFIG_DTYPE: str,
             DEEP_CONFIG_DEFAULT: "default"
         },
+        "shuffle_block_size": {
+            DEEP_CONFIG_DTYPE: int,
+            DEEP_CONFIG_DEFAULT: 64
+        },
+        "shuffle_window": {
+            DEEP_CONFIG_DTYPE: int,
+            DEEP_CONFIG_DEFAULT: 1024
+        },
         "accumulate": {
             DEEP_CONFIG_DTYPE: int,
             DEEP_CONFIG_DEFAULT: 1
@@ -239,6 +251,38 @@ DEEP_CONFIG = {
             "num_workers": {
                 DEEP_CONFIG_DTYPE: int,
                 DEEP_CONFIG_DEFAULT: 1
+            },
+            "batched": {
+                DEEP_CONFIG_DTYPE: bool,
+                DEEP_CONFIG_DEFAULT: False
+            },
+            "prefetch": {
+                DEEP_CONFIG_DTYPE: int,
+                DEEP_CONFIG_DEFAULT: 0
+            },
+            "seed": {
+                DEEP_CONFIG_DTYPE: int,
+                DEEP_CONFIG_DEFAULT: None
+            },
+            "drop_last": {
+                DEEP_CONFIG_DTYPE: bool,
+                DEEP_CONFIG_DEFAULT: False
+            },
+            "bucket_by": {
+                DEEP_CONFIG_DTYPE: str,
+                DEEP_CONFIG_DEFAULT: None
+            },
+            "num_buckets": {
+                DEEP_CONFIG_DTYPE: int,
+                DEEP_CONFIG_DEFAULT: 8
+            },
+            "bucket_entry": {
+                DEEP_CONFIG_DTYPE: int,
+                DEEP_CONFIG_DEFAULT: 0
+            },
+            "pin_memory": {
+                DEEP_CONFIG_DTYPE: bool,
+                DEEP_CONFIG_DEFAULT: False
             }
         },
         "enabled": {
@@ -279,6 +323,14 @@ DEEP_CONFIG = {
                     DEEP_CONFIG_DTYPE: int,
                     DEEP_CONFIG_DEFAULT: 1
                 },
+                "steps_per_epoch": {
+                    DEEP_CONFIG_DTYPE: int,
+                    DEEP_CONFIG_DEFAULT: None
+                },
+                "manifest": {
+                    DEEP_CONFIG_DTYPE: bool,
+                    DEEP_CONFIG_DEFAULT: True
+                },
                 "entries": [
                     {
                         "name": {
@@ -307,6 +359,38 @@ DEEP_CONFIG = {
                             DEEP_CONFIG_DTYPE: bool,
                             DEEP_CONFIG_DEFAULT: False,
                         },
+                        "decode_threads": {
+                            DEEP_CONFIG_DTYPE: int,
+                            DEEP_CONFIG_DEFAULT: 1,
+                        },
+                        "decoded_cache_size": {
+                            DEEP_CONFIG_DTYPE: int,
+                            DEEP_CONFIG_DEFAULT: 0,
+                        },
+                        "decoded_cache_item_size": {
+                            DEEP_CONFIG_DTYPE: float,
+                            DEEP_CONFIG_DEFAULT: None,
+                        },
+                        "mmap_mode": {
+                            DEEP_CONFIG_DTYPE: str,
+                            DEEP_CONFIG_DEFAULT: None,
+                        },
+                        "npz_handles": {
+                            DEEP_CONFIG_DTYPE: int,
+                            DEEP_CONFIG_DEFAULT: 16,
+                        },
+                        "decode_scale": {
+                            DEEP_CONFIG_DTYPE: None,
+                            DEEP_CONFIG_DEFAULT: 1,
+                        },
+                        "pad_value": {
+                            DEEP_CONFIG_DTYPE: float,
+                            DEEP_CONFIG_DEFAULT: 0,
+                        },
+                        "transform_cache": {
+                            DEEP_CONFIG_DTYPE: bool,
+                            DEEP_CONFIG_DEFAULT: False,
+                        },
                         "sources": [
                             {
                                 "name": {
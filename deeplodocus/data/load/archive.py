@@ -0,0 +1,456 @@
+# Python imports
+import os
+import mmap
+import json
+import zlib
+import struct
+import bisect
+import fnmatch
+import tarfile
+import zipfile
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Union
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.utils.generic_utils import sorted_nicely
+from deeplodocus.utils.generic_utils import natural_sort_key
+from deeplodocus.data.load.source import Source
+
+# Deeplodocus flags
+from deeplodocus.flags.ext import DEEP_EXT_ARCHIVE_INDEX
+from deeplodocus.flags.ext import DEEP_EXT_TAR
+from deeplodocus.flags.ext import DEEP_EXT_ZIP
+from deeplodocus.flags.notif import *
+
+ARCHIVE_INDEX_VERSION = 1
+ZIP_LOCAL_HEADER = struct.Struct("<4s5H3I2H")  # Signature, versions, flags, method, time, date, crc, sizes, name and extra lengths
+ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+
+class Archive(Source):
+    """
+    DESCRIPTION:
+    ------------
+
+    Load the items of an entry from the members of tar or zip archives, without extracting them
+
+    The position of each member is indexed once and the index is cached next to the archive in a .aidx file.
+    The archives are memory-mapped : uncompressed members (tar members and stored zip members)
+    are returned as zero-copy views on the memory map, deflated zip members are inflated from the memory map.
+    The items are the raw content of the members (e.g. encoded images), decoded by the Loader of the entry.
+
+    The members are sorted by name in natural order (as the files of a Folder), so entries reading the same archive with different patterns
+    (e.g. "*.jpg" and "*.cls") get the members of the same instance at the same index.
+    """
+
+    def __init__(self,
+                 index: int = -1,
+                 is_loaded: bool = False,
+                 is_transformed: bool = False,
+                 path: str = "",
+                 pattern: Optional[str] = None,
+                 num_instances: Optional[int] = None,
+                 instance_id: int = 0
+                 ):
+
+        super().__init__(index=index,
+                         num_instances=num_instances,
+                         is_loaded=is_loaded,
+                         is_transformed=is_transformed,
+                         instance_id=instance_id)
+
+        # Path to an archive or to a directory of archives, and the pattern of the selected members
+        self.path = path
+        self.pattern = pattern
+        self.files = self.__list_files(path)
+
+        # Position of the selected members in each archive (data offset, size, compression method, compressed size)
+        self.members = [self.__select_members(self.__get_member_index(f), pattern) for f in self.files]
+
+        # Cumulative number of members in the archives (used to find the archive of an item)
+        self.offsets = [0]
+        for members in self.members:
+            self.offsets.append(self.offsets[-1] + len(members))
+
+        # Memory maps (opened lazily in each process)
+        self.mmaps = None
+        self.pid = None
+
+    def __getitem__(self, index: int) -> Tuple[Union[memoryview, bytes], bool, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the content of the member at the selected index
+
+        PARAMETERS:
+        -----------
+
+        :param index(int): The index of the selected member
+
+        RETURN:
+        -------
+
+        :return data: The content of the member, whether it is loaded, whether it is transformed
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        archive_index = bisect.bisect_right(self.offsets, index) - 1
+        return self.__read_member(archive_index, index - self.offsets[archive_index]), self.is_loaded, self.is_transformed
+
+    def get_batch(self, indices: List[int]) -> List[Tuple[Union[memoryview, bytes], bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the content of the members at the selected indices
+        The members are read in the order of their position in the archives
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected members
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[Union[memoryview, bytes], bool, bool]]): The output of __getitem__ for each index
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        items = [None] * len(indices)
+        locations = []
+        for position, index in enumerate(indices):
+            archive_index = bisect.bisect_right(self.offsets, index) - 1
+            member_index = index - self.offsets[archive_index]
+            locations.append((archive_index, int(self.members[archive_index][member_index, 0]), member_index, position))
+        for archive_index, _, member_index, position in sorted(locations):
+            items[position] = (self.__read_member(archive_index, member_index), self.is_loaded, self.is_transformed)
+        return items
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, they are reopened in the new process
+        state = self.__dict__.copy()
+        state["mmaps"] = None
+        state["pid"] = None
+        return state
+
+    def compute_length(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the length of the source from the member indices of the archives
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return length(int): The length of the source
+        """
+        return self.offsets[-1]
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the archives (size and modification time) and of the selected members
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the archives
+        """
+        stats = [os.stat(filename) for filename in self.files]
+        return hash((self.pattern,) + tuple((stat.st_size, stat.st_mtime_ns) for stat in stats))
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the archives
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return list(self.files)
+
+    def check(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check the archives were found and contain selected members
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if not self.files:
+            Notification(DEEP_NOTIF_FATAL, "No tar or zip archive found in : %s" % self.path)
+        if self.offsets[-1] == 0:
+            Notification(DEEP_NOTIF_FATAL, "No member of the archives in %s matches the pattern : %s" % (self.path, self.pattern))
+        super().check()
+        Notification(DEEP_NOTIF_SUCCESS, "Source archives \"%s\" successfully loaded (%i archives, %i members)" % (
+            self.path, len(self.files), self.offsets[-1]
+        ))
+
+    def __open(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Memory map the archives in the current process
+        The memory maps stay open as the items returned are views on them
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.mmaps = []
+        for filename in self.files:
+            with open(filename, "rb") as f:
+                self.mmaps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        self.pid = os.getpid()
+
+    def __read_member(self, archive_index: int, member_index: int) -> Union[memoryview, bytes]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the content of a member from the memory map of its archive
+
+        PARAMETERS:
+        -----------
+
+        :param archive_index (int): The index of the archive
+        :param member_index (int): The index of the member in the selected members of the archive
+
+        RETURN:
+        -------
+
+        :return (Union[memoryview, bytes]): A view on the uncompressed member, or the inflated content of the member
+        """
+        offset, size, method, compressed_size = self.members[archive_index][member_index].tolist()
+        if method == zipfile.ZIP_STORED:
+            return memoryview(self.mmaps[archive_index])[offset:offset + size]
+        return zlib.decompress(memoryview(self.mmaps[archive_index])[offset:offset + compressed_size], -15, size)
+
+    @staticmethod
+    def __select_members(member_index: dict, pattern: Optional[str]) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Select the members matching the pattern, sorted by name in natural order (e.g. "2.jpg" before "10.jpg")
+
+        PARAMETERS:
+        -----------
+
+        :param member_index (dict): The member index of the archive
+        :param pattern (Optional[str]): The Unix shell-style pattern of the selected names (all the members if None)
+
+        RETURN:
+        -------
+
+        :return (np.array): The data offset, size, compression method and compressed size of each selected member
+        """
+        names = member_index["names"]
+        selected = [i for i in range(len(names)) if pattern is None or fnmatch.fnmatchcase(names[i], pattern)]
+        selected.sort(key=lambda i: natural_sort_key(names[i]))
+        return np.array(member_index["members"], dtype=np.int64).reshape(-1, 4)[selected]
+
+    @staticmethod
+    def __get_member_index(filename: str) -> dict:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the member index of an archive (name, data offset, size, compression method and compressed size of each file)
+        The index is read from its sidecar file if the archive did not change, else the archive is indexed again
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the archive
+
+        RETURN:
+        -------
+
+        :return (dict): The member index of the archive
+        """
+        stat = os.stat(filename)
+        index_path = filename + DEEP_EXT_ARCHIVE_INDEX
+
+        # Reuse the sidecar file
+        try:
+            with open(index_path, "r") as f:
+                member_index = json.load(f)
+            if member_index["version"] == ARCHIVE_INDEX_VERSION \
+                    and member_index["size"] == stat.st_size \
+                    and member_index["mtime_ns"] == stat.st_mtime_ns:
+                return member_index
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # Index the members
+        Notification(DEEP_NOTIF_INFO, "Indexing the members of the archive : %s" % filename)
+        if filename.endswith(DEEP_EXT_ZIP):
+            names, members = Archive.__index_zip(filename)
+        else:
+            names, members = Archive.__index_tar(filename)
+
+        member_index = {
+            "version": ARCHIVE_INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "names": names,
+            "members": members
+        }
+
+        # Cache the index next to the archive, kept in memory only if the directory is read-only
+        try:
+            with open(index_path + ".tmp", "w") as f:
+                json.dump(member_index, f)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError as e:
+            Notification(DEEP_NOTIF_DEBUG, "Could not write the member index of %s : %s" % (filename, str(e)))
+        return member_index
+
+    @staticmethod
+    def __index_tar(filename: str) -> Tuple[List[str], List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Index the regular files of an uncompressed tar archive
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the tar archive
+
+        RETURN:
+        -------
+
+        :return names (List[str]): The name of each member
+        :return members (List[int]): The data offset, size, compression method and compressed size of each member (flattened)
+        """
+        names = []
+        members = []
+        try:
+            with tarfile.open(filename, "r:") as tar:
+                for member in tar:
+                    if member.isreg():
+                        names.append(member.name)
+                        members += [member.offset_data, member.size, zipfile.ZIP_STORED, member.size]
+        except tarfile.ReadError:
+            Notification(DEEP_NOTIF_FATAL, "The following archive is not an uncompressed tar archive : %s" % filename,
+                         solutions="Compressed tar archives (e.g. .tar.gz) cannot be read at random, decompress the archive first")
+        return names, members
+
+    @staticmethod
+    def __index_zip(filename: str) -> Tuple[List[str], List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Index the files of a zip archive
+        The data of a member starts after its local header, whose length is read from the archive
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the zip archive
+
+        RETURN:
+        -------
+
+        :return names (List[str]): The name of each member
+        :return members (List[int]): The data offset, size, compression method and compressed size of each member (flattened)
+        """
+        names = []
+        members = []
+        with open(filename, "rb") as f, zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or info.flag_bits & 0x1:
+                    Notification(DEEP_NOTIF_FATAL, "The member %s of %s is encrypted or compressed with an unsupported method" % (info.filename, filename),
+                                 solutions="Store or deflate the members of the zip archive")
+                f.seek(info.header_offset)
+                header = ZIP_LOCAL_HEADER.unpack(f.read(ZIP_LOCAL_HEADER.size))
+                if header[0] != ZIP_LOCAL_SIGNATURE:
+                    Notification(DEEP_NOTIF_FATAL, "The following zip archive is corrupted : %s" % filename)
+                names.append(info.filename)
+                members += [
+                    info.header_offset + ZIP_LOCAL_HEADER.size + header[-2] + header[-1],
+                    info.file_size,
+                    info.compress_type,
+                    info.compress_size
+                ]
+        return names, members
+
+    @staticmethod
+    def __list_files(path: str) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        List the archives in the given path
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): Path to an archive or to a directory of archives
+
+        RETURN:
+        -------
+
+        :return (List[str]): The sorted list of archives
+        """
+        if os.path.isfile(path):
+            return [path]
+        elif os.path.isdir(path):
+            return sorted_nicely(
+                ["/".join([path, f]) for f in os.listdir(path) if f.endswith((DEEP_EXT_TAR, DEEP_EXT_ZIP))]
+            )
+        else:
+            Notification(DEEP_NOTIF_FATAL, "The following path is not an archive or a directory : %s" % path)
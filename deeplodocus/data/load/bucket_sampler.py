@@ -0,0 +1,200 @@
+# Python imports
+from typing import Any
+from typing import List
+from typing import Iterator
+from typing import Optional
+
+# Third party libs
+import numpy as np
+from torch.utils.data import Sampler
+
+# Deeplodocus imports
+from deeplodocus.utils import distributed
+from deeplodocus.utils.notification import Notification
+from deeplodocus.utils.generic_utils import get_corresponding_flag
+
+# Deeplodocus flags
+from deeplodocus.flags import *
+
+
+class BucketBatchSampler(Sampler):
+    """
+    DESCRIPTION:
+    ------------
+
+    Batch sampler grouping the instances of a Dataset into buckets of similar items,
+    so that the items of a batch can be padded to the largest item of the batch instead of a fixed shape
+
+    The instances are grouped by the aspect ratio (width / height) or by the length (size of the first axis)
+    of the items of an Entry, read once from the headers of the files and stored in the manifest of the Dataset.
+    The buckets are quantiles of the aspect ratios or lengths, so they hold about the same number of instances.
+
+    Each batch is taken from a single bucket, in the order of the instances of the Dataset (i.e. after Dataset.shuffle).
+    If shuffle is enabled, the order of the batches of all the buckets is shuffled at each epoch.
+    """
+
+    def __init__(self,
+                 dataset: Any,
+                 batch_size: int,
+                 bucket_by: Flag = DEEP_BUCKET_ASPECT,
+                 num_buckets: int = 8,
+                 entry: int = 0,
+                 shuffle: bool = True,
+                 drop_last: bool = False,
+                 seed: Optional[int] = None):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the sampler and compute the bucket of each raw instance of the Dataset
+
+        PARAMETERS:
+        -----------
+
+        :param dataset (Dataset): The Dataset
+        :param batch_size (int): The number of instances in a batch
+        :param bucket_by (Flag): Whether to group the instances by aspect ratio or by length
+        :param num_buckets (int): The number of buckets
+        :param entry (int): The index of the Entry whose items define the buckets
+        :param shuffle (bool): Whether to shuffle the order of the batches at each epoch
+        :param drop_last (bool): Whether to drop the incomplete batch of each bucket
+        :param seed (Optional[int]): The seed of the shuffling of the batches
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        super(BucketBatchSampler, self).__init__()
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.bucket_by = get_corresponding_flag(DEEP_LIST_BUCKET, bucket_by)
+        self.num_buckets = max(int(num_buckets), 1)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+        self.buckets = self.__compute_buckets(entry)
+
+        # Number of batches of each epoch (equalized between the processes once per epoch, see __equalize)
+        self.num_batches = self.__count_batches()
+        if self.dataset.world_size > 1:
+            self.num_batches = self.__get_num_batches(self.num_batches)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the batches of the next epoch
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Iterator[List[int]]): The indices of the instances of each batch
+        """
+        if self.seed is not None:
+            random_state = np.random.RandomState((self.seed + self.epoch) % 2 ** 32)
+        else:
+            random_state = np.random
+        self.epoch += 1
+
+        batches = self.__get_batches()
+        if self.shuffle:
+            batches = [batches[i] for i in random_state.permutation(len(batches))]
+        return iter(self.__equalize(batches))
+
+    def __len__(self) -> int:
+        if self.dataset.world_size > 1:
+            return self.num_batches
+        return self.__count_batches()
+
+    def __count_batches(self) -> int:
+        # Number of batches of the instances of the current process
+        counts = np.bincount(self.buckets[self.dataset.get_instance_indices()], minlength=self.num_buckets)
+        if self.drop_last:
+            return int(np.sum(counts // self.batch_size))
+        return int(np.sum(-(-counts // self.batch_size)))
+
+    def __get_batches(self) -> List[List[int]]:
+        # The stable sort keeps the order of the instances (e.g. shuffled) within each bucket
+        buckets = self.buckets[self.dataset.get_instance_indices()]
+        indices = np.argsort(buckets, kind="stable")
+        batches = []
+        for bucket_indices in np.split(indices, np.cumsum(np.bincount(buckets, minlength=self.num_buckets))[:-1]):
+            for start in range(0, len(bucket_indices), self.batch_size):
+                batch = bucket_indices[start:start + self.batch_size]
+                if len(batch) == self.batch_size or (len(batch) and not self.drop_last):
+                    batches.append(batch.tolist())
+        return batches
+
+    def __equalize(self, batches: List[List[int]]) -> List[List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Give the same number of batches to all the processes of a distributed training
+        The number of incomplete batches depends on the instances of each process, so the batches of the processes
+        with fewer batches are repeated until they have as many batches as the process with the most batches
+        The number of batches is gathered once per epoch (collective call) and stored for __len__
+
+        PARAMETERS:
+        -----------
+
+        :param batches (List[List[int]]): The batches of the current process
+
+        RETURN:
+        -------
+
+        :return (List[List[int]]): The batches of the current process
+        """
+        if self.dataset.world_size == 1:
+            return batches
+        self.num_batches = self.__get_num_batches(len(batches))
+        if not batches:
+            return batches
+        return (batches * -(-self.num_batches // len(batches)))[:self.num_batches]
+
+    @staticmethod
+    def __get_num_batches(num_batches: int) -> int:
+        # Largest number of batches of the processes (collective call, made by every process)
+        return max(distributed.gather_values({"num_batches": [num_batches]})["num_batches"])
+
+    def __compute_buckets(self, entry: int) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the bucket of each raw instance from the shape of its item in the selected Entry
+
+        PARAMETERS:
+        -----------
+
+        :param entry (int): The index of the Entry whose items define the buckets
+
+        RETURN:
+        -------
+
+        :return (np.array): The bucket of each raw instance
+        """
+        shapes = self.dataset.get_item_shapes(entry)
+        if DEEP_BUCKET_ASPECT.corresponds(self.bucket_by):
+            if any([len(shape) < 2 for shape in shapes]):
+                Notification(DEEP_NOTIF_FATAL, "The items of the entry %i of the dataset %s have no aspect ratio" % (entry, self.dataset.name),
+                             solutions="Group the instances by length, or select an entry of images (see dataloader: bucket_entry)")
+            keys = np.log([max(shape[1], 1) / max(shape[0], 1) for shape in shapes])
+        else:
+            keys = np.array([shape[0] if len(shape) else 0 for shape in shapes], dtype=np.float64)
+
+        # Quantiles of the keys (duplicated boundaries are merged, e.g. if most items have the same shape)
+        boundaries = np.unique(np.quantile(keys, np.linspace(0, 1, self.num_buckets + 1)[1:-1]))
+        buckets = np.searchsorted(boundaries, keys, side="right")
+        Notification(DEEP_NOTIF_INFO, "Dataset %s grouped by %s into %i buckets" % (
+            self.dataset.name, self.bucket_by.names[0], len(np.unique(buckets))
+        ))
+        return buckets
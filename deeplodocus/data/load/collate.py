@@ -0,0 +1,206 @@
+# Python imports
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Optional
+
+# Third party libs
+import numpy as np
+import torch
+from torch.utils.data import get_worker_info
+from torch.utils.data.dataloader import default_collate
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+
+class Collate(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Collate function of the DataLoader writing the items of each entry straight into a single batch tensor
+
+    The instances are not formatted by the Dataset (see Dataset.create_collate) : for each entry, a contiguous tensor
+    of the size of the whole batch is allocated once and each item is written into its slot, converted to the
+    data type of the entry (convert_to) and with its axes moved (move_axis) in the same copy.
+    The batch tensor is allocated in shared memory in the DataLoader workers (the batch is not copied again to be
+    sent to the main process) and in pinned memory in the main process if required (faster copies to the GPU).
+
+    Items of different shapes are padded to the largest item of the batch if padding is enabled (see BucketBatchSampler).
+    Items which are not numeric arrays (e.g. strings, dictionaries) are formatted one by one and collated by PyTorch.
+    """
+
+    def __init__(self, formats: Any, pad: bool = False, pin_memory: bool = False):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the collate function
+
+        PARAMETERS:
+        -----------
+
+        :param formats (Any): The format (convert_to, move_axis, pad_value) of each entry, in the structure of the instances
+        :param pad (bool): Whether to pad the items of different shapes to the largest item of the batch
+        :param pin_memory (bool): Whether to allocate the batches in pinned memory (main process only)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.formats = formats
+        self.pad = pad
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+
+    def __call__(self, batch: List[Any]) -> Any:
+        return self.__collate(batch, self.formats)
+
+    def __collate(self, batch: List[Any], fmt: Any) -> Any:
+        """
+        DESCRIPTION:
+        ------------
+
+        Collate the items of an entry, or recursively the items of each entry of a list of entries
+
+        PARAMETERS:
+        -----------
+
+        :param batch (List[Any]): The items of the batch
+        :param fmt (Any): The format of the entry (or the formats of the entries)
+
+        RETURN:
+        -------
+
+        :return (Any): The batch
+        """
+        if isinstance(fmt, list):
+            return [self.__collate(list(items), f) for items, f in zip(zip(*batch), fmt)]
+
+        convert_to, move_axis, pad_value = fmt
+        items = [np.asarray(item) for item in batch]
+        if any([item.dtype.kind not in "biuf" for item in items]):
+            return default_collate([format_item(item, convert_to, move_axis) for item in items])
+
+        shape, dtype = get_batch_layout(items, convert_to, move_axis, pad_value if self.pad else None)
+        padded = any([item.shape != items[0].shape for item in items])
+        batch = self.__allocate(shape, dtype)
+        if padded:
+            batch.fill_(pad_value)
+        write_batch(batch.numpy(), items, move_axis)
+        return batch
+
+    def __allocate(self, shape: Tuple[int, ...], dtype: np.dtype) -> torch.Tensor:
+        """
+        DESCRIPTION:
+        ------------
+
+        Allocate a batch tensor, in shared memory in a DataLoader worker or in pinned memory if required
+
+        PARAMETERS:
+        -----------
+
+        :param shape (Tuple[int, ...]): The shape of the batch
+        :param dtype (np.dtype): The data type of the batch
+
+        RETURN:
+        -------
+
+        :return (torch.Tensor): The uninitialized batch
+        """
+        torch_dtype = torch.from_numpy(np.empty(0, dtype=dtype)).dtype
+        if get_worker_info() is not None:
+            # Same allocation as the default collate of PyTorch in a worker
+            tensor = torch.empty(0, dtype=torch_dtype)
+            storage = tensor._typed_storage()._new_shared(int(np.prod(shape)), device=tensor.device)
+            return tensor.new(storage).resize_(*shape)
+        return torch.empty(shape, dtype=torch_dtype, pin_memory=self.pin_memory)
+
+
+def get_batch_layout(items: List[np.array],
+                     convert_to: Optional[str] = None,
+                     move_axis: Optional[List[int]] = None,
+                     pad_value: Optional[float] = None) -> Tuple[Tuple[int, ...], np.dtype]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get the shape and the data type of the batch of the formatted items of an entry
+
+    PARAMETERS:
+    -----------
+
+    :param items (List[np.array]): The items of the entry (before formatting)
+    :param convert_to (Optional[str]): The data type of the entry (None to keep the data type of the items)
+    :param move_axis (Optional[List[int]]): The new order of the axes of the items
+    :param pad_value (Optional[float]): The padding value, None if the items must have the same shape
+
+    RETURN:
+    -------
+
+    :return (Tuple[Tuple[int, ...], np.dtype]): The shape and the data type of the batch
+    """
+    shapes = set([item.shape for item in items])
+    if len(shapes) > 1 and (pad_value is None or len(set([len(shape) for shape in shapes])) > 1):
+        Notification(DEEP_NOTIF_FATAL, "Could not stack the items of a batch with the shapes %s" % ", ".join([str(s) for s in shapes]),
+                     solutions="Make sure all the items of an entry have the same shape (e.g. with a resize transform)")
+    shape = tuple(np.max(list(shapes), axis=0)) if len(shapes) > 1 else items[0].shape
+    if move_axis is not None:
+        try:
+            # Shape of the transposed items (a broadcast array does not allocate any memory)
+            shape = np.transpose(np.broadcast_to(False, shape), move_axis).shape
+        except ValueError as e:
+            Notification(DEEP_NOTIF_FATAL, "Could not transpose data with shape %s by %s : %s" % (shape, move_axis, str(e)))
+
+    if convert_to is not None:
+        dtype = np.dtype(convert_to)
+    else:
+        dtype = items[0].dtype
+        for item in items[1:]:
+            dtype = np.promote_types(dtype, item.dtype)
+        # The data type is promoted if the padding value cannot be stored in it (e.g. -1 for uint8 images)
+        if len(shapes) > 1:
+            value = int(pad_value) if float(pad_value).is_integer() else pad_value
+            if not np.can_cast(np.min_scalar_type(value), dtype):
+                dtype = np.promote_types(dtype, np.min_scalar_type(value))
+    return (len(items),) + tuple([int(n) for n in shape]), dtype
+
+
+def write_batch(batch: np.array, items: List[np.array], move_axis: Optional[List[int]] = None) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Write each item into its slot of the batch, converting its data type and moving its axes in a single copy
+    A smaller item is written at the start of each axis of its slot (the rest of the slot is the padding)
+
+    PARAMETERS:
+    -----------
+
+    :param batch (np.array): The batch (see get_batch_layout)
+    :param items (List[np.array]): The items (before formatting)
+    :param move_axis (Optional[List[int]]): The new order of the axes of the items
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    for i, item in enumerate(items):
+        if move_axis is not None:
+            item = np.transpose(item, move_axis)
+        # The slot is sliced (not indexed) so that scalar items are written into a view of the batch too
+        np.copyto(batch[(slice(i, i + 1),) + tuple([slice(0, n) for n in item.shape])], item, casting="unsafe")
+
+
+def format_item(item: np.array, convert_to: Optional[str] = None, move_axis: Optional[List[int]] = None) -> np.array:
+    # Format a single item (as Formatter.format does)
+    if convert_to is not None:
+        item = item.astype(convert_to)
+    if move_axis is not None:
+        item = np.transpose(item, move_axis)
+    return item
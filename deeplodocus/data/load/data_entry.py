@@ -3,15 +3,22 @@ from typing import List
 from typing import Any
 from typing import Tuple
 from typing import Union
+from typing import Optional
+from typing import Iterator
+import os
+import itertools
 import weakref
+import bisect
+import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.utils.notification import Notification
 from deeplodocus.data.load.source import Source
 from deeplodocus.data.load.source_wrapper import SourceWrapper
 from deeplodocus.data.load.source_pointer import SourcePointer
-from deeplodocus.utils.generic_utils import get_module, get_corresponding_flag
+from deeplodocus.utils.generic_utils import get_module, get_corresponding_flag, ProgressBar
 from deeplodocus.data.load.loader import Loader
+from deeplodocus.data.load.item_cache import ItemCache
 
 # Import flags
 from deeplodocus.flags import *
@@ -47,7 +54,13 @@ class Entry(object):
                  dataset: weakref,
                  load_as: str,
                  enable_cache: bool = False,
-                 cv_library: Union[str, None, Flag] = DEEP_LIB_OPENCV):
+                 cv_library: Union[str, None, Flag] = DEEP_LIB_OPENCV,
+                 decode_threads: int = 1,
+                 decoded_cache_size: int = 0,
+                 decoded_cache_item_size: Optional[float] = None,
+                 mmap_mode: Optional[str] = None,
+                 npz_handles: int = 16,
+                 decode_scale: Union[int, str] = 1):
 
         """
         AUTHORS:
@@ -64,7 +77,12 @@ class Entry(object):
         -----------
 
         :param dataset(weakref): Weak reference to the dataset
-        :param
+        :param decode_threads(int): Number of threads decoding the items of a sequence or a batch concurrently
+        :param decoded_cache_size(int): Size (in MB) of the cache of decoded items shared by the DataLoader workers (0 to disable)
+        :param decoded_cache_item_size(Optional[float]): Maximum size (in MB) of a cached item (None for the size of the first item)
+        :param mmap_mode(Optional[str]): Memory-map mode of the .npy files loaded (None to read the whole arrays)
+        :param npz_handles(int): Number of .npz files kept open by each process
+        :param decode_scale(Union[int, str]): Factor by which the images are reduced when decoded (1, 2, 4, 8 or "auto")
 
         RETURN:
         -------
@@ -80,10 +98,16 @@ class Entry(object):
         self.loader = Loader(
             data_entry=weakref.ref(self),
             load_as=load_as,
-            cv_library=cv_library
+            cv_library=cv_library,
+            decode_threads=decode_threads,
+            mmap_mode=mmap_mode,
+            npz_handles=npz_handles,
+            decode_scale=decode_scale
         )
 
         self.sources = list()  # List of sources into the entry
+        self.source_starts = None  # Index of the first instance of each reachable Source in the Entry
+        self.pointer_sources = None  # Whether each Source is a SourcePointer
         self.enable_cache = enable_cache  # Enable cache memory for pointer
 
         # Cache Memory for pointers
@@ -93,6 +117,28 @@ class Entry(object):
             self.cache_memory = None
         self.num_instances = None
 
+        # Cache of decoded items shared by the DataLoader workers (created when the Dataset is checked)
+        self.decoded_cache_size = decoded_cache_size
+        self.decoded_cache_item_size = decoded_cache_item_size
+        self.item_cache = None
+        self.source_fingerprints = None
+
+        # Shape and data type of the first decoded item (computed once, or read from the manifest of the Dataset)
+        self.sample = None
+
+        # Shape of each item (computed on demand, e.g. to group the instances into buckets, or read from the manifest)
+        self.shapes = None
+
+    def __getstate__(self) -> dict:
+        # Weak references cannot be pickled, the Dataset is pickled instead (see __setstate__)
+        state = self.__dict__.copy()
+        state["dataset"] = self.dataset()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["dataset"] = weakref.ref(state["dataset"])
+        self.__dict__.update(state)
+
     def __getitem__(self, index: int):
         """
         AUTHORS:
@@ -117,7 +163,16 @@ class Entry(object):
         items, is_loaded, is_transformed = s.__getitem__(instance_index)
 
         if is_loaded is False:
-            items = self.loader.load_from_str(items)
+            if self.item_cache is None:
+                items = self.loader.load_from_str(items)
+            else:
+                version = self.__get_item_version(source_index, items)
+                cached = self.item_cache.get(index, version)
+                if cached is None:
+                    items = self.loader.load_from_str(items)
+                    self.item_cache.put(index, items, version)
+                else:
+                    items = cached
 
         # If cache memory enabled, store the items in cache
         if self.enable_cache is True:
@@ -129,6 +184,188 @@ class Entry(object):
 
         return items, is_transformed
 
+    def stream(self, start: int = 0, step: int = 1) -> Iterator[Tuple[Any, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Yield the items of the indices start, start + step, start + 2 * step, ... (streaming mode)
+        A limited Entry is read cyclically
+        An unlimited Entry yields the items of its limited Source instances, then the stream of its unlimited Source
+        No index of the items is kept, so the memory used does not grow with the number of streamed items
+
+        PARAMETERS:
+        -----------
+
+        :param start (int): The index of the first item
+        :param step (int): The step between two indices (number of partitions)
+
+        RETURN:
+        -------
+
+        :return (Iterator[Tuple[Any, bool]]): The loaded items and whether they are already transformed
+        """
+        if self.source_starts is None:
+            self.compute_source_starts()
+
+        # Limited Entry
+        if self.num_instances is not None:
+            for index in itertools.count(start, step):
+                yield self.__getitem__(index % self.num_instances)
+
+        # Limited Source instances before the unlimited Source
+        index = start
+        offset = self.source_starts[-1]
+        while index < offset:
+            yield self.__getitem__(index)
+            index += step
+
+        # Unlimited Source
+        s = self.sources[len(self.source_starts) - 1]
+        for items, is_loaded, is_transformed in s.stream(index - offset, step):
+            if is_loaded is False:
+                items = self.loader.load_from_str(items)
+            if self.enable_cache is True:
+                self.cache_memory = items
+            if isinstance(items, tuple):
+                items = items[s.get_instance_id()]
+            yield items, is_transformed
+
+    def get_batch(self, indices: List[int]) -> Tuple[List[Any], List[bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items of a whole batch of indices
+        The indices are grouped by Source instance so each Source can read all its items at once
+        Does not support SourcePointer instances (they rely on the cache of a single item)
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the items in the Entry
+
+        RETURN:
+        -------
+
+        :return items (List[Any]): The loaded items
+        :return are_transformed (List[bool]): Whether each item is already transformed
+        """
+        items = [None] * len(indices)
+        are_transformed = [False] * len(indices)
+
+        # Compute the Source ID and the Instance ID in the Source of every index at once
+        source_indices, instance_indices = self.compute_source_indices(indices)
+
+        for source_index in np.unique(source_indices):
+            positions = np.flatnonzero(source_indices == source_index)
+            s = self.sources[source_index]
+
+            # Get the items from the Source instance
+            outputs = s.get_batch(instance_indices[positions].tolist())
+            for position, (item, _, is_transformed) in zip(positions, outputs):
+                items[position] = item
+                are_transformed[position] = is_transformed
+
+            # Load all the items of the Source at once
+            unloaded = [position for position, output in zip(positions, outputs) if output[1] is False]
+            if self.item_cache is None:
+                for position, item in zip(unloaded, self.loader.load_batch([items[p] for p in unloaded])):
+                    items[position] = item
+            else:
+                self.__load_batch_from_cache(indices, items, unloaded, source_index)
+
+            # The item is either the unique item returned or the desired item of the list
+            for position in positions:
+                if isinstance(items[position], tuple):
+                    items[position] = items[position][s.get_instance_id()]
+
+        return items, are_transformed
+
+    def __load_batch_from_cache(self, indices: List[int], items: List[Any], unloaded: List[int], source_index: int) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Load the items of a batch coming from the same Source, using the cache of decoded items
+        Only the items missing from the cache are decoded (all at once) and then stored in the cache
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the items of the batch in the Entry
+        :param items (List[Any]): The raw items of the batch (replaced in place by the loaded items)
+        :param unloaded (List[int]): The positions of the items to load in the batch
+        :param source_index (int): The index of the Source of the items
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        misses = list()
+        versions = dict()
+        for position in unloaded:
+            versions[position] = self.__get_item_version(source_index, items[position])
+            cached = self.item_cache.get(int(indices[position]), versions[position])
+            if cached is None:
+                misses.append(position)
+            else:
+                items[position] = cached
+
+        for position, item in zip(misses, self.loader.load_batch([items[p] for p in misses])):
+            items[position] = item
+            self.item_cache.put(int(indices[position]), item, versions[position])
+
+    def __get_item_version(self, source_index: int, item: Any) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the version of a raw item stored in the cache of decoded items
+        The version changes when the Source changes, or when the file of the item changes if the item is a path
+
+        PARAMETERS:
+        -----------
+
+        :param source_index (int): The index of the Source of the item
+        :param item (Any): The raw item (as given by the Source)
+
+        RETURN:
+        -------
+
+        :return (int): The version of the item
+        """
+        fingerprint = self.source_fingerprints[source_index]
+        if isinstance(item, str):
+            try:
+                stat = os.stat(item)
+                return hash((fingerprint, stat.st_size, stat.st_mtime_ns))
+            except (OSError, ValueError):
+                pass
+        return fingerprint
+
+    def has_source_pointers(self) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check whether any Source of the Entry is a SourcePointer instance
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the Entry contains a SourcePointer instance
+        """
+        if self.pointer_sources is None:
+            self.compute_source_starts()
+        return any(self.pointer_sources)
+
     def __len__(self) -> Union[int, None]:
         """
         AUTHORS:
@@ -153,6 +390,26 @@ class Entry(object):
         """
         return self.num_instances
 
+    def get_raw_item(self, index: int) -> Tuple[Any, bool, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get an item as given by its Source instance, without loading it
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): Index of the item in the Entry
+
+        RETURN:
+        -------
+
+        :return (Tuple[Any, bool, bool]): The raw item, whether it is loaded, whether it is transformed
+        """
+        source_index, instance_index = self.__compute_source_indices(index=index)
+        return self.sources[source_index].__getitem__(instance_index)
+
     def get_first_item(self) -> Any:
         """
         AUTHORS:
@@ -231,6 +488,7 @@ class Entry(object):
         ------------
 
         Compute the source index
+        The Source is found by bisecting the index of the first instance of each Source (O(log S))
 
         PARAMETERS:
         -----------
@@ -242,25 +500,67 @@ class Entry(object):
 
         :return (Tuple[int, int]): [The index of the source to load from, The index of the instance in the source]
         """
+        if self.source_starts is None:
+            self.compute_source_starts()
+
+        if self.num_instances is not None and index >= self.num_instances:
+            Notification(DEEP_NOTIF_DEBUG, "Error in computing the source index... Please check the algorithm")
+            return None
+
+        source_index = bisect.bisect_right(self.source_starts, index) - 1
+        return source_index, index - self.source_starts[source_index]
+
+    def compute_source_indices(self, indices: Union[List[int], np.array]) -> Tuple[np.array, np.array]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the source index and the index of the instance in the source for a whole batch of indices at once
+
+        PARAMETERS:
+        -----------
+
+        :param indices (Union[List[int], np.array]): The indices of the data to load
+
+        RETURN:
+        -------
+
+        :return (Tuple[np.array, np.array]): [The indices of the sources to load from, The indices of the instances in the sources]
+        """
+        if self.source_starts is None:
+            self.compute_source_starts()
 
-        # Initialize a temporary index and a temporary variable for a previous index
-        temp_index = 0
-        prev_temp_index = 0
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = np.asarray(self.source_starts, dtype=np.int64)
+        source_indices = np.searchsorted(starts, indices, side="right") - 1
+        return source_indices, indices - starts[source_indices]
 
-        # For each source
-        for i, source in enumerate(self.sources):
+    def compute_source_starts(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
 
-            # Add the length of the Source to the temp variable
-            temp_index += source.get_num_instances()
+        Compute the cumulative offsets of the Source instances (index of the first instance of each Source)
+        An unlimited Source takes all the following indices, the Source instances after it are never reached
 
-            # If the index is smaller than the summed of th Sources, return the index of the Source and the relative index of the instance within this Source
-            if index < temp_index:
-                return i, index - prev_temp_index
+        PARAMETERS:
+        -----------
 
-            # Else update the temp value
-            prev_temp_index = temp_index
+        None
 
-        Notification(DEEP_NOTIF_DEBUG, "Error in computing the source index... Please check the algorithm")
+        RETURN:
+        -------
+
+        :return: None
+        """
+        starts = [0]
+        for source in self.sources[:-1]:
+            length = source.get_num_instances()
+            if length is None:
+                break
+            starts.append(starts[-1] + length)
+        self.source_starts = starts
+        self.pointer_sources = [isinstance(s, SourcePointer) for s in self.sources]
 
     def get_item_from_cache(self, index: int)-> Any:
         """
@@ -452,19 +752,18 @@ class Entry(object):
         :return is_pointer (bool): Whether the Source instance require for a specific index is a SourcePointer instance
         """
 
-        is_pointer = False
+        if self.pointer_sources is None:
+            self.compute_source_starts()
+
+        # Entry instances without any SourcePointer are the most common
+        if not any(self.pointer_sources):
+            return False
 
         # Compute the Source ID which will be called
         source_index, _ = self.__compute_source_indices(index=index)
 
-        # Get the specific Source instance
-        source = self.sources[source_index]
-
         # Check if it is a SourcePointer instance
-        if isinstance(source, SourcePointer):
-            is_pointer = True
-
-        return is_pointer
+        return self.pointer_sources[source_index]
 
     def compute_num_raw_instances(self) -> None:
         """
@@ -510,6 +809,9 @@ class Entry(object):
         # The length of the Entry is the sum of all the Source instances length
         self.num_instances = sum(source_lengths)
 
+        # Update the cumulative offsets of the Source instances
+        self.compute_source_starts()
+
     ############
     # CHECKERS #
     ############
@@ -546,6 +848,9 @@ class Entry(object):
         for i in range(len(self.sources)):
             self.sources[i].verify_custom_source()
 
+        # Compute the cumulative offsets of the Source instances
+        self.compute_source_starts()
+
     def check_loader(self):
         """
         AUTHORS:
@@ -575,6 +880,104 @@ class Entry(object):
     # CHECKERS #
     ############
 
+    def check_item_cache(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the cache of decoded items if requested
+        The size of a slot of the cache is the maximum size of an item if given, else the size of the first decoded item of the Entry
+        Must be called in the main process, before the DataLoader workers are started
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.item_cache = None
+        if not self.decoded_cache_size:
+            return
+
+        entry_info = self.get_info()
+        if self.num_instances is None or self.has_source_pointers():
+            Notification(DEEP_NOTIF_WARNING, "The cache of decoded items is not available for unlimited Entry instances or Entry instances with a SourcePointer : disabled for %s" % entry_info)
+            return
+
+        # The first decoded item gives the size of the slots if their size is not given
+        sample = self.get_sample()
+        if sample is None or sample["dtype"] is None or np.dtype(sample["dtype"]) == object:
+            Notification(DEEP_NOTIF_WARNING, "The cache of decoded items only stores numpy arrays : disabled for %s" % entry_info)
+            return
+
+        self.source_fingerprints = [s.get_fingerprint() for s in self.sources]
+        self.item_cache = ItemCache(
+            budget=int(self.decoded_cache_size * 1024 * 1024),
+            num_keys=self.num_instances,
+            slot_size=int(np.prod(sample["shape"])) * np.dtype(sample["dtype"]).itemsize
+            if not self.decoded_cache_item_size else int(self.decoded_cache_item_size * 1024 * 1024),
+            name=entry_info
+        )
+
+    def get_sample(self) -> Optional[dict]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the shape and the data type of the first decoded item of the Entry
+        The first item is decoded only if the sample is unknown (not computed yet and not read from the manifest)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Optional[dict]): The shape and the data type of the item (None for the items of an unlimited Entry)
+        """
+        if self.sample is None and self.num_instances:
+            first_item, _ = self.__getitem__(0)
+            if isinstance(first_item, np.ndarray):
+                self.sample = {"shape": list(first_item.shape), "dtype": first_item.dtype.str}
+            else:
+                self.sample = {"shape": None, "dtype": None, "type": type(first_item).__name__}
+        return self.sample
+
+    def get_shapes(self) -> List[List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the shape of each item of the Entry (before any transform)
+        The shapes are computed only if they are unknown (not computed yet and not read from the manifest),
+        the headers of the image and .npy files are read instead of decoding the items when possible (see Loader.get_shape)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[List[int]]): The shape of each item
+        """
+        if self.shapes is None:
+            shapes = []
+            progress_bar = ProgressBar(self.num_instances, prefix="Reading the shapes of the entry %s :" % self.get_info())
+            for index in range(self.num_instances):
+                item, is_loaded, _ = self.get_raw_item(index)
+                shapes.append(list(np.shape(item)) if is_loaded else self.loader.get_shape(item))
+                progress_bar.step()
+            self.shapes = shapes
+        return self.shapes
+
     def check_type_sources(self, s: Any, source_index: int) -> None:
         """
         AUTHORS:
@@ -4,18 +4,38 @@ from typing import Optional
 from typing import Any
 from typing import Tuple
 from typing import Union
+from typing import Iterator
 import weakref
+import itertools
 import numpy as np
-import random
+import os
+import time
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 
 # Deeplodocus imports
 from deeplodocus.data.load.data_entry import Entry
 from deeplodocus.utils.notification import Notification
 from deeplodocus.data.load.source_pointer import SourcePointer
 from deeplodocus.data.load.pipeline_entry import PipelineEntry
+from deeplodocus.data.load.shard import ShardWriter
+from deeplodocus.data.load.manifest import Manifest
+from deeplodocus.data.load.manifest import normalize
+from deeplodocus.data.load.manifest import stamp
+from deeplodocus.data.load.scan import ScanReport
+from deeplodocus.data.load.collate import Collate
+from deeplodocus.data.load.transform_cache import TransformCache
+from deeplodocus.data.load.scan import init_scan_worker
+from deeplodocus.data.load.scan import scan_chunk
+from deeplodocus.data.load.scan import describe_error
 from deeplodocus.data.transform.transform_manager import TransformManager
-from deeplodocus.utils.generic_utils import get_corresponding_flag, list_namespace2list_dict
+from deeplodocus.data.transform.transformer.transformer import Transformer
+from deeplodocus.app.transforms.images import resize
+from deeplodocus.utils.generic_utils import get_corresponding_flag, list_namespace2list_dict, ProgressBar
 from deeplodocus.utils.namespace import Namespace
+from deeplodocus.utils import get_main_path
 
 # Deeplodocus flags
 from deeplodocus.flags import *
@@ -43,12 +63,19 @@ class Dataset(object):
                  num_instances: int,
                  transform_manager: Optional[TransformManager],
                  use_raw_data: bool = True,
+                 steps_per_epoch: Optional[int] = None,
+                 manifest: bool = True
                  ):
 
         entries = list_namespace2list_dict(entries)
         self.name = name  # Name of the Dataset
         self.type = get_corresponding_flag(DEEP_LIST_DATASET, type)
 
+        # Metadata of the Dataset kept between two runs (lengths, load_as, samples), see Manifest
+        self.manifest = Manifest(
+            "%s/data/manifests/%s_%s.json" % (get_main_path(), self.name, self.type.names[0])
+        ) if manifest else None
+
         # List containing the Entry instances
         self.entries = []
         self.__generate_entries(entries=entries)
@@ -57,15 +84,42 @@ class Dataset(object):
         self.pipeline_entries = []
         self.__generate_pipeline_entries(entries=entries)
 
-        self.number_raw_instances = self.__calculate_number_raw_instances()  # Number of raw instances
-        self.length = self.__compute_length(
-            desired_length=num_instances,
-            num_raw_instances=self.number_raw_instances
-        )  # Length of the Dataset
-
-        self.item_order = np.arange(self.length)  # List of items indices
+        self.number_raw_instances = self.__calculate_number_raw_instances()  # Number of raw instances (None if unlimited)
+        self.steps_per_epoch = steps_per_epoch  # Number of instances streamed in each epoch (unlimited Dataset only)
+        if self.number_raw_instances is None:
+            self.length = None
+            self.__check_steps_per_epoch()
+        else:
+            self.length = self.__compute_length(
+                desired_length=num_instances,
+                num_raw_instances=self.number_raw_instances
+            )  # Length of the Dataset
+
+        # Sharding of the instances between the processes (see set_shard)
+        self.rank = 0
+        self.world_size = 1
+        self.seed = None
+        self.drop_last = False
+
+        # Random generators of the transforms (see get_random_state)
+        self.epoch = 0
+        self.transform_seed = int(np.random.randint(2 ** 31))  # Used if the Dataset is not seeded, drawn once and shared by the workers
+
+        # List of items indices (of the current process), None if unlimited
+        self.item_order = np.arange(self.length) if self.length is not None else None
         self.use_raw_data = use_raw_data  # Whether we want to use raw data or only transformed data
         self.transform_manager = transform_manager
+        self.pad_batches = False  # Whether the items of a batch are padded to the largest item (see set_padding)
+        self.format_in_collate = False  # Whether the items are formatted by the collate function (see create_collate)
+
+        # Static plan followed to get each instance (see __compile_plan)
+        self.entry_order = None
+        self.entry_slots = None
+        self.entry_transformers = None
+        self.entry_random_keys = None
+        self.transform_caches = None
+        self.plan_transform_manager = None
+        self.__compile_plan()
 
     def __getitem__(self, index: int):
         """
@@ -93,25 +147,12 @@ class Dataset(object):
 
         :return item(List[Any]): The list of items at the desired index in each Entry instance
         """
-        i = index
-        # If the dataset is not unlimited
-        if self.length is not None:
-            # If the index given is too big => Error
-            if index >= self.length:
-                Notification(DEEP_NOTIF_FATAL, "The requested instance is too big compared to the size of the Dataset : " + str(index))
-            # Else we get the random generated index
-            else:
-                index = self.item_order[index]
+        # A list of indices is given by the batch sampler
+        if isinstance(index, list):
+            return self.get_batch(index)
 
-            # If we ask for a not existing index we use the modulo and consider the data to have to be augmented
-            if index >= self.number_raw_instances:
-                augment = True
-            # If we ask for a raw data, augment it only if required by the user
-            else:
-                augment = not self.use_raw_data
-        else:
-            index = 0
-            augment = True
+        i = index
+        index, augment = self.__compute_instance_index(index)
 
         # Get the index of the original instance (before transformation)
         index_raw_instance = index % self.number_raw_instances
@@ -132,17 +173,125 @@ class Dataset(object):
                 }
             )
 
-        # Convert to numpy array
-        items = self.__convert_to_numpy(items)
-
-        # Format
-        items = self.__format(items)
+        # Convert to numpy array and format (unless the collate function writes the formatted items into the batch)
+        if not self.format_in_collate:
+            items = self.__format(items)
 
         # Get Inputs, Labels, Additional Data
         inputs, labels, additional_data = self.__split_data_by_entry_type(items)
 
         return inputs, labels, additional_data
 
+    def get_batch(self, indices: List[int]) -> Tuple[List[Any], List[Any], List[Any]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items of a whole mini-batch, already collated
+        1) Each Entry loads the items of all the indices at once (grouped by Source instance)
+        2) The items of each Entry are transformed together (see Transformer.transform_batch)
+        3) The items of each Entry are formatted into a single array (see Formatter.format_batch)
+
+        The output has the same structure as the default collation of __getitem__ outputs
+        Dataset instances with SourcePointer instances load the items one instance at a time
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the desired instances
+
+        RETURN:
+        -------
+
+        :return inputs (List[Any]): The list of inputs
+        :return labels (List[Any]): The list of labels
+        :return additional_data (List[Any]): The list of additional data
+        """
+        # Compute the index of each original instance (before transformation)
+        instances = [self.__compute_instance_index(index) for index in indices]
+        raw_indices = [index % self.number_raw_instances for index, _ in instances]
+
+        # Load the items of each Entry
+        if any([entry.has_source_pointers() for entry in self.entries]):
+            # SourcePointer instances require the items to be loaded one instance at a time
+            samples = [self.__load_from_entries(index) for index in raw_indices]
+            batch = [[sample[0][i] for sample in samples] for i in range(len(self.entries))]
+            are_transformed = [[sample[1][i] for sample in samples] for i in range(len(self.entries))]
+        else:
+            batch = []
+            are_transformed = []
+            for entry in self.entries:
+                items, transformed = entry.get_batch(raw_indices)
+                batch.append(items)
+                are_transformed.append(transformed)
+
+        # Transform the items of each Entry at once (pointer transformers are given the random generators
+        # and the transforms to replay of the pointed entry, see Transformer.apply_transforms)
+        if self.transform_manager is not None:
+            transformers = self.__get_transformers()
+            replays = {}
+            for i, items in enumerate(batch):
+                selected = [j for j in range(len(items)) if transformers[i] is not None and are_transformed[i][j] is False]
+                if not selected:
+                    continue
+                replay = replays.setdefault(self.entry_random_keys[i], [{} for _ in indices])
+                transformed = self.__transform_items(
+                    i,
+                    [instances[j] for j in selected],
+                    [items[j] for j in selected],
+                    [{"index": indices[j], "idn": instances[j][0]} for j in selected],
+                    [replay[j] for j in selected]
+                )
+                for j, item in zip(selected, transformed):
+                    items[j] = item
+
+        # Format the items of each Entry into a single array
+        batch = [
+            pipeline_entry.format_batch(items, pad=self.pad_batches)
+            for pipeline_entry, items in zip(self.pipeline_entries, batch)
+        ]
+
+        # Get Inputs, Labels, Additional Data
+        return self.__split_data_by_entry_type(batch)
+
+    def __compute_instance_index(self, index: int) -> Tuple[int, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the index of the instance corresponding to an index of the Dataset and whether it has to be augmented
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): Index of the desired instance
+
+        RETURN:
+        -------
+
+        :return index (int): The index of the instance (after shuffling)
+        :return augment (bool): Whether the instance has to be augmented
+        """
+        # If the dataset is not unlimited
+        if self.length is not None:
+            # If the index given is too big => Error
+            if index >= len(self.item_order):
+                Notification(DEEP_NOTIF_FATAL, "The requested instance is too big compared to the size of the Dataset : " + str(index))
+            # Else we get the random generated index
+            else:
+                index = self.item_order[index]
+
+            # If we ask for a not existing index we use the modulo and consider the data to have to be augmented
+            if index >= self.number_raw_instances:
+                augment = True
+            # If we ask for a raw data, augment it only if required by the user
+            else:
+                augment = not self.use_raw_data
+        else:
+            index = 0
+            augment = True
+        return index, augment
+
     def __len__(self):
         """
         AUTHORS:
@@ -164,10 +313,81 @@ class Dataset(object):
         -------
 
         :return self.num_instances (Union[int, None]): The number of instances within the Dataset (None is unlimited Entry)
+        The number of instances of the current process is returned if the Dataset is sharded
         """
-        return self.length
+        if self.length is None:
+            return self.length
+        return len(self.item_order)
 
-    def shuffle(self, method: Flag, verbose: bool = True) -> None:
+    def set_shard(self, rank: int = 0, world_size: int = 1, seed: Optional[int] = None, drop_last: bool = False) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Split the instances of the Dataset between several processes (e.g. distributed training)
+        All the processes compute the same order of the instances (seeded with the seed and the epoch) and
+        each process takes a disjoint slice of it (every world_size-th instance starting at its rank).
+        The order is padded with its first instances (or the last instances are dropped) so that all the processes
+        get the same number of instances.
+
+        PARAMETERS:
+        -----------
+
+        :param rank (int): The rank of the current process
+        :param world_size (int): The number of processes
+        :param seed (Optional[int]): The seed of the shuffling (required to shuffle with several processes)
+        :param drop_last (bool): Whether to drop the last instances instead of padding the order
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if world_size > 1 and seed is None:
+            Notification(DEEP_NOTIF_FATAL, "A seed is required to shard the Dataset %s between %i processes" % (self.name, world_size))
+        self.rank = rank
+        self.world_size = world_size
+        self.seed = seed
+        self.drop_last = drop_last
+        if self.length is not None:
+            self.item_order = self.__shard(np.arange(self.length))
+        if world_size > 1:
+            Notification(DEEP_NOTIF_INFO, "Dataset %s sharded : %i instances for the process %i of %i" % (
+                self.name, len(self), rank, world_size
+            ))
+
+    def __shard(self, order: np.array) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the slice of an order of instances corresponding to the current process
+
+        PARAMETERS:
+        -----------
+
+        :param order (np.array): The order of all the instances
+
+        RETURN:
+        -------
+
+        :return (np.array): The order of the instances of the current process
+        """
+        if self.world_size == 1:
+            return order
+        if self.drop_last:
+            total = len(order) // self.world_size * self.world_size
+        else:
+            total = -(-len(order) // self.world_size) * self.world_size
+        # np.resize repeats the first instances to pad the order
+        return np.resize(order, total)[self.rank::self.world_size]
+
+    def shuffle(self,
+                method: Flag,
+                verbose: bool = True,
+                epoch: Optional[int] = None,
+                block_size: int = 64,
+                window: int = 1024) -> None:
         """
         AUTHORS:
         --------
@@ -183,20 +403,50 @@ class Dataset(object):
         -----------
 
         :param method: (Flag): The shuffling method Flag
+        :param verbose (bool): Whether to notify the shuffling
+        :param epoch (Optional[int]): The epoch, combined with the seed of the Dataset (if any) to seed the shuffling and the transforms
+        :param block_size (int): The number of consecutive instances in a block (block shuffling only)
+        :param window (int): The number of instances shuffled together after shuffling the blocks (block shuffling only)
 
         RETURN:
         -------
 
         :return: None
         """
+        # The random generators of the transforms change at each epoch
+        if epoch is not None:
+            self.epoch = epoch
+
+        # An unlimited Dataset is streamed in the order the items are produced
+        if self.length is None:
+            return
+
+        # Random generator shared by all the processes if the Dataset is seeded
+        if self.seed is not None:
+            random_state = np.random.RandomState((self.seed + (0 if epoch is None else epoch)) % 2 ** 32)
+        else:
+            random_state = np.random
+
         # No shuffling
         if DEEP_SHUFFLE_NONE.corresponds(info=method):
-            self.item_order = np.arange(self.length)
+            self.item_order = self.__shard(np.arange(self.length))
             if verbose:
                 Notification(DEEP_NOTIF_INFO, DEEP_MSG_NO_SHUFFLE)
         # Shuffle all
         elif DEEP_SHUFFLE_ALL.corresponds(info=method):
-            self.item_order = random.sample(range(0, self.number_raw_instances), self.length)
+            order = random_state.permutation(max(self.length, self.number_raw_instances))[:self.length]
+            self.item_order = self.__shard(order)
+            if verbose:
+                Notification(DEEP_NOTIF_INFO, DEEP_MSG_SHUFFLE_COMPLETE % method.name)
+        # Shuffle blocks of consecutive instances, then the instances within a window
+        elif DEEP_SHUFFLE_BLOCKS.corresponds(info=method):
+            order = self.__block_permutation(
+                num_instances=max(self.length, self.number_raw_instances),
+                block_size=block_size,
+                window=window,
+                random_state=random_state
+            )
+            self.item_order = self.__shard(order[:self.length])
             if verbose:
                 Notification(DEEP_NOTIF_INFO, DEEP_MSG_SHUFFLE_COMPLETE % method.name)
         # Bad flag
@@ -205,6 +455,193 @@ class Dataset(object):
         # Reset the TransformManager
         self.reset()
 
+    @staticmethod
+    def __block_permutation(num_instances: int, block_size: int, window: int, random_state) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a permutation keeping the reads mostly sequential
+        1) The instances are split into blocks of consecutive instances and the order of the blocks is shuffled
+        2) The instances within each window of consecutive positions are shuffled, mixing the instances of
+        window / block_size blocks
+
+        Sources reading files sequentially (File, Shard, ...) then mostly read neighbouring instances,
+        which benefits from the page cache and the read-ahead of the OS
+
+        PARAMETERS:
+        -----------
+
+        :param num_instances (int): The number of instances
+        :param block_size (int): The number of consecutive instances in a block
+        :param window (int): The number of instances shuffled together
+        :param random_state: The random generator (np.random or np.random.RandomState)
+
+        RETURN:
+        -------
+
+        :return (np.array): The permutation
+        """
+        block_size = max(int(block_size), 1)
+        window = max(int(window), 1)
+
+        # Shuffle the blocks
+        num_blocks = -(-num_instances // block_size)
+        blocks = random_state.permutation(num_blocks)
+        order = (blocks[:, np.newaxis] * block_size + np.arange(block_size)).ravel()
+        order = order[order < num_instances]
+
+        # Shuffle within each window (sort by window index, then by a random key)
+        keys = np.arange(num_instances) // window + random_state.random_sample(num_instances)
+        return order[np.argsort(keys, kind="stable")]
+
+    def set_padding(self, pad_batches: bool) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Set whether the items of a batch (see get_batch) are padded to the largest item of the batch
+        (e.g. batches of a BucketBatchSampler), each axis is padded at its end with the pad value of the entry
+
+        PARAMETERS:
+        -----------
+
+        :param pad_batches (bool): Whether to pad the items of a batch
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.pad_batches = pad_batches
+
+    def create_collate(self, pin_memory: bool = False) -> Collate:
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the collate function of the DataLoader writing the formatted items straight into the batch tensors
+        The instances are not formatted anymore by __getitem__, the collate function does it (see Collate)
+
+        PARAMETERS:
+        -----------
+
+        :param pin_memory (bool): Whether the collate function allocates the batches in pinned memory
+
+        RETURN:
+        -------
+
+        :return (Collate): The collate function
+        """
+        self.format_in_collate = True
+        formats = [pipeline_entry.get_format() for pipeline_entry in self.pipeline_entries]
+        return Collate(list(self.__split_data_by_entry_type(formats)), pad=self.pad_batches, pin_memory=pin_memory)
+
+    def get_instance_indices(self) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the index of the raw instance of each instance of the current process (in the current order)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (np.array): The index of the raw instance of each instance
+        """
+        return self.item_order % self.number_raw_instances
+
+    def get_item_shapes(self, entry_index: int) -> List[List[int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the shape of the item of each raw instance in an Entry (before any transform, see Entry.get_shapes)
+        The shapes are stored in the manifest, so they are read from the files only once
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the Entry
+
+        RETURN:
+        -------
+
+        :return (List[List[int]]): The shape of the item of each raw instance
+        """
+        entry = self.entries[entry_index]
+        if self.number_raw_instances is None or entry.has_source_pointers():
+            Notification(DEEP_NOTIF_FATAL, "The shapes of the items of the entry %s of the dataset %s cannot be read" % (
+                entry.get_info(), self.name
+            ), solutions="Select an entry without source pointer in a dataset which is not unlimited")
+        if entry.shapes is None:
+            entry.get_shapes()
+            self.__update_manifest(self.manifest_configs)
+        return entry.shapes
+
+    def is_unlimited(self) -> bool:
+        return self.length is None
+
+    def stream(self, start: int = 0, step: int = 1, num_instances: Optional[int] = None) -> Iterator[Tuple[List[Any], List[Any], List[Any]]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Yield the instances of a partition of the Dataset (streaming mode, see StreamDataset)
+        The partition is made of the instances start, start + step, start + 2 * step, ...
+        Each Entry streams its items (the unlimited Source instances yield the items as they are produced),
+        the items of each instance are then transformed and formatted as in __getitem__
+
+        PARAMETERS:
+        -----------
+
+        :param start (int): The index of the first instance of the partition
+        :param step (int): The step between two instances of the partition (number of partitions)
+        :param num_instances (Optional[int]): The number of instances to yield (None for an endless stream)
+
+        RETURN:
+        -------
+
+        :return (Iterator[Tuple[List[Any], List[Any], List[Any]]]): The inputs, labels and additional data of each instance
+        """
+        if any([entry.has_source_pointers() for entry in self.entries]):
+            Notification(DEEP_NOTIF_FATAL, "The Dataset %s cannot be streamed : SourcePointer instances are not supported in streaming mode" % self.name)
+
+        streams = [entry.stream(start, step) for entry in self.entries]
+        try:
+            for k in itertools.count() if num_instances is None else range(num_instances):
+                index = start + k * step
+                items, are_transformed = [], []
+                for stream in streams:
+                    item, is_transformed = next(stream)
+                    items.append(item)
+                    are_transformed.append(is_transformed)
+
+                # Transform items
+                if self.transform_manager is not None:
+                    items = self.__transform(
+                        index=index,
+                        items=items,
+                        are_transformed=are_transformed,
+                        augment=not self.use_raw_data,
+                        info={
+                            "index": index,
+                            "idn": index
+                        }
+                    )
+
+                # Format and split the items
+                yield self.__split_data_by_entry_type(self.__format(items))
+        finally:
+            # Release the Source instances (e.g. connections to the producers)
+            for stream in streams:
+                stream.close()
+
     def reset(self) -> None:
         """
         AUTHORS:
@@ -227,35 +664,264 @@ class Dataset(object):
         if self.transform_manager is not None:
             self.transform_manager.reset()
 
-    def summary(self):
-        print("Sorry : to be implemented (dataset line ~ 224")
+    def summary(self,
+                report: Optional[str] = None,
+                num_workers: Optional[int] = None,
+                chunk_size: int = 256,
+                num_slowest: int = 20,
+                restart: bool = False
+                ) -> dict:
+        """
+        DESCRIPTION:
+        ------------
 
-    def __load_from_entries(self, index):
+        Scan the Dataset in a pool of processes and display a report (see ScanReport)
+        Each raw instance is loaded and transformed (with the augmentations) once :
+            - The unreadable or corrupted items are reported instead of stopping the scan
+            - The type, shape, data type and channels of the decoded items are counted
+            - The load latency of each Entry, the transform latency of the instances and the slowest items are measured
 
-        # Initialize an empty list of N items (N = number of entries) for storing the items
-        items = [None for _ in range(len(self.entries))]
+        The report is written in a JSON file during the scan, an interrupted scan is resumed from this file
 
-        # Initialize an empty list of N items (N = number of entries) for storing if items are transformed
-        are_transformed = [False for _ in range(len(self.entries))]
+        PARAMETERS:
+        -----------
 
-        # Get a temporary order of Entry instances in order to get the item from SourcePointer after normal Source instances
-        temp_order = self.__generate_temporary_entries_order(index=index)
+        :param report (Optional[str]): The path of the report (default: data/reports/<name>_<type>.json)
+        :param num_workers (Optional[int]): The number of processes (number of CPUs by default, 0 to scan in the current process)
+        :param chunk_size (int): The number of instances scanned by a process at once
+        :param num_slowest (int): The number of slowest items reported for each Entry
+        :param restart (bool): Whether to scan the whole Dataset again instead of resuming the previous scan
 
-        # For each entry, get the data
-        for i in range(len(self.entries)):
+        RETURN:
+        -------
 
-            # Get the temporary index
-            temp_index = temp_order[i]
+        :return (dict): The content of the report
+        """
+        if self.number_raw_instances is None:
+            Notification(DEEP_NOTIF_FATAL, "The dataset %s is unlimited and cannot be scanned" % self.name)
+        if report is None:
+            report = "%s/data/reports/%s_%s.json" % (get_main_path(), self.name, self.type.names[0])
+        num_workers = os.cpu_count() if num_workers is None else num_workers
+
+        scan = ScanReport(path=report, dataset=self, chunk_size=chunk_size, num_slowest=num_slowest, restart=restart)
+        chunks = scan.get_remaining_chunks()
+        if chunks:
+            Notification(DEEP_NOTIF_INFO, "Scanning the dataset %s (%i instances, %i processes)" % (
+                self.name, self.number_raw_instances, num_workers
+            ))
+            progress_bar = ProgressBar(scan.get_num_chunks(), prefix="Scanning :")
+            progress_bar.iteration = scan.get_num_chunks() - len(chunks)
+            executor = None
+            futures = []
+            try:
+                if num_workers == 0:
+                    init_scan_worker(self)
+                    for chunk in chunks:
+                        scan.add(scan_chunk(*chunk, num_slowest=num_slowest))
+                        progress_bar.step()
+                else:
+                    # The workers get a copy of the Dataset once, then only the ranges of indices are sent
+                    executor = ProcessPoolExecutor(max_workers=num_workers, initializer=init_scan_worker, initargs=(self,))
+                    futures = [executor.submit(scan_chunk, *chunk, num_slowest=num_slowest) for chunk in chunks]
+                    for future in as_completed(futures):
+                        scan.add(future.result())
+                        progress_bar.step()
+            finally:
+                if executor is not None:
+                    # The pending chunks are cancelled if the scan is interrupted
+                    for future in futures:
+                        future.cancel()
+                    executor.shutdown(wait=True)
+                scan.save()
+        scan.summary()
+        return scan.content
+
+    def scan_instance(self, index: int) -> Tuple[List[Any], List[Optional[float]], List[Optional[str]], Optional[float], Optional[str]]:
+        """
+        DESCRIPTION:
+        ------------
 
-            # Get entry of the temporary index
-            entry = self.entries[temp_index]
+        Load and transform a raw instance, measuring the latency of each step and catching the errors (see summary)
+        The instance is transformed only if the items of all the Entry instances could be loaded
 
-            # Get instance
-            instance, is_transformed = entry.__getitem__(index)
+        PARAMETERS:
+        -----------
 
-            # Add instance to the list at the right location
-            items[temp_index] = instance
-            are_transformed[temp_index] = is_transformed
+        :param index (int): The index of the raw instance
+
+        RETURN:
+        -------
+
+        :return items (List[Any]): The loaded item of each Entry (before any transform, None if unreadable)
+        :return load_times (List[Optional[float]]): The load latency of each Entry (in seconds, None if unreadable)
+        :return errors (List[Optional[str]]): The error raised by each Entry (None if the item was loaded)
+        :return transform_time (Optional[float]): The transform latency (in seconds, None if not transformed)
+        :return transform_error (Optional[str]): The error raised by the transforms (None if transformed or not transformed)
+        """
+        items = [None] * len(self.entries)
+        are_transformed = [False] * len(self.entries)
+        load_times = [None] * len(self.entries)
+        errors = [None] * len(self.entries)
+
+        order = self.entry_order if self.entry_order is not None else self.__generate_temporary_entries_order(index=index)
+        for i in order:
+            t0 = time.perf_counter()
+            try:
+                items[i], are_transformed[i] = self.entries[i].__getitem__(index)
+                load_times[i] = time.perf_counter() - t0
+            except Exception as e:
+                errors[i] = describe_error(e)
+
+        transform_time = None
+        transform_error = None
+        if self.transform_manager is not None and all([error is None for error in errors]):
+            t0 = time.perf_counter()
+            try:
+                self.__transform(
+                    index=index,
+                    items=list(items),
+                    are_transformed=are_transformed,
+                    augment=True,
+                    info={"index": index, "idn": index}
+                )
+                transform_time = time.perf_counter() - t0
+            except Exception as e:
+                transform_error = describe_error(e)
+        return items, load_times, errors, transform_time, transform_error
+
+    def compile(self, directory: str, decoded: bool = True, shard_size: int = 1024) -> List[List[dict]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compile the raw instances of every Entry into packed binary shards (one directory per Entry)
+        The shards can then be used with the Shard Source instead of the original Source instances
+
+        If decoded is True, the loaded items are stored and the Loader is skipped when reading the shards
+        Otherwise the content of the image and numpy files is stored and decoded by the Loader when reading the shards
+        Items from SourcePointer instances and from already loaded Source instances are always stored loaded
+
+        PARAMETERS:
+        -----------
+
+        :param directory (str): The directory to write the shards into
+        :param decoded (bool): Whether to store the loaded items or the raw content of the files
+        :param shard_size (int): The maximum size of a shard (in MB)
+
+        RETURN:
+        -------
+
+        :return sources (List[List[dict]]): The configuration of the Shard Source of each Entry
+        """
+        # Check which Entry instances can store the raw content of their files
+        raw = []
+        for entry in self.entries:
+            raw.append(
+                not decoded
+                and (DEEP_LOAD_AS_IMAGE.corresponds(entry.loader.load_as)
+                     or DEEP_LOAD_AS_NP_ARRAY.corresponds(entry.loader.load_as))
+                and all([not s.is_loaded and not isinstance(s, SourcePointer) for s in entry.sources])
+            )
+
+        # Create a writer for each Entry
+        writers = []
+        for i, entry in enumerate(self.entries):
+            writers.append(ShardWriter(
+                directory="%s/%i_%s" % (directory, i, entry.get_info()),
+                shard_size=shard_size * 1024 * 1024,
+                metadata={
+                    "dataset": self.name,
+                    "entry": entry.get_info(),
+                    "is_loaded": not raw[i],
+                    "is_transformed": False
+                }
+            ))
+
+        # Only load the items stored loaded, and the items of the raw entries they point to
+        loaded = [i for i in range(len(self.entries)) if not raw[i]]
+        for i in list(loaded):
+            for source in self.entries[i].sources:
+                if isinstance(source, SourcePointer) and source.get_entry_index() not in loaded:
+                    loaded.append(source.get_entry_index())
+
+        Notification(DEEP_NOTIF_INFO, "Compiling the dataset %s into %s" % (self.name, directory))
+        progress_bar = ProgressBar(self.number_raw_instances, prefix="Compiling :")
+        for index in range(self.number_raw_instances):
+            items, are_transformed = self.__load_from_entries(index, entries=loaded)
+            for i, entry in enumerate(self.entries):
+                if raw[i]:
+                    writers[i].write(self.__read_raw_item(entry.get_raw_item(index)[0]))
+                else:
+                    writers[i].write(items[i])
+                writers[i].metadata["is_transformed"] |= are_transformed[i]
+            progress_bar.step()
+
+        sources = []
+        for writer in writers:
+            writer.close()
+            sources.append([{"name": "Shard", "module": None, "kwargs": {"path": writer.directory}}])
+            Notification(DEEP_NOTIF_SUCCESS, "%i items of the entry %s written into %i shards in %s" % (
+                writer.num_items, writer.metadata["entry"], writer.num_shards, writer.directory
+            ))
+        return sources
+
+    def __read_raw_item(self, item: Union[str, List[str]]) -> Union[bytes, List[bytes]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the content of the file(s) an item points to
+
+        PARAMETERS:
+        -----------
+
+        :param item (Union[str, bytes, List[str]]): The path (or the sequence of paths) to read, or the content itself
+
+        RETURN:
+        -------
+
+        :return (Union[bytes, List[bytes]]): The content of the file(s)
+        """
+        if isinstance(item, list):
+            return [self.__read_raw_item(i) for i in item]
+        # Content already read (e.g. members of an Archive)
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            return bytes(item)
+        if not os.path.isfile(item):
+            Notification(DEEP_NOTIF_FATAL, DEEP_MSG_FILE_NOT_FOUND % item)
+        with open(item, "rb") as f:
+            return f.read()
+
+    def __load_from_entries(self, index: int, entries: Optional[List[int]] = None) -> Tuple[List[Any], List[bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items of an instance from each Entry
+        The Entry instances calling SourcePointer instances are loaded last (the order is static without SourcePointer)
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the raw instance
+        :param entries (Optional[List[int]]): The indices of the Entry instances to load (all if None, the items of the others are None)
+
+        RETURN:
+        -------
+
+        :return items (List[Any]): The item of each Entry
+        :return are_transformed (List[bool]): Whether each item is already transformed
+        """
+        items = [None] * len(self.entries)
+        are_transformed = [False] * len(self.entries)
+
+        # Get the order of Entry instances in order to get the item from SourcePointer after normal Source instances
+        order = self.entry_order if self.entry_order is not None else self.__generate_temporary_entries_order(index=index)
+
+        # For each entry, get the data and add it to the list at the right location
+        for i in order:
+            if entries is None or i in entries:
+                items[i], are_transformed[i] = self.entries[i].__getitem__(index)
 
         return items, are_transformed
 
@@ -278,25 +944,136 @@ class Dataset(object):
         :param items (List[Any]): The data to transform
         :param are_transformed (List[bool]): Whether the instances were transformed (1 item per Entry)
         :param augment (bool): Whether we should perform a transformation to the item
+        :param info: The information about the instance given to the transforms
 
         RETURN:
         -------
 
         :return items (Any): The transformed data
         """
+        # Transforms to replay on the entries pointing to the same transformer (see Transformer.apply_transforms)
+        replays = {}
+
         # For each item check if they have to be transformed
-        for i, item in enumerate(items):
-            # If not transformed => Call the TransformManager
-            if are_transformed[i] is False:
-                items[i] = self.transform_manager.transform(
-                    data=item,
-                    entry=self.pipeline_entries[i],
-                    index=index,
-                    augment=augment,
-                    info=info
-                )
+        for i, transformer in enumerate(self.__get_transformers()):
+            # If not transformed => Call the transformer of the Entry
+            if transformer is not None and are_transformed[i] is False:
+                items[i] = self.__transform_item(i, index, items[i], augment, info, replays.setdefault(self.entry_random_keys[i], {}))
         return items
 
+    def __transform_item(self, entry_index: int, index: int, item: Any, augment: bool, info=None, replay: Optional[dict] = None) -> Any:
+        """
+        DESCRIPTION:
+        ------------
+
+        Transform an item with the transformer of its PipelineEntry
+        If the PipelineEntry has a TransformCache, the output of the deterministic start of the transformer is read
+        from the cache (or computed and cached the first time) and only the following transforms are applied
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the PipelineEntry
+        :param index (int): The index of the instance
+        :param item (Any): The item to transform
+        :param augment (bool): Whether we should perform a transformation to the item
+        :param info: The information about the instance given to the transforms
+        :param replay (Optional[dict]): The transforms to replay on the entries pointing to the same transformer
+
+        RETURN:
+        -------
+
+        :return (Any): The transformed item
+        """
+        transformer = self.entry_transformers[entry_index]
+        rng = self.get_random_state(index, entry_index)
+        kwargs = {"replay": replay} if isinstance(transformer, Transformer) else {}
+        if self.transform_caches[entry_index] is None:
+            return transformer.transform(item, index, augment=augment, info=info, rng=rng, **kwargs)
+        item = self.__read_transform_cache(entry_index, index, item, info, rng)
+        return transformer.transform(item, index, augment=augment, info=info, rng=rng, cached=True, **kwargs)
+
+    def __transform_items(self,
+                          entry_index: int,
+                          instances: List[Tuple[int, bool]],
+                          items: List[Any],
+                          info: List[Any],
+                          replay: List[dict]) -> List[Any]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Transform the items of a PipelineEntry for a whole batch
+        The transforms with a batched implementation are applied to all the items at once (see Transformer.transform_batch),
+        each item is given the same random generator as in __transform_item so it is transformed the same way
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the PipelineEntry
+        :param instances (List[Tuple[int, bool]]): The index of each instance and whether it is augmented
+        :param items (List[Any]): The items to transform
+        :param info (List[Any]): The information about each instance given to the transforms
+        :param replay (List[dict]): The transforms to replay on the entries pointing to the same transformer, for each instance
+
+        RETURN:
+        -------
+
+        :return (List[Any]): The transformed items
+        """
+        transformer = self.entry_transformers[entry_index]
+
+        # Custom transformers without batch mode transform the items one by one
+        if not hasattr(transformer, "transform_batch"):
+            return [
+                self.__transform_item(entry_index, index, item, augment, info[j], replay[j])
+                for j, ((index, augment), item) in enumerate(zip(instances, items))
+            ]
+
+        indices = [index for index, _ in instances]
+        augment = [augment for _, augment in instances]
+        rng = [self.get_random_state(index, entry_index) for index in indices]
+        cached = [self.transform_caches[entry_index] is not None] * len(items)
+        if self.transform_caches[entry_index] is not None:
+            items = [self.__read_transform_cache(entry_index, indices[j], item, info[j], rng[j]) for j, item in enumerate(items)]
+        return transformer.transform_batch(items, indices, augment, info=info, rng=rng, cached=cached, replay=replay)
+
+    def __read_transform_cache(self, entry_index: int, index: int, item: Any, info: Any, rng: np.random.RandomState) -> Any:
+        # Read the output of the deterministic start of the transformer from the TransformCache (computed and cached the first time)
+        transformer = self.entry_transformers[entry_index]
+        cache = self.transform_caches[entry_index]
+        key = index % self.number_raw_instances
+        cached_item = cache.get(key)
+        if cached_item is None:
+            cached_item = transformer.apply_transforms(item, transformer.get_deterministic_start(), info=info, rng=rng)
+            cache.put(key, cached_item)
+        return cached_item
+
+    def get_random_state(self, index: int, entry_index: int) -> np.random.RandomState:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the random generator of the transforms of an item
+        The generator is seeded with the seed of the Dataset, the epoch, the index of the instance and the transformer,
+        so the transforms of an instance do not depend on the DataLoader worker or on the order of the items and can be replayed.
+        The entries pointing to the same transformer get the same generator, so they are transformed the same way.
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the instance (see __compute_instance_index)
+        :param entry_index (int): The index of the PipelineEntry of the item
+
+        RETURN:
+        -------
+
+        :return (np.random.RandomState): The random generator of the item
+        """
+        self.__get_transformers()
+        seed = self.transform_seed if self.seed is None else self.seed
+        return np.random.RandomState([seed % 2 ** 32, self.epoch % 2 ** 32, index % 2 ** 32, self.entry_random_keys[entry_index]])
+
     def __format(self, items: List[Any]) -> List[Any]:
         """
         AUTHORS:
@@ -307,7 +1084,7 @@ class Dataset(object):
         DESCRIPTION:
         ------------
 
-        Format the data
+        Convert the data to numpy arrays and format them
 
         PARAMETERS:
         -----------
@@ -320,14 +1097,10 @@ class Dataset(object):
         :return items (Any): The formatted data
         """
         for i, pipeline_entry in enumerate(self.pipeline_entries):
-            items[i] = pipeline_entry.format(items[i])
+            items[i] = pipeline_entry.format(np.array(items[i]))
 
         return items
 
-    @staticmethod
-    def __convert_to_numpy(items: List[Any]) -> List[Any]:
-        return [np.array(i) for i in items]
-
     def __split_data_by_entry_type(self, items: List[Any]) -> Tuple[List[Any], List[Any], List[Any]]:
         """
         AUTHORS:
@@ -352,31 +1125,14 @@ class Dataset(object):
         :return labels (List[Any]): The list of labels
         :return additional_data (List[Any]): The list of additional data
         """
-        # Initialize lists which will store the input, label and additional_data items
-        inputs = list()
-        labels = list()
-        additional_data = list()
-
-        # We redirect the item to its corresponding PipelineEntry
-        for i, pipeline_entry in enumerate(self.pipeline_entries):
+        # Lists which will store the input, label and additional_data items
+        outputs = ([], [], [])
 
-            # INPUTS
-            if DEEP_ENTRY_INPUT.corresponds(pipeline_entry.get_entry_type()):
-                inputs.append(items[i])
-
-            # LABELS
-            elif DEEP_ENTRY_LABEL.corresponds(pipeline_entry.get_entry_type()):
-                labels.append(items[i])
-
-            # ADDITIONAL DATA
-            elif DEEP_ENTRY_ADDITIONAL_DATA.corresponds(pipeline_entry.get_entry_type()):
-                additional_data.append(items[i])
-
-        # # If the entry is an input and is single element list we return it as a list so it can be correctly unpacked in the trainer
-        # if DEEP_ENTRY_INPUT.corresponds(info=entry_type()) and len(data) == 1:
-        #     return [data]
-        # else:
-        #     return data
+        # We redirect the item to its slot (computed once from the type of its PipelineEntry)
+        for i, slot in enumerate(self.entry_slots):
+            if slot is not None:
+                outputs[slot].append(items[i])
+        inputs, labels, additional_data = outputs
 
         # # If the entry is an input and is single element list we return it as a list so it can be correctly unpacked in the trainer
         if len(inputs) == 1:
@@ -384,6 +1140,168 @@ class Dataset(object):
 
         return inputs, labels, additional_data
 
+    def __compile_plan(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute once what does not change from an instance to another:
+            1) The order in which the Entry instances are loaded (only static without SourcePointer instances)
+            2) The slot (inputs, labels or additional data) of the item of each PipelineEntry
+            3) The transformer of each PipelineEntry (see __get_transformers)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        # 1) Entry instances calling SourcePointer instances are reordered for each instance
+        if any([entry.has_source_pointers() for entry in self.entries]):
+            self.entry_order = None
+        else:
+            self.entry_order = list(range(len(self.entries)))
+
+        # 2) Slot of each PipelineEntry
+        self.entry_slots = []
+        for pipeline_entry in self.pipeline_entries:
+            entry_type = pipeline_entry.get_entry_type()
+            if DEEP_ENTRY_INPUT.corresponds(entry_type):
+                self.entry_slots.append(0)
+            elif DEEP_ENTRY_LABEL.corresponds(entry_type):
+                self.entry_slots.append(1)
+            elif DEEP_ENTRY_ADDITIONAL_DATA.corresponds(entry_type):
+                self.entry_slots.append(2)
+            else:
+                self.entry_slots.append(None)
+
+        # 3) Transformers
+        self.__get_transformers()
+
+    def __get_transformers(self) -> list:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the transformer of each PipelineEntry (None if the items of the PipelineEntry are not transformed)
+        The transformers are resolved again only if the TransformManager is replaced
+        The random key of each PipelineEntry is the index of the first PipelineEntry with the same transformer (see get_random_state)
+        The TransformCache of each PipelineEntry is opened again with the transformers (see __create_transform_cache)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (list): The transformer of each PipelineEntry
+        """
+        if self.plan_transform_manager is not self.transform_manager or self.entry_transformers is None:
+            if self.transform_manager is None:
+                self.entry_transformers = [None] * len(self.pipeline_entries)
+            else:
+                self.entry_transformers = [
+                    self.transform_manager.get_transformer(pipeline_entry) for pipeline_entry in self.pipeline_entries
+                ]
+            self.entry_random_keys = [
+                [t is transformer for t in self.entry_transformers].index(True) for transformer in self.entry_transformers
+            ]
+            self.plan_transform_manager = self.transform_manager
+            self.__set_decode_targets()
+            self.transform_caches = [
+                self.__create_transform_cache(i, transformer) for i, transformer in enumerate(self.entry_transformers)
+            ]
+        return self.entry_transformers
+
+    def __create_transform_cache(self, entry_index: int, transformer: Any) -> Optional[TransformCache]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the TransformCache of a PipelineEntry, if it is enabled (see entries: transform_cache)
+        The fingerprint of the cache is a hash of the configuration of the Entry, of the size and the modification time
+        of the files of its Source instances and of the names, modules and kwargs of the transforms of the deterministic start,
+        so that the cache is computed again when any of them changes
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the PipelineEntry
+        :param transformer (Any): The transformer of the PipelineEntry
+
+        RETURN:
+        -------
+
+        :return (Optional[TransformCache]): The TransformCache, None if the items of the PipelineEntry are not cached
+        """
+        entry = self.entries[entry_index]
+        if not self.pipeline_entries[entry_index].transform_cache or transformer is None:
+            return None
+        if not getattr(transformer, "get_deterministic_start", lambda: None)():
+            Notification(DEEP_NOTIF_WARNING, "The transforms of the entry %s of the dataset %s are not cached : "
+                                             "the transformer has no deterministic mandatory transform at start" % (entry.name, self.name),
+                         solutions="Declare the deterministic transforms with the deterministic decorator (deeplodocus.data.transform.deterministic)")
+            return None
+        if self.number_raw_instances is None or entry.has_source_pointers():
+            Notification(DEEP_NOTIF_WARNING, "The transforms of the entry %s of the dataset %s are not cached : "
+                                             "the items of unlimited datasets and source pointers cannot be cached" % (entry.name, self.name))
+            return None
+        files = [s.get_files() for s in entry.sources]
+        if not all(files):
+            Notification(DEEP_NOTIF_WARNING, "The transforms of the entry %s of the dataset %s are not cached : "
+                                             "the changes of a source without files cannot be detected" % (entry.name, self.name),
+                         solutions="Compile the dataset into shards (see Dataset.compile) to cache its transforms")
+            return None
+
+        fingerprint = {
+            "entry": self.manifest_configs[entry_index],
+            "files": [stamp(f) for f in files],
+            "transforms": [
+                {"name": t.name, "module_path": t.module_path, "method": "%s.%s" % (t.method.__module__, t.method.__qualname__), "kwargs": t.kwargs}
+                for t in transformer.get_deterministic_start()
+            ]
+        }
+        return TransformCache(
+            directory="%s/data/transform_cache/%s_%s/%i" % (get_main_path(), self.name, self.type.names[0], entry_index),
+            fingerprint=hashlib.sha1(json.dumps(normalize(fingerprint), sort_keys=True).encode()).hexdigest(),
+            num_keys=self.number_raw_instances,
+            name=entry.name
+        )
+
+    def __set_decode_targets(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Tell the Loader of each Entry with the decode scale "auto" which resize its images go through first (if any)
+        Only the first mandatory transform at the start of the transformer is considered, as it is always applied
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        for entry, transformer in zip(self.entries, self.entry_transformers):
+            if entry.loader.decode_scale != "auto":
+                continue
+            transforms = getattr(transformer, "list_mandatory_transforms_start", None)
+            if transforms and transforms[0].method is resize:
+                kwargs = transforms[0].kwargs
+                entry.loader.set_decode_target(shape=kwargs["shape"], keep_aspect=kwargs.get("keep_aspect", False))
+            else:
+                entry.loader.set_decode_target(shape=None)
+
     def __generate_entries(self, entries: List[dict]) -> None:
         """
         AUTHORS:
@@ -409,6 +1327,10 @@ class Dataset(object):
         # Add indices for Entry instances and Source instances
         entries = self.__generate_entry_and_source_indices(entries)
 
+        # Configuration of the Entry instances as stored in the manifest (before the Source instances are generated)
+        configs = [normalize(entry) for entry in entries]
+        self.manifest_configs = configs
+
         # Generate the entries
         self.__generate_entries_instances(entries)
 
@@ -416,6 +1338,9 @@ class Dataset(object):
         # Does NOT generate the SourcePointer instances
         self.__generate_sources(entries)
 
+        # Reuse the lengths and the metadata of the manifest
+        self.__read_manifest(configs)
+
         # Generate the SourcePointer instances
         self.__generate_source_pointers()
 
@@ -426,6 +1351,80 @@ class Dataset(object):
         # Check entries
         self.__check_entries()
 
+        # Store the lengths and the metadata in the manifest
+        self.__update_manifest(configs)
+
+    def __read_manifest(self, configs: List[dict]) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Reuse the metadata stored in the manifest for what did not change since the last run :
+            1) The length of each Source whose configuration and files did not change (not computed again)
+            2) The load_as and the sample of each Entry whose configuration and Source instances did not change
+               (the first item is not loaded to guess the type of data or the size of the items)
+
+        PARAMETERS:
+        -----------
+
+        :param configs (List[dict]): The configuration of each Entry (normalized)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.manifest is None:
+            return
+        for i, entry in enumerate(self.entries):
+            sources = [(configs[i]["sources"][j], s.get_files()) for j, s in enumerate(entry.sources)]
+            for j, s in enumerate(entry.sources):
+                length = self.manifest.get_source_length(i, j, *sources[j])
+                if s.num_instances is None and length is not None:
+                    s.num_instances = length
+
+            record = self.manifest.get_entry(i, configs[i], sources)
+            if record is not None:
+                if entry.loader.load_as is None:
+                    entry.loader.load_as = record["load_as"]
+                entry.sample = record["sample"]
+                entry.shapes = record.get("shapes")
+
+    def __update_manifest(self, configs: List[dict]) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Store the metadata of the Entry instances and their Source instances in the manifest
+        The first item of an Entry is decoded only if its sample is not known yet
+
+        PARAMETERS:
+        -----------
+
+        :param configs (List[dict]): The configuration of each Entry (normalized)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.manifest is None:
+            return
+        records = []
+        for i, entry in enumerate(self.entries):
+            load_as = entry.loader.load_as
+            records.append({
+                "config": configs[i],
+                "load_as": load_as.names[0] if isinstance(load_as, Flag) else load_as,
+                "sample": None if entry.has_source_pointers() else entry.get_sample(),
+                "shapes": entry.shapes,
+                "sources": [
+                    {"config": configs[i]["sources"][j], "files": stamp(s.get_files()), "length": s.num_instances}
+                    for j, s in enumerate(entry.sources)
+                ]
+            })
+        self.manifest.update(records)
+
     def __generate_pipeline_entries(self, entries: List[dict]) -> None:
         """
         AUTHORS:
@@ -477,6 +1476,8 @@ class Dataset(object):
                 index=entries[i]["index"],
                 convert_to=entries[i]["convert_to"],
                 move_axis=entries[i]["move_axis"],
+                pad_value=entries[i].get("pad_value", 0),
+                transform_cache=entries[i].get("transform_cache", False),
                 entry_type=entry_type,
                 dataset=weakref_dataset,
                 entry_type_index=entry_type_index
@@ -535,7 +1536,13 @@ class Dataset(object):
                       etype=entries[i]["type"],
                       load_as=entries[i]["load_as"],
                       dataset=weakref_dataset,
-                      enable_cache=entries[i]["enable_cache"])
+                      enable_cache=entries[i]["enable_cache"],
+                      decode_threads=entries[i].get("decode_threads", 1),
+                      decoded_cache_size=entries[i].get("decoded_cache_size", 0),
+                      decoded_cache_item_size=entries[i].get("decoded_cache_item_size", None),
+                      mmap_mode=entries[i].get("mmap_mode", None),
+                      npz_handles=entries[i].get("npz_handles", 16),
+                      decode_scale=entries[i].get("decode_scale", 1))
 
             # Add the entry to the list
             generated_entries.append(e)
@@ -821,6 +1828,31 @@ class Dataset(object):
     # CHECKERS #
     ############
 
+    def __check_steps_per_epoch(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check the number of instances streamed in each epoch of an unlimited Dataset
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.steps_per_epoch is None or self.steps_per_epoch <= 0:
+            Notification(
+                DEEP_NOTIF_FATAL,
+                "The Dataset %s is unlimited, the number of instances of an epoch has to be given" % self.name,
+                solutions="Set steps_per_epoch of the dataset %s in the data config" % self.name
+            )
+        Notification(DEEP_NOTIF_INFO, "Dataset %s is unlimited : streaming %i instances per epoch" % (self.name, self.steps_per_epoch))
+
     def __check_num_sources(self):
         if len(self.entries) < 2:
             return True
@@ -844,7 +1876,11 @@ class Dataset(object):
 
     def __check_source_lengths(self):
         for i in range(len(self.entries[0].sources)):
-            num_instances = [e.sources[i].compute_length() for e in self.entries]
+            # The lengths already known (e.g. from the manifest) are not computed again
+            num_instances = [
+                e.sources[i].num_instances if e.sources[i].num_instances is not None else e.sources[i].compute_length()
+                for e in self.entries
+            ]
             if not all([n == num_instances[0] for n in num_instances]):
                 Notification(DEEP_NOTIF_ERROR, "Sources have differing lengths")
                 Notification(
@@ -896,6 +1932,7 @@ class Dataset(object):
 
         2) Clear the cache of all Entry instances (required after checking the Loader)
         3) Compute number of raw instances in each Entry
+        4) Create the cache of decoded items of each Entry
 
         PARAMETERS:
         -----------
@@ -936,6 +1973,9 @@ class Dataset(object):
             # Compute number of raw instances
             self.entries[i].compute_num_raw_instances()
 
+            # Create the cache of decoded items (before the DataLoader workers start)
+            self.entries[i].check_item_cache()
+
     ###########
     # GETTERS #
     ###########
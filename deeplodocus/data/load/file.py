@@ -2,12 +2,13 @@
 import os
 from typing import Union
 from typing import Any
+from typing import List
 from typing import Tuple
 from typing import Optional
 
 # Deeplodocus imports
 from deeplodocus.utils.notification import Notification
-from deeplodocus.utils.file import get_specific_line
+from deeplodocus.utils.file import LineIndex
 from deeplodocus.data.load.source import Source
 
 # Deeplodocus flags
@@ -49,6 +50,9 @@ class File(Source):
         self.join = join
         self.delimiter = delimiter
 
+        # Byte-offset index of the lines of the file (built when the source is checked)
+        self.line_index = None
+
     def __getitem__(self, index: int) -> Tuple[Any, bool, bool]:
         """
         AUTHORS:
@@ -77,9 +81,49 @@ class File(Source):
         is_transformed = self.is_transformed
 
         # Get the data
-        data = get_specific_line(filename=self.path,
-                                 index=index)
+        data = self.__format_line(self.line_index.get_line(index))
+
+        return data, is_loaded, is_transformed
+
+    def get_batch(self, indices: List[int]) -> List[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items at the selected indices in a single forward pass over the file
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected items
+
+        RETURN:
+        -------
 
+        :return (List[Tuple[Any, bool, bool]]): The item, whether it is loaded and whether it is transformed for each index
+        """
+        return [
+            (self.__format_line(line), self.is_loaded, self.is_transformed)
+            for line in self.line_index.get_lines(indices)
+        ]
+
+    def __format_line(self, data: str) -> Union[str, List[str]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Split a line into a sequence if required and join the parent directory to the paths
+
+        PARAMETERS:
+        -----------
+
+        :param data (str): The line
+
+        RETURN:
+        -------
+
+        :return data (Union[str, List[str]]): The item
+        """
         # create a sequence if necessary
         if isinstance(data, str):
             data = data.split(self.delimiter)  # Generate a list from the sequence
@@ -91,7 +135,7 @@ class File(Source):
         if self.join is not None:
             data = self.__format_path(data)
 
-        return data, is_loaded, is_transformed
+        return data
 
     def __len__(self) -> int:
         """
@@ -139,13 +183,9 @@ class File(Source):
 
         :return length(int): The length of the source
         """
-        length = 0
-
-        with open(self.path) as f:
-            for _ in f:
-                length += 1
-
-        return length
+        if self.line_index is None:
+            self.line_index = LineIndex(self.path)
+        return len(self.line_index)
 
     def __format_path(self, data: Union[str, list]) -> Union[list, str]:
         """
@@ -182,6 +222,44 @@ class File(Source):
                              solutions="Make sure the folder to join exists.")
         return data
 
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the source file (size and modification time)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the source file
+        """
+        return hash(self.line_index.signature)
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the source file
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return [self.path]
+
     def check(self):
         """
         AUTHORS:
@@ -192,13 +270,25 @@ class File(Source):
         DESCRIPTION:
         ------------
 
+        Check the source file exists and index its lines
 
-        :return:
-        """
+        PARAMETERS:
+        -----------
 
-        super().check()
+        None
 
+        RETURN:
+        -------
+
+        :return: None
+        """
         if not os.path.isfile(self.path):
             Notification(DEEP_NOTIF_FATAL, "The following path is not a source file : " + str(self.path))
-        else:
-            Notification(DEEP_NOTIF_SUCCESS, "Source file \"%s\" successfully loaded" % self.path)
+
+        # Build (or load) the line index once, the length of the source is computed from it
+        if self.line_index is None or not self.line_index.is_up_to_date():
+            self.line_index = LineIndex(self.path)
+
+        super().check()
+
+        Notification(DEEP_NOTIF_SUCCESS, "Source file \"%s\" successfully loaded" % self.path)
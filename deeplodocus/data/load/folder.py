@@ -1,15 +1,18 @@
 # Python imports
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Tuple
-from typing import Union
 from typing import List
+from typing import Dict
+from typing import Optional
 
 # Deeplodocus imports
 from deeplodocus.utils.notification import Notification
-from deeplodocus.utils.file import get_specific_line
+from deeplodocus.utils.file import LineIndex
 from deeplodocus.utils.generic_utils import sorted_nicely
-from deeplodocus.utils.file import compute_num_lines
 
 # Deeplodocus flags
 from deeplodocus.flags import *
@@ -28,6 +31,7 @@ class Folder(Source):
     ------------
 
     Load a source folder.
+    The content of the folder is listed into a file which is reused as long as the directories are not modified.
 
     """
 
@@ -37,7 +41,9 @@ class Folder(Source):
                  is_transformed=False,
                  path="",
                  num_instances=None,
-                 instance_id: int = 0
+                 instance_id: int = 0,
+                 num_threads: int = 8,
+                 cache: bool = True
                  ):
 
         super().__init__(index=index,
@@ -50,12 +56,21 @@ class Folder(Source):
         # Save the directory
         self.path = path
 
+        # Number of threads used to scan the directories
+        self.num_threads = num_threads
+
+        # Whether the listing of the folder can be reused from a previous run
+        self.cache = cache
+
         # Check the given path
         self.__check_directory()
 
         # Save filepath
         self.filepath = self.__convert_source_folder_to_file()
 
+        # Byte-offset index of the lines of the listing file
+        self.line_index = None
+
     """
     "
     " LOAD ITEM
@@ -90,11 +105,29 @@ class Folder(Source):
         is_transformed = self.is_transformed
 
         # Get the data
-        data = get_specific_line(filename=self.filepath,
-                                 index=index)
+        data = self.line_index.get_line(index)
 
         return data, is_loaded, is_transformed
 
+    def get_batch(self, indices: List[int]) -> List[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items at the selected indices in a single forward pass over the listing file
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected items
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[Any, bool, bool]]): The item, whether it is loaded and whether it is transformed for each index
+        """
+        return [(line, self.is_loaded, self.is_transformed) for line in self.line_index.get_lines(indices)]
+
     def compute_length(self) -> int:
         """
         AUTHORS:
@@ -117,7 +150,68 @@ class Folder(Source):
 
         :return length(int): The length of the source
         """
-        return compute_num_lines(self.filepath)
+        if self.line_index is None:
+            self.line_index = LineIndex(self.filepath)
+        return len(self.line_index)
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the listing of the folder (size and modification time)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the listing of the folder
+        """
+        return hash(self.line_index.signature)
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the listing file of the folder, rewritten whenever one of the listed directories changes
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return [self.filepath]
+
+    def check(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Index the lines of the listing file and check the source
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.line_index is None or not self.line_index.is_up_to_date():
+            self.line_index = LineIndex(self.filepath)
+        super().check()
 
     def __check_directory(self) -> None:
         """
@@ -146,7 +240,7 @@ class Folder(Source):
         else:
             Notification(DEEP_NOTIF_SUCCESS, "Source folder \"%s\" successfully found" % self.path)
 
-    def __convert_source_folder_to_file(self):
+    def __convert_source_folder_to_file(self) -> str:
         """
         AUTHORS:
         --------
@@ -157,33 +251,88 @@ class Folder(Source):
         ------------
 
         List the content of a folder into a file
+        The file is named after the folder and comes with the modification time of every listed directory.
+        If none of the directories was modified since the file was written, the file is reused as is.
 
         PARAMETERS:
         -----------
 
-        :param source (Source): A Source instance
+        None
 
         RETURN:
         -------
 
-        :return : None
+        :return filepath (str): The path to the listing file
         """
+        # generate the absolute path to the file
+        key = hashlib.sha1(os.path.abspath(self.path).encode()).hexdigest()
+        filepath = DEEP_FOLDER_LISTING_FILE_NAME % key
+        mtimes_path = os.path.splitext(filepath)[0] + ".json"
 
-        item_list = self.__read_folders(self.path)
+        with ThreadPoolExecutor(max_workers=max(1, self.num_threads)) as executor:
 
-        # generate the absolute path to the file
-        filepath = DEEP_ENTRY_BASE_FILE_NAME % self.index
+            # Reuse the listing of the previous run if the directories did not change
+            if self.cache and os.path.isfile(filepath) and self.__is_listing_valid(mtimes_path, executor):
+                Notification(DEEP_NOTIF_INFO, "Listing of the folder %s loaded from %s" % (self.path, filepath))
+                return filepath
+
+            item_list, mtimes = self.__read_folders(self.path, executor)
 
         # Create the folders if required
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-        with open(filepath, 'w') as f:
+        # Write the files atomically so concurrent runs never read a partial listing
+        temp = "%s.%i.tmp" % (filepath, os.getpid())
+        with open(temp, 'w') as f:
             for item in item_list:
                 f.write("%s\n" % item)
+        os.replace(temp, filepath)
+
+        temp = "%s.%i.tmp" % (mtimes_path, os.getpid())
+        with open(temp, 'w') as f:
+            json.dump({"path": self.path, "directories": mtimes}, f)
+        os.replace(temp, mtimes_path)
 
         return filepath
 
-    def __read_folders(self, directory: Union[str, List[str]]) -> List[str]:
+    def __is_listing_valid(self, mtimes_path: str, executor: ThreadPoolExecutor) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check that none of the directories of a previous listing was modified
+        Adding, removing or renaming an item in a directory changes its modification time
+
+        PARAMETERS:
+        -----------
+
+        :param mtimes_path (str): Path to the modification times of the listed directories
+        :param executor (ThreadPoolExecutor): The thread pool used to stat the directories
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the listing can be reused
+        """
+        try:
+            with open(mtimes_path) as f:
+                listing = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if listing.get("path") != self.path:
+            return False
+        directories = listing.get("directories", {})
+        return all(executor.map(self.__is_mtime_unchanged, directories.keys(), directories.values()))
+
+    @staticmethod
+    def __is_mtime_unchanged(directory: str, mtime: int) -> bool:
+        try:
+            return os.stat(directory).st_mtime_ns == mtime
+        except OSError:
+            return False
+
+    def __read_folders(self, directory: str, executor: ThreadPoolExecutor) -> Tuple[List[str], Dict[str, int]]:
         """
         AUTHORS:
         --------
@@ -194,27 +343,59 @@ class Folder(Source):
         DESCRIPTION:
         ------------
 
-        Get the list of paths to every file within the given directories
+        Get the list of paths to every file within the given directory and its sub-directories
+        The directories are scanned concurrently and the paths are sorted once at the end
 
         PARAMETERS:
         -----------
 
-        :param directory (Union[str, List[str]): path to directories to get paths from
+        :param directory (str): path to the directory to get paths from
+        :param executor (ThreadPoolExecutor): The thread pool used to scan the directories
 
         RETURN:
         -------
 
-        :return (List[str]): list of paths to every file within the given directories
-
+        :return (List[str]): list of paths to every file within the given directory
+        :return (Dict[str, int]): the modification time of every scanned directory
         """
         paths = []
-        # For each item in the directory
-        for item in os.listdir(directory):
-            sub_path = "%s/%s" % (directory, item)
-            # If the subpath of the item is a directory we apply the self function recursively
-            if os.path.isdir(sub_path):
-                paths.extend(self.__read_folders(sub_path))
-            # Else we add the path of the file to the list of files
-            else:
-                paths.extend([sub_path])
-        return sorted_nicely(paths)
+        mtimes = {}
+        pending = [executor.submit(self.__scan_directory, directory)]
+        while pending:
+            files, sub_directories, mtime, scanned = pending.pop().result()
+            paths.extend(files)
+            mtimes[scanned] = mtime
+            # Sub-directories are scanned in parallel
+            pending.extend([executor.submit(self.__scan_directory, d) for d in sub_directories])
+        return sorted_nicely(paths), mtimes
+
+    @staticmethod
+    def __scan_directory(directory: str) -> Tuple[List[str], List[str], Optional[int], str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        List the files and the sub-directories of a single directory
+
+        PARAMETERS:
+        -----------
+
+        :param directory (str): path to the directory to scan
+
+        RETURN:
+        -------
+
+        :return (Tuple[List[str], List[str], Optional[int], str]): files, sub-directories, modification time, directory
+        """
+        files = []
+        sub_directories = []
+        mtime = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as it:
+            for item in it:
+                sub_path = "%s/%s" % (directory, item.name)
+                # The type of the item is usually given by the scan itself (no additional stat)
+                if item.is_dir():
+                    sub_directories.append(sub_path)
+                else:
+                    files.append(sub_path)
+        return files, sub_directories, mtime, directory
@@ -3,12 +3,16 @@ from typing import Optional
 from typing import List
 from typing import Any
 from typing import Union
+from typing import Tuple
 import numpy as np
 import weakref
 
 # Deeplodocus imports
 from  deeplodocus.utils.notification import Notification
 from deeplodocus.utils.generic_utils import get_corresponding_flag
+from deeplodocus.data.load.collate import get_batch_layout
+from deeplodocus.data.load.collate import write_batch
+from deeplodocus.data.load.collate import format_item
 
 # Deeplodocus flags
 from deeplodocus.flags import *
@@ -47,6 +51,16 @@ class Formatter(object):
         # Optional sequence to move_axis
         self.move_axis = self.__check_move_axis(move_axis)
 
+    def __getstate__(self) -> dict:
+        # Weak references cannot be pickled, the PipelineEntry is pickled instead (see __setstate__)
+        state = self.__dict__.copy()
+        state["pipeline_entry"] = self.pipeline_entry()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["pipeline_entry"] = weakref.ref(state["pipeline_entry"])
+        self.__dict__.update(state)
+
     def format(self, data: Any, entry_type: Flag) -> Any:
         """
         AUTHORS:
@@ -96,6 +110,45 @@ class Formatter(object):
 
         return data
 
+    def format_batch(self, items: List[Any], pad_value: Optional[float] = None) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Format the items of a batch into a single contiguous array
+        The array is allocated once and each item is written into its slot with its data type converted
+        and its axes moved in the same copy (see write_batch)
+
+        PARAMETERS:
+        -----------
+
+        :param items (List[Any]): The items of the batch
+        :param pad_value (Optional[float]): The value padding the items to the largest item, None if the items must have the same shape
+
+        RETURN:
+        -------
+
+        :return (np.array): The formatted batch
+        """
+        convert_to, move_axis = self.get_format()
+        items = [np.asarray(item) for item in items]
+
+        # Items which are not numeric arrays are formatted one by one
+        if any([item.dtype.kind not in "biuf" for item in items]):
+            return np.stack([format_item(item, convert_to, move_axis) for item in items])
+
+        shape, dtype = get_batch_layout(items, convert_to, move_axis, pad_value)
+        if any([item.shape != items[0].shape for item in items]):
+            batch = np.full(shape, pad_value, dtype=dtype)
+        else:
+            batch = np.empty(shape, dtype=dtype)
+        write_batch(batch, items, move_axis)
+        return batch
+
+    def get_format(self) -> Tuple[Optional[str], Optional[List[int]]]:
+        # The data type (name) and the order of the axes of the formatted items
+        return None if self.convert_to is None else self.convert_to.names[0], self.move_axis
+
     def __check_move_axis(self, move_axis: Optional[List[int]]) -> Optional[List[int]]:
         """
         AUTHORS:
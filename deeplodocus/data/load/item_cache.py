@@ -0,0 +1,296 @@
+# Python imports
+import os
+import mmap
+import tempfile
+import weakref
+import multiprocessing
+from typing import Any
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+# Maximum number of dimensions of a cached array
+ITEM_CACHE_MAX_DIMS = 8
+
+# Size of the slots is rounded to a multiple of the page size
+ITEM_CACHE_PAGE_SIZE = 4096
+
+# Description of a slot
+ITEM_CACHE_SLOT = np.dtype([
+    ("key", np.int64),                              # Index of the cached item in the Entry (-1 if the slot is free)
+    ("version", np.int64),                          # Fingerprint of the Source of the item when it was cached
+    ("referenced", np.uint8),                       # CLOCK reference bit
+    ("ndim", np.uint8),                             # Number of dimensions of the array
+    ("dtype", "S8"),                                # Data type of the array
+    ("shape", np.int64, (ITEM_CACHE_MAX_DIMS,)),    # Shape of the array
+    ("nbytes", np.int64)                            # Size of the array
+])
+
+
+class ItemCache(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Byte-budgeted cache of decoded items shared by all the processes loading the data (e.g. DataLoader workers)
+
+    The cache is a memory-mapped file (in /dev/shm when available) divided in fixed-size slots.
+    It is created by the main process, the DataLoader workers map the same file, so a decoded item is stored only once.
+    Items are evicted with the CLOCK algorithm (second chance), which approximates LRU.
+    Each cached item is stored with the fingerprint of its Source and is ignored once the Source file changed.
+
+    Only numpy arrays up to the slot size are cached.
+    """
+
+    def __init__(self, budget: int, num_keys: int, slot_size: int, name: str = "entry"):
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the memory-mapped file of the cache
+
+        PARAMETERS:
+        -----------
+
+        :param budget (int): The maximum size of the cached data (in bytes)
+        :param num_keys (int): The number of items that can be cached (number of raw instances in the Entry)
+        :param slot_size (int): The maximum size of a cached item (in bytes)
+        :param name (str): The name of the cache
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.name = name
+        self.slot_size = int(np.ceil(slot_size / ITEM_CACHE_PAGE_SIZE) * ITEM_CACHE_PAGE_SIZE)
+        self.num_slots = max(int(budget // self.slot_size), 1)
+        self.num_keys = num_keys
+
+        # Whether the items too large for the slots were reported (once in each process)
+        self.warned_too_large = False
+
+        # Position of each section in the file
+        self.hand_offset = 0
+        self.keys_offset = 8
+        self.slots_offset = self.__align(self.keys_offset + 4 * num_keys)
+        self.data_offset = self.__align(self.slots_offset + ITEM_CACHE_SLOT.itemsize * self.num_slots)
+        self.size = self.data_offset + self.num_slots * self.slot_size
+
+        # Create the file
+        directory = "/dev/shm" if os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+        fd, self.path = tempfile.mkstemp(prefix="deeplodocus-%s-" % name, suffix=".cache", dir=directory)
+        os.ftruncate(fd, self.size)
+        os.close(fd)
+
+        # Only the process which created the file removes it
+        weakref.finalize(self, ItemCache.remove, self.path, os.getpid())
+
+        # Lock shared by the processes
+        self.lock = multiprocessing.Lock()
+
+        # Memory map (opened lazily in each process)
+        self.mmap = None
+        self.hand = None
+        self.keys = None
+        self.slots = None
+        self.pid = None
+
+        # Initialise the tables
+        self.__open()
+        self.keys[:] = -1
+        self.slots["key"] = -1
+
+        Notification(DEEP_NOTIF_INFO, "Decoded item cache of %s : %i slots of %.1f MB in %s" % (
+            name, self.num_slots, self.slot_size / 1024 / 1024, self.path
+        ))
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, the file is mapped again in the new process
+        state = self.__dict__.copy()
+        state["mmap"] = None
+        state["hand"] = None
+        state["keys"] = None
+        state["slots"] = None
+        state["pid"] = None
+        return state
+
+    def get(self, key: int, version: int = 0) -> Optional[np.array]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a copy of a cached item
+
+        PARAMETERS:
+        -----------
+
+        :param key (int): The index of the item in the Entry
+        :param version (int): The current fingerprint of the Source of the item
+
+        RETURN:
+        -------
+
+        :return (Optional[np.array]): A copy of the cached item, None if the item is not cached
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        with self.lock:
+            index = int(self.keys[key])
+            if index < 0:
+                return None
+            slot = self.slots[index]
+
+            # The Source changed since the item was cached
+            if slot["version"] != version:
+                self.keys[key] = -1
+                slot["key"] = -1
+                return None
+
+            slot["referenced"] = 1
+            shape = tuple(slot["shape"][:slot["ndim"]])
+            start = self.data_offset + index * self.slot_size
+            return np.frombuffer(
+                self.mmap,
+                dtype=np.dtype(slot["dtype"].decode()),
+                count=int(np.prod(shape)),
+                offset=start
+            ).reshape(shape).copy()
+
+    def put(self, key: int, data: Any, version: int = 0) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Cache an item, evicting an item with the CLOCK algorithm if the cache is full
+
+        PARAMETERS:
+        -----------
+
+        :param key (int): The index of the item in the Entry
+        :param data (Any): The item to cache
+        :param version (int): The current fingerprint of the Source of the item
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the item was cached
+        """
+        if not self.is_cachable(data):
+            if isinstance(data, np.ndarray) and data.nbytes > self.slot_size and not self.warned_too_large:
+                self.warned_too_large = True
+                Notification(DEEP_NOTIF_WARNING, "Items of %s larger than the slots of the decoded item cache (%.1f MB) are not cached" % (
+                    self.name, self.slot_size / 1024 / 1024
+                ), solutions="Set the size of the slots large enough for the largest item (see datasets: entries: decoded_cache_item_size)")
+            return False
+        if self.pid != os.getpid():
+            self.__open()
+        with self.lock:
+            if self.keys[key] >= 0:
+                return True
+
+            # Find a free slot or a slot not referenced since the last pass of the hand
+            while True:
+                index = int(self.hand[0])
+                self.hand[0] = (index + 1) % self.num_slots
+                slot = self.slots[index]
+                if slot["key"] < 0:
+                    break
+                elif slot["referenced"]:
+                    slot["referenced"] = 0
+                else:
+                    self.keys[slot["key"]] = -1
+                    break
+
+            # Write the item
+            start = self.data_offset + index * self.slot_size
+            self.mmap[start:start + data.nbytes] = np.ascontiguousarray(data).tobytes()
+            slot["key"] = key
+            slot["version"] = version
+            slot["referenced"] = 0  # Only items read again get a second chance
+            slot["ndim"] = data.ndim
+            slot["dtype"] = data.dtype.str.encode()
+            slot["shape"][:] = 0
+            slot["shape"][:data.ndim] = data.shape
+            slot["nbytes"] = data.nbytes
+            self.keys[key] = index
+        return True
+
+    def is_cachable(self, data: Any) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check whether an item can be stored in the cache
+
+        PARAMETERS:
+        -----------
+
+        :param data (Any): The item to cache
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the item is a numpy array fitting in a slot
+        """
+        return isinstance(data, np.ndarray) \
+            and data.dtype != object \
+            and data.ndim <= ITEM_CACHE_MAX_DIMS \
+            and data.nbytes <= self.slot_size
+
+    def __open(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Map the file of the cache in the current process
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        with open(self.path, "r+b") as f:
+            self.mmap = mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_WRITE)
+        self.hand = np.frombuffer(self.mmap, dtype=np.int64, count=1, offset=self.hand_offset)
+        self.keys = np.frombuffer(self.mmap, dtype=np.int32, count=self.num_keys, offset=self.keys_offset)
+        self.slots = np.frombuffer(self.mmap, dtype=ITEM_CACHE_SLOT, count=self.num_slots, offset=self.slots_offset)
+        self.pid = os.getpid()
+
+    @staticmethod
+    def __align(position: int) -> int:
+        return (position + ITEM_CACHE_PAGE_SIZE - 1) // ITEM_CACHE_PAGE_SIZE * ITEM_CACHE_PAGE_SIZE
+
+    @staticmethod
+    def remove(path: str, pid: int) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Remove the file of a cache (only from the process which created it)
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): The path to the file of the cache
+        :param pid (int): The ID of the process which created the cache
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if os.getpid() == pid and os.path.exists(path):
+            os.remove(path)
@@ -8,6 +8,7 @@ import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.data.load.source import Source
+from deeplodocus.utils.compact_list import CompactList
 
 
 class LoadableSource(Source):
@@ -39,7 +40,7 @@ class LoadableSource(Source):
                          instance_id=instance_id)
 
         self.bool_load_in_memory = load_in_memory
-        self.memory = list()
+        self.memory = CompactList()
 
         # If we want to load the Source in memory
         if self.bool_load_in_memory is True:
@@ -79,6 +80,7 @@ class LoadableSource(Source):
         ------------
 
         Load the whole source in memory
+        The instances are then stored in a CompactList (no Python object per instance when possible)
 
         PARAMETERS:
         -----------
@@ -92,6 +94,7 @@ class LoadableSource(Source):
         """
         for i in range(self.num_instances):
             self.add_instance(self.__getitem__(i))
+        self.memory.freeze()
 
     def add_instance(self, instance: np.array) -> None:
         """
@@ -3,9 +3,17 @@ from typing import Optional
 from typing import List
 from typing import Union
 from typing import Any
+from typing import Callable
 import numpy as np
 import mimetypes
+import io
+import os
+import math
+import struct
 import weakref
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Deeplodocus imports
 from  deeplodocus.utils.notification import Notification
@@ -16,6 +24,15 @@ from deeplodocus.utils.generic_utils import get_corresponding_flag
 # Deeplodocus flags
 from deeplodocus.flags import *
 
+# Factors by which an image can be reduced while it is decoded
+DECODE_SCALES = (1, 2, 4, 8)
+
+# Memory-map modes of the .npy files which never write into the files (None to read the whole arrays)
+MMAP_MODES = (None, "r", "c")
+
+# Start of frame markers of the JPEG format (contain the size and the number of components of the image)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
 
 class Loader(object):
     """
@@ -33,7 +50,11 @@ class Loader(object):
     def __init__(self,
                  data_entry: weakref,
                  load_as: Optional[str] = None,
-                 cv_library: Union[str, None, Flag] = DEEP_LIB_OPENCV
+                 cv_library: Union[str, None, Flag] = DEEP_LIB_OPENCV,
+                 decode_threads: int = 1,
+                 mmap_mode: Optional[str] = None,
+                 npz_handles: int = 16,
+                 decode_scale: Union[int, str] = 1
                  ):
 
         # Weakref of the Entry instance
@@ -47,9 +68,51 @@ class Loader(object):
         self.cv_library = None
         self.set_cv_library(cv_library)
 
+        # Number of threads decoding the items of a sequence or a batch concurrently
+        # The thread pool is created lazily in each process (threads do not survive a fork)
+        self.decode_threads = decode_threads
+        self.executor = None
+        self.pid = None
+
+        # Memory-map mode of the .npy files (None to read the whole array)
+        self.mmap_mode = mmap_mode
+
+        # Open .npz files of the current process, the least recently used is released when the pool is full
+        self.npz_handles = npz_handles
+        self.npz_files = OrderedDict()
+        self.npz_lock = None
+        self.npz_pid = None
+
+        # Factor by which the images are reduced when decoded (1, 2, 4 or 8), or "auto" to infer it from the first resize
+        # The target of the resize (shape, keep_aspect) is set by the Dataset (see set_decode_target)
+        self.decode_scale = decode_scale
+        self.decode_target = None
+
+        # Function loading a single item, resolved from load_as once the Loader is checked
+        self.load_function = None
+
         # Checked
         self.checked = False
 
+    def __getstate__(self) -> dict:
+        # Thread pools cannot be pickled, a new one is created in the new process
+        state = self.__dict__.copy()
+        state["executor"] = None
+        state["pid"] = None
+        state["npz_files"] = OrderedDict()
+        state["npz_lock"] = None
+        state["npz_pid"] = None
+        state["load_function"] = None
+        # Weak references cannot be pickled, the Entry is pickled with the Loader (see __setstate__)
+        state["data_entry"] = self.data_entry()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["data_entry"] = weakref.ref(state["data_entry"])
+        self.__dict__.update(state)
+        # The CV library is imported globally, it has to be imported again in a spawned process
+        self.__import_cv_library(cv_library=self.cv_library)
+
     def check(self):
         """
         AUTHORS:
@@ -75,6 +138,16 @@ class Loader(object):
         # Check the load_as argument
         self.load_as = self.__check_load_as(self.load_as)
 
+        # Check the decode scale
+        if self.decode_scale not in DECODE_SCALES and self.decode_scale != "auto":
+            Notification(DEEP_NOTIF_FATAL, "The decode scale of an entry must be 1, 2, 4, 8 or auto : %s" % str(self.decode_scale))
+
+        # Check the memory-map mode (the other modes would write the transformed arrays into the files)
+        if self.mmap_mode not in MMAP_MODES:
+            Notification(DEEP_NOTIF_FATAL, "The memory-map mode of an entry must be None, r or c : %s" % str(self.mmap_mode),
+                         solutions="Use c (copy-on-write) if the transforms modify the arrays in place")
+        self.load_function = self.__get_load_function()
+
         # Set self.checked as True
         self.checked = True
 
@@ -105,7 +178,8 @@ class Loader(object):
 
         if load_as is None:
             # Get an instance
-            instance_example, is_loaded, _ = self.data_entry().__get_first_item()
+            instance_example = self.data_entry().get_first_item()
+            is_loaded = self.data_entry().sources[0].is_loaded
 
             if is_loaded is True:
                 load_as = None
@@ -195,6 +269,7 @@ class Loader(object):
 
         Load a data from a string format to the actual content
         Loads either one item or a list of items
+        The items of a list are decoded concurrently if several decode threads are enabled
 
         PARAMETERS:
         -----------
@@ -206,60 +281,200 @@ class Loader(object):
 
         :return loaded_data(Union[Any, List[Any]]): The loaded data
         """
+        if isinstance(data, list):
+            return self.load_batch(data)
+        else:
+            return self.__load_item(data)
 
-        loaded_data = None
+    def get_shape(self, data: Union[str, List[str], Any]) -> List[int]:
+        """
+        DESCRIPTION:
+        ------------
 
-        # Make sure the data contains something
-        if data is not None:
+        Get the shape of the item a data would be loaded as
+        Only the header is read for the images (with PIL, if available) and the .npy files, other items are loaded
+        The shape of an image is the shape of the image in the file (whatever the decode scale)
 
-            # SEQUENCE
-            if isinstance(data, list):
-                # If data is a sequence we use the function in a recursive fashion
-                loaded_data = []
-                for d in data:
-                    ld = self.load_from_str(data=d)
-                    loaded_data.append(ld)
+        PARAMETERS:
+        -----------
 
-            # IMAGE
-            elif DEEP_LOAD_AS_IMAGE.corresponds(self.load_as):
-                # Load image
-                loaded_data = self.__load_image(data)
+        :param data (Union[str, List[str], Any]): The data to load (e.g. the path of a file)
 
-            # VIDEO
-            elif DEEP_LOAD_AS_VIDEO.corresponds(self.load_as):
-                loaded_data = self.__load_video(data)
+        RETURN:
+        -------
 
-            # INTEGER
-            elif DEEP_LOAD_AS_INTEGER.corresponds(self.load_as):
-                loaded_data = int(data)
+        :return (List[int]): The shape of the item
+        """
+        # The length of a sequence
+        if isinstance(data, list):
+            return [len(data)]
+        if DEEP_LOAD_AS_IMAGE.corresponds(self.load_as):
+            shape = self.__read_image_header(data)
+            if shape is not None:
+                return shape
+        elif DEEP_LOAD_AS_NP_ARRAY.corresponds(self.load_as) and isinstance(data, str) and not data.endswith(DEEP_EXT_NPZ):
+            return list(np.load(data, mmap_mode="r").shape)
+        return list(np.shape(self.load_from_str(data)))
+
+    @staticmethod
+    def __read_image_header(image: Union[str, bytes, memoryview]) -> Optional[List[int]]:
+        """
+        DESCRIPTION:
+        ------------
 
-            # FLOAT NUMBER
-            elif DEEP_LOAD_AS_FLOAT.corresponds(self.load_as):
-                loaded_data = float(data)
+        Read the shape of an image from the header of the file, without decoding the image
 
-            elif DEEP_LOAD_AS_STRING.corresponds(self.load_as):
-                loaded_data = str(data)
+        PARAMETERS:
+        -----------
 
-            # NUMPY ARRAY
-            elif DEEP_LOAD_AS_NP_ARRAY.corresponds(self.load_as):
-                loaded_data = np.load(data)
+        :param image (Union[str, bytes, memoryview]): The path of the image or the encoded image
 
-            # LOAD AS GIVEN (unchanged)
-            elif DEEP_LOAD_AS_GIVEN.corresponds(self.load_as):
-                loaded_data = data
+        RETURN:
+        -------
 
-            # Data type not recognized
-            else:
+        :return (Optional[List[int]]): The shape of the image (height, width, channels), None if the header cannot be read
+        """
+        try:
+            from PIL import Image as PILImage
+            if isinstance(image, (bytes, bytearray, memoryview)):
+                image = io.BytesIO(image)
+            with PILImage.open(image) as header:
+                width, height = header.size
+                return [height, width, len(header.getbands())]
+        except Exception:
+            return None
+
+    def load_batch(self, data: List[Union[str, List[str], Any]]) -> List[Any]:
+        """
+        DESCRIPTION:
+        ------------
 
-                Notification(DEEP_NOTIF_FATAL,
-                             "The following data could not be loaded because its type is not recognized : %s.\n"
-                             "Please check the documentation online to see the supported types" % data)
-        # If the data is None
+        Load a list of items (e.g. the items of a sequence or of a batch)
+        The items are decoded concurrently by the thread pool of the Loader (OpenCV releases the GIL while decoding)
+        The order of the loaded items is the order of the given items
+
+        PARAMETERS:
+        -----------
+
+        :param data (List[Union[str, List[str], Any]]): The items to load
+
+        RETURN:
+        -------
+
+        :return (List[Any]): The loaded items
+        """
+        if self.decode_threads > 1 and len(data) > 1:
+            if self.pid != os.getpid():
+                self.executor = ThreadPoolExecutor(max_workers=self.decode_threads)
+                self.pid = os.getpid()
+            return list(self.executor.map(self.__load_item, data))
         else:
+            return [self.__load_item(d) for d in data]
+
+    def __load_item(self, data: Union[str, List[str], Any]) -> Union[Any, List[Any]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Load a data from a string format to the actual content in the current thread
+        Loads either one item or a list of items
+
+        PARAMETERS:
+        -----------
+
+        :param data(Union[str, List[str]]): The data to transform
+
+        RETURN:
+        -------
+
+        :return loaded_data(Union[Any, List[Any]]): The loaded data
+        """
+
+        # Make sure the data contains something
+        if data is None:
             Notification(DEEP_NOTIF_FATAL, DEEP_MSG_DATA_IS_NONE % data)
 
-        return loaded_data
+        # SEQUENCE
+        if isinstance(data, list):
+            # If data is a sequence we use the function in a recursive fashion
+            return [self.__load_item(data=d) for d in data]
+
+        # The load function is not kept when the Loader is sent to another process
+        if self.load_function is None:
+            self.load_function = self.__get_load_function()
+        return self.load_function(data)
+
+    def __get_load_function(self) -> Callable[[Any], Any]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the function loading a single item according to the type of data to load
+        Resolved once so the type of data is not checked again for every item
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Callable[[Any], Any]): The function loading an item
+        """
+        # IMAGE
+        if DEEP_LOAD_AS_IMAGE.corresponds(self.load_as):
+            return self.__load_image
+
+        # VIDEO
+        elif DEEP_LOAD_AS_VIDEO.corresponds(self.load_as):
+            return self.__load_video
+
+        # INTEGER
+        elif DEEP_LOAD_AS_INTEGER.corresponds(self.load_as):
+            return self.__load_integer
 
+        # FLOAT NUMBER
+        elif DEEP_LOAD_AS_FLOAT.corresponds(self.load_as):
+            return self.__load_float
+
+        # STRING
+        elif DEEP_LOAD_AS_STRING.corresponds(self.load_as):
+            return self.__load_string
+
+        # NUMPY ARRAY
+        elif DEEP_LOAD_AS_NP_ARRAY.corresponds(self.load_as):
+            return self.__load_np_array
+
+        # LOAD AS GIVEN (unchanged)
+        elif DEEP_LOAD_AS_GIVEN.corresponds(self.load_as):
+            return self.__load_given
+
+        # Data type not recognized
+        else:
+            return self.__load_not_recognized
+
+    @staticmethod
+    def __load_integer(data: Union[str, int, bytes, memoryview]) -> int:
+        return int(bytes(data)) if isinstance(data, memoryview) else int(data)
+
+    @staticmethod
+    def __load_float(data: Union[str, float, bytes, memoryview]) -> float:
+        return float(bytes(data)) if isinstance(data, memoryview) else float(data)
+
+    @staticmethod
+    def __load_string(data: Union[str, bytes, memoryview]) -> str:
+        return bytes(data).decode() if isinstance(data, (bytes, bytearray, memoryview)) else str(data)
+
+    @staticmethod
+    def __load_given(data: Any) -> Any:
+        return data
+
+    @staticmethod
+    def __load_not_recognized(data: Any) -> None:
+        Notification(DEEP_NOTIF_FATAL,
+                     "The following data could not be loaded because its type is not recognized : %s.\n"
+                     "Please check the documentation online to see the supported types" % data)
 
     """
     "
@@ -267,7 +482,7 @@ class Loader(object):
     "
     """
 
-    def __load_image(self, image_path: str):
+    def __load_image(self, image_path: Union[str, bytes, memoryview]):
         """
         AUTHORS:
         --------
@@ -278,21 +493,35 @@ class Loader(object):
         ------------
 
         Load the image in the image_path
+        The image can also be given as the raw content of an image file (bytes, or a memoryview e.g. from an Archive)
 
         PARAMETERS:
         -----------
 
-        :param image_path(str): The path of the image to load
+        :param image_path(Union[str, bytes, memoryview]): The path of the image to load or the encoded image
 
         RETURN:
         -------
 
         :return: The loaded image
         """
-        if DEEP_LIB_OPENCV.corresponds(self.cv_library):
-            image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+        # Images reduced while they are decoded
+        if self.decode_scale != 1:
+            image = self.__load_reduced_image(image_path)
+            if isinstance(image_path, (bytes, bytearray, memoryview)):
+                image_path = "<encoded image>"
+        elif DEEP_LIB_OPENCV.corresponds(self.cv_library):
+            if isinstance(image_path, (bytes, bytearray, memoryview)):
+                image = cv2.imdecode(np.frombuffer(image_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+                image_path = "<encoded image>"
+            else:
+                image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
         elif DEEP_LIB_PIL.corresponds(self.cv_library):
-            image = np.array(Image.open(image_path))
+            if isinstance(image_path, (bytes, bytearray, memoryview)):
+                image = np.array(Image.open(io.BytesIO(image_path)))
+                image_path = "<encoded image>"
+            else:
+                image = np.array(Image.open(image_path))
         else:
             # Notify the user of invalid cv library
             image = None
@@ -312,6 +541,152 @@ class Loader(object):
 
         return image
 
+    def __load_reduced_image(self, image: Union[str, bytes, memoryview]) -> Optional[np.array]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Load an image reduced by the decode factor
+        JPEG images are decoded directly at the reduced size (OpenCV IMREAD_REDUCED_* flags or PIL draft mode),
+        which decodes only a part of the coefficients of the image
+        Other images are decoded at full size and then reduced (only with a fixed decode scale)
+
+        PARAMETERS:
+        -----------
+
+        :param image (Union[str, bytes, memoryview]): The path of the image or the encoded image
+
+        RETURN:
+        -------
+
+        :return (Optional[np.array]): The reduced image (None if the image could not be decoded)
+        """
+        if DEEP_LIB_OPENCV.corresponds(self.cv_library):
+            if isinstance(image, str):
+                try:
+                    with open(image, "rb") as f:
+                        image = f.read()
+                except OSError:
+                    return None
+            buffer = np.frombuffer(image, dtype=np.uint8)
+            header = self.__read_jpeg_header(buffer)
+            if header is not None:
+                factor = self.__get_decode_factor(header[0], header[1])
+                if factor == 1:
+                    return cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+                # The orientation is ignored as with IMREAD_UNCHANGED
+                color = "GRAYSCALE" if header[2] == 1 else "COLOR"
+                flags = getattr(cv2, "IMREAD_REDUCED_%s_%i" % (color, factor)) | cv2.IMREAD_IGNORE_ORIENTATION
+                return cv2.imdecode(buffer, flags)
+            decoded = cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+        elif DEEP_LIB_PIL.corresponds(self.cv_library):
+            decoded = Image.open(io.BytesIO(image) if isinstance(image, (bytes, bytearray, memoryview)) else image)
+            width, height = decoded.size
+            if decoded.format == "JPEG":
+                factor = self.__get_decode_factor(height, width)
+                decoded.draft(decoded.mode, (math.ceil(width / factor), math.ceil(height / factor)))
+                return np.array(decoded)
+            decoded = np.array(decoded)
+        else:
+            return None
+
+        # Other formats are reduced after being decoded (a fixed decode scale gives images of the same scale)
+        if decoded is not None and self.decode_target is None and self.decode_scale in DECODE_SCALES:
+            factor = self.decode_scale
+            size = (math.ceil(decoded.shape[1] / factor), math.ceil(decoded.shape[0] / factor))
+            decoded = cv2.resize(decoded, size, interpolation=cv2.INTER_AREA)
+        return decoded
+
+    def __get_decode_factor(self, height: int, width: int) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the factor by which an image is reduced while it is decoded
+        With a decode target, the largest factor keeping the image at least as large as the output of the resize is used
+
+        PARAMETERS:
+        -----------
+
+        :param height (int): The height of the image
+        :param width (int): The width of the image
+
+        RETURN:
+        -------
+
+        :return (int): The factor (1, 2, 4 or 8)
+        """
+        if self.decode_target is None:
+            return self.decode_scale if self.decode_scale in DECODE_SCALES else 1
+
+        # Size of the image after the resize (see deeplodocus.app.transforms.images.resize)
+        shape, keep_aspect = self.decode_target
+        if keep_aspect:
+            ratio = min(shape[0] / height, shape[1] / width)
+            output_height, output_width = height * ratio, width * ratio
+        else:
+            output_height, output_width = shape[1], shape[0]
+
+        for factor in DECODE_SCALES[::-1]:
+            if math.ceil(height / factor) >= output_height and math.ceil(width / factor) >= output_width:
+                return factor
+        return 1
+
+    def set_decode_target(self, shape: Optional[List[int]] = None, keep_aspect: bool = False) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Set the resize applied to the images first, used to choose the decode factor of each image (decode scale "auto")
+
+        PARAMETERS:
+        -----------
+
+        :param shape (Optional[List[int]]): The shape given to the resize (None if the images are not resized first)
+        :param keep_aspect (bool): Whether the resize keeps the aspect ratio
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.decode_target = None if shape is None else (tuple(shape), keep_aspect)
+
+    @staticmethod
+    def __read_jpeg_header(buffer: np.array) -> Optional[tuple]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the size and the number of components of a JPEG image from its start of frame segment
+
+        PARAMETERS:
+        -----------
+
+        :param buffer (np.array): The encoded image
+
+        RETURN:
+        -------
+
+        :return (Optional[tuple]): The height, width and number of components (None if the image is not a JPEG image)
+        """
+        if buffer.size < 4 or buffer[0] != 0xFF or buffer[1] != 0xD8:
+            return None
+        data = buffer.data
+        position = 2
+        while position + 9 < buffer.size:
+            if buffer[position] != 0xFF:
+                return None
+            marker = buffer[position + 1]
+            if marker == 0xFF:
+                position += 1
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                height, width, components = struct.unpack_from(">HHB", data, position + 5)
+                return height, width, components
+            position += 2 + struct.unpack_from(">H", data, position + 2)[0]
+        return None
+
     @staticmethod
     def __convert_bgra2rgba(image):
         """
@@ -346,6 +721,93 @@ class Loader(object):
             image = image[:, :, (2, 1, 0, 3)]
         return image
 
+    def __load_np_array(self, array_path: Union[str, bytes, memoryview]) -> Union[np.array, dict]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Load a numpy array from a .npy or a .npz file
+        The .npy files are memory-mapped if a mmap mode is given (only the touched pages are read)
+        The .npz files are kept open in a pool of handles so the archive is not opened again at each access
+
+        PARAMETERS:
+        -----------
+
+        :param array_path (Union[str, bytes, memoryview]): The path to the file, or the raw content of the file (e.g. from a Shard or an Archive)
+
+        RETURN:
+        -------
+
+        :return (Union[np.array, dict]): The array, or a dictionary of arrays for a .npz file with several arrays
+        """
+        # Raw file content (e.g. from a Shard or an Archive) are read from memory
+        if isinstance(array_path, (bytes, bytearray, memoryview)):
+            data = np.load(io.BytesIO(array_path))
+            return self.__unpack_npz(data) if isinstance(data, np.lib.npyio.NpzFile) else data
+        elif array_path.endswith(DEEP_EXT_NPZ):
+            return self.__unpack_npz(self.__get_npz_file(array_path))
+        else:
+            return np.load(array_path, mmap_mode=self.mmap_mode)
+
+    def __get_npz_file(self, npz_path: str) -> np.lib.npyio.NpzFile:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the handle of a .npz file from the pool of the current process
+        The least recently used handle is released if the pool is full
+
+        PARAMETERS:
+        -----------
+
+        :param npz_path (str): The path to the .npz file
+
+        RETURN:
+        -------
+
+        :return (np.lib.npyio.NpzFile): The open .npz file
+        """
+        # File handles are not shared with the parent process
+        if self.npz_pid != os.getpid():
+            self.npz_files = OrderedDict()
+            self.npz_lock = threading.Lock()
+            self.npz_pid = os.getpid()
+
+        with self.npz_lock:
+            npz_file = self.npz_files.get(npz_path)
+            if npz_file is None:
+                npz_file = np.load(npz_path)
+                self.npz_files[npz_path] = npz_file
+                # The evicted file is closed once no thread reads it anymore
+                if len(self.npz_files) > self.npz_handles:
+                    self.npz_files.popitem(last=False)
+            else:
+                self.npz_files.move_to_end(npz_path)
+            return npz_file
+
+    @staticmethod
+    def __unpack_npz(npz_file: np.lib.npyio.NpzFile) -> Union[np.array, dict]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the arrays of a .npz file
+
+        PARAMETERS:
+        -----------
+
+        :param npz_file (np.lib.npyio.NpzFile): The open .npz file
+
+        RETURN:
+        -------
+
+        :return (Union[np.array, dict]): The array if the file contains a single array, else a dictionary of arrays
+        """
+        if len(npz_file.files) == 1:
+            return npz_file[npz_file.files[0]]
+        else:
+            return {key: npz_file[key] for key in npz_file.files}
+
     def __load_video(self, video_path: str):
         """
         AUTHORS:
@@ -407,8 +869,8 @@ class Loader(object):
         :return: None
         """
         if self.warning_video is None:
-            Notification(DEEP_NOTIF_WARNING, "The video mode is not fully supported. "
-                                             "We deeply suggest you to use sequences of images.")
+            Notification(DEEP_NOTIF_WARNING, "The video mode is not fully supported and decodes the whole video. "
+                                             "We deeply suggest you to use the Video source or sequences of images.")
             self.warning_video = 1
 
     def set_cv_library(self, cv_library: Flag) -> None:
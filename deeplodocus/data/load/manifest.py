@@ -0,0 +1,198 @@
+# Python imports
+import os
+import json
+from typing import Any
+from typing import List
+from typing import Optional
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+MANIFEST_VERSION = 1
+
+
+class Manifest(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Metadata of a Dataset persisted between two runs, so that the Dataset is not scanned again at start-up
+
+    For each Entry, the manifest stores the configuration of the Entry, the type of data loaded (load_as),
+    the shape and the data type of the first decoded item, and for each Source the configuration of the Source,
+    its length and the size and the modification time of its files (see Source.get_files).
+    The length of a Source is reused while its configuration and its files do not change,
+    the metadata of an Entry are reused while the Entry and all its Source instances do not change.
+    Sources without files (e.g. custom sources) are always checked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.content = self.__read()
+
+    def get_source_length(self, entry_index: int, source_index: int, config: Any, files: List[str]) -> Optional[int]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the length of a Source stored in the manifest, if the Source did not change
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the Entry in the Dataset
+        :param source_index (int): The index of the Source in the Entry
+        :param config (Any): The configuration of the Source (normalized, see normalize)
+        :param files (List[str]): The files of the Source
+
+        RETURN:
+        -------
+
+        :return (Optional[int]): The length of the Source, None if the Source changed or is not in the manifest
+        """
+        record = self.__get_source_record(entry_index, source_index)
+        if record is None or not files or record["config"] != config or record["files"] != stamp(files):
+            return None
+        return record["length"]
+
+    def get_entry(self, entry_index: int, config: Any, sources: List[Any]) -> Optional[dict]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the metadata of an Entry stored in the manifest (load_as and sample), if the Entry did not change
+
+        PARAMETERS:
+        -----------
+
+        :param entry_index (int): The index of the Entry in the Dataset
+        :param config (Any): The configuration of the Entry (normalized, see normalize)
+        :param sources (List[Any]): The configuration (normalized) and the files of each Source of the Entry
+
+        RETURN:
+        -------
+
+        :return (Optional[dict]): The metadata of the Entry, None if the Entry changed or is not in the manifest
+        """
+        if self.content is None or entry_index >= len(self.content["entries"]):
+            return None
+        record = self.content["entries"][entry_index]
+        if record["config"] != config or len(record["sources"]) != len(sources):
+            return None
+        for source_index, (source_config, files) in enumerate(sources):
+            if self.get_source_length(entry_index, source_index, source_config, files) is None:
+                return None
+        return record
+
+    def update(self, entries: List[dict]) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Update the manifest with the metadata of the Entry instances, the file is written only if the metadata changed
+
+        PARAMETERS:
+        -----------
+
+        :param entries (List[dict]): The metadata of each Entry (see Dataset.__update_manifest)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        content = {"version": MANIFEST_VERSION, "entries": entries}
+        if content == self.content:
+            return
+        self.content = content
+
+        # The manifest is optional, it is kept in memory only if it cannot be written
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open("%s.%i.tmp" % (self.path, os.getpid()), "w") as f:
+                json.dump(content, f)
+            os.replace("%s.%i.tmp" % (self.path, os.getpid()), self.path)
+        except OSError as e:
+            Notification(DEEP_NOTIF_DEBUG, "Could not write the manifest %s : %s" % (self.path, str(e)))
+
+    def __get_source_record(self, entry_index: int, source_index: int) -> Optional[dict]:
+        if self.content is None or entry_index >= len(self.content["entries"]):
+            return None
+        sources = self.content["entries"][entry_index]["sources"]
+        return sources[source_index] if source_index < len(sources) else None
+
+    def __read(self) -> Optional[dict]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the manifest file
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Optional[dict]): The content of the manifest, None if the file is missing, invalid or outdated
+        """
+        try:
+            with open(self.path, "r") as f:
+                content = json.load(f)
+            if content["version"] == MANIFEST_VERSION and isinstance(content["entries"], list):
+                return content
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+
+def normalize(config: Any) -> Any:
+    """
+    DESCRIPTION:
+    ------------
+
+    Normalize a configuration so that it can be compared with a configuration read from a manifest
+
+    PARAMETERS:
+    -----------
+
+    :param config (Any): The configuration
+
+    RETURN:
+    -------
+
+    :return (Any): The configuration as it is stored in JSON
+    """
+    return json.loads(json.dumps(config, default=str, sort_keys=True))
+
+
+def stamp(files: List[str]) -> List[list]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get the path, the size and the modification time of each file (None for a missing file)
+
+    PARAMETERS:
+    -----------
+
+    :param files (List[str]): The paths of the files
+
+    RETURN:
+    -------
+
+    :return (List[list]): The stamp of each file
+    """
+    stamps = []
+    for filename in files:
+        try:
+            stat = os.stat(filename)
+            stamps.append([os.path.abspath(filename), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            stamps.append([os.path.abspath(filename), None, None])
+    return stamps
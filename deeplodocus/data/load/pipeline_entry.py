@@ -2,7 +2,9 @@
 from typing import Optional
 from typing import List
 from typing import Any
+from typing import Tuple
 import weakref
+import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.data.load.formatter import Formatter
@@ -30,7 +32,9 @@ class PipelineEntry(object):
                  entry_type: Flag,
                  entry_type_index: int,
                  convert_to: Optional[List[int]] = None,
-                 move_axis: Optional[List[int]] = None):
+                 move_axis: Optional[List[int]] = None,
+                 pad_value: float = 0,
+                 transform_cache: bool = False):
 
         # Index of the PipelineEntry instance
         self.index = index
@@ -44,6 +48,12 @@ class PipelineEntry(object):
         # Dataset
         self.dataset = dataset
 
+        # Value of the padding of the items of a batch (see Dataset.set_padding)
+        self.pad_value = pad_value
+
+        # Whether the output of the deterministic start of the transformer is cached on disk (see TransformCache)
+        self.transform_cache = transform_cache
+
         # Data formatter
         self.formatter = Formatter(
             pipeline_entry=weakref.ref(self),
@@ -51,6 +61,16 @@ class PipelineEntry(object):
             move_axis=move_axis
         )
 
+    def __getstate__(self) -> dict:
+        # Weak references cannot be pickled, the Dataset is pickled instead (see __setstate__)
+        state = self.__dict__.copy()
+        state["dataset"] = self.dataset()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state["dataset"] = weakref.ref(state["dataset"])
+        self.__dict__.update(state)
+
     def format(self, data: Any) -> Any:
         """
         AUTHORS:
@@ -77,6 +97,46 @@ class PipelineEntry(object):
         """
         return self.formatter.format(data=data, entry_type=self.entry_type)
 
+    def format_batch(self, items: List[Any], pad: bool = False) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Call the Formatter instance to format the items of a batch into a single array
+
+        PARAMETERS:
+        -----------
+
+        :param items (List[Any]): The items to format
+        :param pad (bool): Whether to pad the items to the largest item with the pad value of the PipelineEntry
+
+        RETURN:
+        -------
+
+        :return (np.array): The formatted batch
+        """
+        return self.formatter.format_batch(items=items, pad_value=self.pad_value if pad else None)
+
+    def get_format(self) -> Tuple[Optional[str], Optional[List[int]], float]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the format of the items of the PipelineEntry (see Collate)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Tuple[Optional[str], Optional[List[int]], float]): The data type, the order of the axes and the pad value
+        """
+        convert_to, move_axis = self.formatter.get_format()
+        return convert_to, move_axis, self.pad_value
+
     ###########
     # GETTERS #
     ###########
@@ -0,0 +1,557 @@
+# Python imports
+import io
+import os
+import json
+import time
+import contextlib
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.utils.deep_error import DeepError
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+SCAN_REPORT_VERSION = 1
+
+# Upper edges of the latency bins (in seconds) : 10 bins per decade from 1 µs to 100 s (last bin above 100 s)
+LATENCY_BINS = np.logspace(-6, 2, 81)
+
+# Minimum time (in seconds) between two writes of the report during a scan
+SAVE_INTERVAL = 5
+
+# Dataset scanned by the current worker process (see init_scan_worker)
+_SCANNED_DATASET = None
+
+
+class ScanReport(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Report of the scan of a Dataset (see Dataset.summary)
+
+    The raw instances of the Dataset are scanned by chunks of consecutive indices, each chunk is scanned by a worker process.
+    The statistics of the chunks are merged into the report :
+        - The number of items and of unreadable items of each Entry
+        - The type, the shape, the data type and the number of channels of the decoded items of each Entry
+        - The mean and the standard deviation of each channel of the decoded arrays of each Entry
+        - The distribution of the load latency of each Entry and of the transform latency of the instances
+        - The slowest items of each Entry
+        - The unreadable items (index, Entry, path or description of the item, error)
+
+    The report is a JSON file written while the Dataset is scanned.
+    An interrupted scan is resumed from the chunks already scanned, as long as the Dataset and the chunk size do not change.
+    """
+
+    def __init__(self, path: str, dataset: Any, chunk_size: int = 256, num_slowest: int = 20, restart: bool = False):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the report, resume the report stored in the file if it matches the Dataset and the chunk size
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): The path of the report
+        :param dataset (Dataset): The scanned Dataset
+        :param chunk_size (int): The number of instances in each chunk
+        :param num_slowest (int): The number of slowest items reported for each Entry
+        :param restart (bool): Whether to ignore the report stored in the file
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.path = path
+        self.num_slowest = num_slowest
+        self.last_save = time.time()
+        self.content = {
+            "version": SCAN_REPORT_VERSION,
+            "dataset": dataset.name,
+            "type": dataset.type.names[0],
+            "num_instances": dataset.number_raw_instances,
+            "chunk_size": chunk_size,
+            "latency_bins": LATENCY_BINS.tolist(),
+            "done": [],
+            "complete": False,
+            "entries": [new_entry_stats(entry.get_info()) for entry in dataset.entries],
+            "num_transformed": 0,
+            "transform_latency": new_histogram(),
+            "errors": []
+        }
+        if not restart:
+            self.__resume()
+
+    def get_num_chunks(self) -> int:
+        return -(-self.content["num_instances"] // self.content["chunk_size"])
+
+    def get_remaining_chunks(self) -> List[Tuple[int, int, int]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the chunks which are not scanned yet
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[int, int, int]]): The index, the first instance and the end instance of each chunk
+        """
+        done = set(self.content["done"])
+        chunk_size = self.content["chunk_size"]
+        return [
+            (chunk, chunk * chunk_size, min((chunk + 1) * chunk_size, self.content["num_instances"]))
+            for chunk in range(self.get_num_chunks()) if chunk not in done
+        ]
+
+    def add(self, result: dict) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Merge the statistics of a scanned chunk into the report (see scan_chunk)
+        The report is written if it was not written for SAVE_INTERVAL seconds
+
+        PARAMETERS:
+        -----------
+
+        :param result (dict): The statistics of the chunk
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        content = self.content
+        for stats, chunk_stats in zip(content["entries"], result["entries"]):
+            merge_entry_stats(stats, chunk_stats, self.num_slowest)
+        content["num_transformed"] += result["num_transformed"]
+        content["transform_latency"] = np.add(content["transform_latency"], result["transform_latency"]).tolist()
+        content["errors"] += result["errors"]
+        content["done"].append(result["chunk"])
+        content["complete"] = len(content["done"]) == self.get_num_chunks()
+        if time.time() - self.last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Write the report (atomically, so an interrupted scan never leaves a truncated report)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open("%s.%i.tmp" % (self.path, os.getpid()), "w") as f:
+            json.dump(self.content, f)
+        os.replace("%s.%i.tmp" % (self.path, os.getpid()), self.path)
+        self.last_save = time.time()
+
+    def summary(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Display the report
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        content = self.content
+        Notification(DEEP_NOTIF_INFO, "Scan of the dataset %s (%i instances)%s :" % (
+            content["dataset"], content["num_instances"], "" if content["complete"] else " - incomplete"
+        ))
+        for stats in content["entries"]:
+            Notification(DEEP_NOTIF_INFO, "%s : %i items, %i unreadable" % (stats["name"], stats["num_items"], stats["num_errors"]))
+            for key in ("types", "shapes", "dtypes", "channels"):
+                if stats[key]:
+                    Notification(DEEP_NOTIF_INFO, "  %s : %s" % (key, format_counts(stats[key])))
+            for channels, channel_stats in sorted(stats["channel_stats"].items()):
+                mean, std = get_mean_std(channel_stats)
+                Notification(DEEP_NOTIF_INFO, "  %s channel(s) : mean %s, std %s" % (
+                    channels, np.array2string(mean, precision=3), np.array2string(std, precision=3)
+                ))
+            Notification(DEEP_NOTIF_INFO, "  load latency : %s" % format_latency(stats["load_latency"]))
+            for seconds, index, item in stats["slowest"][:5]:
+                Notification(DEEP_NOTIF_INFO, "  slow item : %.3fs : %i : %s" % (seconds, index, item))
+        if content["num_transformed"]:
+            Notification(DEEP_NOTIF_INFO, "Transform latency : %s" % format_latency(content["transform_latency"]))
+        for error in content["errors"][:20]:
+            if error["entry"] is None:
+                Notification(DEEP_NOTIF_WARNING, "Instance %i could not be transformed : %s" % (error["index"], error["error"]))
+            else:
+                Notification(DEEP_NOTIF_WARNING, "Unreadable item %i of the entry %s (%s) : %s" % (
+                    error["index"], error["entry"], error["item"], error["error"]
+                ))
+        if len(content["errors"]) > 20:
+            Notification(DEEP_NOTIF_WARNING, "%i more errors" % (len(content["errors"]) - 20))
+        if content["errors"]:
+            Notification(DEEP_NOTIF_WARNING, "%i errors in the dataset %s, see %s" % (
+                len(content["errors"]), content["dataset"], self.path
+            ))
+        else:
+            Notification(DEEP_NOTIF_SUCCESS, "No error in the dataset %s, report saved in %s" % (content["dataset"], self.path))
+
+    def __resume(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Resume the report stored in the file if it was written for the same Dataset and the same chunk size
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        try:
+            with open(self.path, "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+        keys = ("version", "dataset", "type", "num_instances", "chunk_size", "latency_bins")
+        if all([content.get(key) == self.content[key] for key in keys]) \
+                and [stats["name"] for stats in content.get("entries", [])] == [stats["name"] for stats in self.content["entries"]]:
+            self.content = content
+            Notification(DEEP_NOTIF_INFO, "Resuming the scan of the dataset %s (%i/%i chunks already scanned)" % (
+                content["dataset"], len(content["done"]), self.get_num_chunks()
+            ))
+
+
+def init_scan_worker(dataset: Any) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Set the Dataset scanned by the current worker process
+
+    PARAMETERS:
+    -----------
+
+    :param dataset (Dataset): The scanned Dataset
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    global _SCANNED_DATASET
+    _SCANNED_DATASET = dataset
+
+
+def scan_chunk(chunk: int, start: int, end: int, num_slowest: int = 20) -> dict:
+    """
+    DESCRIPTION:
+    ------------
+
+    Scan the raw instances of a chunk of the Dataset of the current worker process (see Dataset.scan_instance)
+    The notifications of the unreadable items are not displayed, the errors are stored in the statistics of the chunk
+
+    PARAMETERS:
+    -----------
+
+    :param chunk (int): The index of the chunk
+    :param start (int): The first instance of the chunk
+    :param end (int): The end instance of the chunk (excluded)
+    :param num_slowest (int): The number of slowest items kept for each Entry
+
+    RETURN:
+    -------
+
+    :return (dict): The statistics of the chunk
+    """
+    dataset = _SCANNED_DATASET
+    result = {
+        "chunk": chunk,
+        "entries": [new_entry_stats(entry.get_info()) for entry in dataset.entries],
+        "num_transformed": 0,
+        "transform_latency": new_histogram(),
+        "errors": []
+    }
+    slowest = [[] for _ in dataset.entries]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(start, end):
+            items, load_times, errors, transform_time, transform_error = dataset.scan_instance(index)
+            for i, stats in enumerate(result["entries"]):
+                stats["num_items"] += 1
+                if errors[i] is not None:
+                    stats["num_errors"] += 1
+                    result["errors"].append({
+                        "index": index,
+                        "entry": stats["name"],
+                        "item": describe_item(dataset.entries[i], index),
+                        "error": errors[i]
+                    })
+                elif load_times[i] is not None:
+                    add_item(stats, items[i])
+                    stats["load_latency"][get_latency_bin(load_times[i])] += 1
+                    slowest[i].append((load_times[i], index))
+            if transform_error is not None:
+                result["errors"].append({"index": index, "entry": None, "item": None, "error": transform_error})
+            if transform_time is not None:
+                result["num_transformed"] += 1
+                result["transform_latency"][get_latency_bin(transform_time)] += 1
+
+        # The items are described only for the slowest items of the chunk
+        for i, stats in enumerate(result["entries"]):
+            stats["slowest"] = [
+                [seconds, index, describe_item(dataset.entries[i], index)]
+                for seconds, index in sorted(slowest[i], reverse=True)[:num_slowest]
+            ]
+    return result
+
+
+def new_histogram() -> List[int]:
+    return [0] * (len(LATENCY_BINS) + 1)
+
+
+def get_latency_bin(seconds: float) -> int:
+    return int(np.searchsorted(LATENCY_BINS, seconds))
+
+
+def new_entry_stats(name: str) -> dict:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get empty statistics of an Entry
+
+    PARAMETERS:
+    -----------
+
+    :param name (str): The name of the Entry
+
+    RETURN:
+    -------
+
+    :return (dict): The statistics of the Entry
+    """
+    return {
+        "name": name,
+        "num_items": 0,
+        "num_errors": 0,
+        "types": {},
+        "shapes": {},
+        "dtypes": {},
+        "channels": {},
+        "channel_stats": {},
+        "load_latency": new_histogram(),
+        "slowest": []
+    }
+
+
+def add_item(stats: dict, item: Any) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Add a decoded item to the statistics of an Entry
+    The channels of an array are its last axis (a 2D array has a single channel)
+
+    PARAMETERS:
+    -----------
+
+    :param stats (dict): The statistics of the Entry
+    :param item (Any): The decoded item
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    increment(stats["types"], type(item).__name__)
+    if not isinstance(item, np.ndarray):
+        return
+    increment(stats["shapes"], "x".join([str(n) for n in item.shape]))
+    increment(stats["dtypes"], item.dtype.name)
+    if item.ndim < 2:
+        return
+    channels = str(item.shape[-1] if item.ndim > 2 else 1)
+    increment(stats["channels"], channels)
+    if (np.issubdtype(item.dtype, np.number) or item.dtype == bool) and item.size:
+        values = item.reshape(-1, int(channels)).astype(np.float64)
+        channel_stats = stats["channel_stats"].setdefault(channels, {"count": 0, "sum": [0.0] * int(channels), "sum2": [0.0] * int(channels)})
+        channel_stats["count"] += values.shape[0]
+        channel_stats["sum"] = np.add(channel_stats["sum"], values.sum(axis=0)).tolist()
+        channel_stats["sum2"] = np.add(channel_stats["sum2"], np.square(values).sum(axis=0)).tolist()
+
+
+def merge_entry_stats(stats: dict, other: dict, num_slowest: int = 20) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Merge the statistics of an Entry into other statistics of the same Entry
+
+    PARAMETERS:
+    -----------
+
+    :param stats (dict): The statistics to update
+    :param other (dict): The statistics to merge
+    :param num_slowest (int): The number of slowest items to keep
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    stats["num_items"] += other["num_items"]
+    stats["num_errors"] += other["num_errors"]
+    for key in ("types", "shapes", "dtypes", "channels"):
+        for value, count in other[key].items():
+            increment(stats[key], value, count)
+    for channels, channel_stats in other["channel_stats"].items():
+        if channels not in stats["channel_stats"]:
+            stats["channel_stats"][channels] = channel_stats
+        else:
+            for key in ("count", "sum", "sum2"):
+                stats["channel_stats"][channels][key] = np.add(stats["channel_stats"][channels][key], channel_stats[key]).tolist()
+    stats["load_latency"] = np.add(stats["load_latency"], other["load_latency"]).tolist()
+    stats["slowest"] = sorted(stats["slowest"] + other["slowest"], key=lambda slow: slow[0], reverse=True)[:num_slowest]
+
+
+def describe_item(entry: Any, index: int) -> Optional[str]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Describe the raw item of an Entry (e.g. the path of the file), so it can be found in the report
+
+    PARAMETERS:
+    -----------
+
+    :param entry (Entry): The Entry
+    :param index (int): The index of the raw instance
+
+    RETURN:
+    -------
+
+    :return (Optional[str]): The description of the item, None if the raw item cannot be read
+    """
+    try:
+        item = entry.get_raw_item(index)[0]
+    except Exception:
+        return None
+    if isinstance(item, str):
+        return item
+    if isinstance(item, (list, tuple)):
+        return "[%s]" % ", ".join([str(i) for i in item[:3]] + (["..."] if len(item) > 3 else []))
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return "<%i bytes>" % len(item)
+    if isinstance(item, np.ndarray):
+        return "<array %s %s>" % ("x".join([str(n) for n in item.shape]), item.dtype.name)
+    return repr(item)[:200]
+
+
+def describe_error(error: Exception) -> str:
+    """
+    DESCRIPTION:
+    ------------
+
+    Describe an error raised while loading or transforming an item
+    The message of a DeepError is the message of the fatal notification
+
+    PARAMETERS:
+    -----------
+
+    :param error (Exception): The error
+
+    RETURN:
+    -------
+
+    :return (str): The description of the error
+    """
+    message = str(error)
+    if isinstance(error, DeepError):
+        return message or "DeepError"
+    return "%s : %s" % (type(error).__name__, message) if message else type(error).__name__
+
+
+def increment(counts: dict, key: str, count: int = 1) -> None:
+    counts[key] = counts.get(key, 0) + count
+
+
+def format_counts(counts: dict, num_values: int = 5) -> str:
+    values = sorted(counts.items(), key=lambda value: value[1], reverse=True)
+    text = ", ".join(["%s (%i)" % value for value in values[:num_values]])
+    return text if len(values) <= num_values else "%s, %i more" % (text, len(values) - num_values)
+
+
+def format_latency(histogram: List[int]) -> str:
+    return ", ".join(["p%i %s" % (q, format_seconds(get_percentile(histogram, q))) for q in (50, 90, 99)])
+
+
+def format_seconds(seconds: float) -> str:
+    if np.isnan(seconds):
+        return "-"
+    if seconds == float("inf"):
+        return "> %.0fs" % LATENCY_BINS[-1]
+    return "<= %.3gms" % (seconds * 1000)
+
+
+def get_percentile(histogram: List[int], q: float) -> float:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get an upper bound of a percentile of a latency distribution (the upper edge of its bin)
+
+    PARAMETERS:
+    -----------
+
+    :param histogram (List[int]): The number of latencies in each bin (see LATENCY_BINS)
+    :param q (float): The percentile (between 0 and 100)
+
+    RETURN:
+    -------
+
+    :return (float): The upper bound of the percentile (in seconds), inf above the last bin, nan if the distribution is empty
+    """
+    cumulative = np.cumsum(histogram)
+    if cumulative[-1] == 0:
+        return float("nan")
+    i = int(np.searchsorted(cumulative, q / 100 * cumulative[-1]))
+    return float(LATENCY_BINS[i]) if i < len(LATENCY_BINS) else float("inf")
+
+
+def get_mean_std(channel_stats: dict) -> Tuple[np.array, np.array]:
+    count = max(channel_stats["count"], 1)
+    mean = np.array(channel_stats["sum"]) / count
+    std = np.sqrt(np.maximum(np.array(channel_stats["sum2"]) / count - np.square(mean), 0))
+    return mean, std
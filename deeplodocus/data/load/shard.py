@@ -0,0 +1,563 @@
+# Python imports
+import os
+import mmap
+import json
+import struct
+import bisect
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Union
+from typing import Optional
+from typing import BinaryIO
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.utils.generic_utils import sorted_nicely
+from deeplodocus.data.load.source import Source
+
+# Deeplodocus flags
+from deeplodocus.flags.ext import DEEP_EXT_SHARD
+from deeplodocus.flags.notif import *
+
+#
+# SHARD FILE LAYOUT
+#
+# HEADER : magic (8s), version (I), number of items (I), offset table position (Q), metadata position (Q), metadata size (Q)
+# ITEMS : one record per item (see ShardWriter.write)
+# OFFSET TABLE : uint64 array with the position of each item record followed by the position of the offset table
+# METADATA : JSON dictionary describing the content of the shard
+#
+SHARD_MAGIC = b"DEEPSHRD"
+SHARD_VERSION = 1
+SHARD_HEADER = struct.Struct("<8sIIQQQ")
+SHARD_RECORD = struct.Struct("<II")          # Number of parts, whether the item is a sequence
+SHARD_PART = struct.Struct("<BBHQ")          # Kind, number of dimensions, length of the dtype string, number of bytes
+SHARD_ALIGNMENT = 64
+
+# Kinds of parts stored in a record
+SHARD_PART_ARRAY = 0
+SHARD_PART_BYTES = 1
+SHARD_PART_STRING = 2
+SHARD_PART_SCALAR = 3
+
+
+class Shard(Source):
+    """
+    DESCRIPTION:
+    ------------
+
+    Load the items of an entry from packed binary shards generated by Dataset.compile()
+    Each shard is memory-mapped and the arrays are returned as zero-copy views on the memory map.
+    The memory map is copy-on-write so transforms can still modify the arrays in place.
+
+    """
+
+    def __init__(self,
+                 index: int = -1,
+                 is_loaded: Optional[bool] = None,
+                 is_transformed: Optional[bool] = None,
+                 path: str = "",
+                 num_instances: Optional[int] = None,
+                 instance_id: int = 0
+                 ):
+
+        # Path to a shard file or to a directory of shard files
+        self.path = path
+        self.files = self.__list_files(path)
+
+        # Read the header of each shard
+        self.headers = [self.__read_header(f) for f in self.files]
+
+        # Cumulative number of items in the shards (used to find the shard of an item)
+        self.offsets = [0]
+        for header in self.headers:
+            self.offsets.append(self.offsets[-1] + header["num_items"])
+
+        # Whether the items are loaded / transformed is stored in the shards
+        metadata = self.headers[0]["metadata"] if self.headers else {}
+        if is_loaded is None:
+            is_loaded = metadata.get("is_loaded", True)
+        if is_transformed is None:
+            is_transformed = metadata.get("is_transformed", False)
+
+        super().__init__(index=index,
+                         num_instances=num_instances,
+                         is_loaded=is_loaded,
+                         is_transformed=is_transformed,
+                         instance_id=instance_id)
+
+        # Memory maps and offset tables (opened lazily in each process)
+        self.mmaps = None
+        self.tables = None
+        self.pid = None
+
+    def __getitem__(self, index: int) -> Tuple[Any, bool, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the item at the selected index
+
+        PARAMETERS:
+        -----------
+
+        :param index(int): The index of the selected item
+
+        RETURN:
+        -------
+
+        :return data: The item, whether it is loaded, whether it is transformed
+        """
+        if self.pid != os.getpid():
+            self.__open()
+
+        # Find the shard containing the item
+        shard_index = bisect.bisect_right(self.offsets, index) - 1
+        instance_index = index - self.offsets[shard_index]
+
+        data = read_record(
+            buffer=self.mmaps[shard_index],
+            position=int(self.tables[shard_index][instance_index])
+        )
+        return data, self.is_loaded, self.is_transformed
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, they are reopened in the new process
+        state = self.__dict__.copy()
+        state["mmaps"] = None
+        state["tables"] = None
+        state["pid"] = None
+        return state
+
+    def compute_length(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the length of the source from the headers of the shards
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return length(int): The length of the source
+        """
+        return self.offsets[-1]
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the shard files (size and modification time)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the shard files
+        """
+        stats = [os.stat(filename) for filename in self.files]
+        return hash(tuple((stat.st_size, stat.st_mtime_ns) for stat in stats))
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the shard files
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return list(self.files)
+
+    def check(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check the shards were found
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if not self.files:
+            Notification(DEEP_NOTIF_FATAL, "No shard file found in : %s" % self.path,
+                         solutions="Compile the dataset with the compile_dataset command first")
+        super().check()
+        Notification(DEEP_NOTIF_SUCCESS, "Source shards \"%s\" successfully loaded (%i shards)" % (self.path, len(self.files)))
+
+    def __open(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Memory map the shards and their offset tables in the current process
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.mmaps = []
+        self.tables = []
+        for filename, header in zip(self.files, self.headers):
+            with open(filename, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            self.mmaps.append(m)
+            self.tables.append(
+                np.frombuffer(m, dtype=np.uint64, count=header["num_items"] + 1, offset=header["table_position"])
+            )
+        self.pid = os.getpid()
+
+    @staticmethod
+    def __read_header(filename: str) -> dict:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the header and the metadata of a shard
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the shard
+
+        RETURN:
+        -------
+
+        :return header (dict): The header of the shard
+        """
+        with open(filename, "rb") as f:
+            magic, version, num_items, table_position, metadata_position, metadata_size = \
+                SHARD_HEADER.unpack(f.read(SHARD_HEADER.size))
+            if magic != SHARD_MAGIC or version != SHARD_VERSION:
+                Notification(DEEP_NOTIF_FATAL, "The following file is not a valid shard : %s" % filename)
+            f.seek(metadata_position)
+            metadata = json.loads(f.read(metadata_size).decode())
+        return {
+            "num_items": num_items,
+            "table_position": table_position,
+            "metadata": metadata
+        }
+
+    @staticmethod
+    def __list_files(path: str) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        List the shard files in the given path
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): Path to a shard file or to a directory of shard files
+
+        RETURN:
+        -------
+
+        :return (List[str]): The sorted list of shard files
+        """
+        if os.path.isfile(path):
+            return [path]
+        elif os.path.isdir(path):
+            return sorted_nicely(
+                ["/".join([path, f]) for f in os.listdir(path) if f.endswith(DEEP_EXT_SHARD)]
+            )
+        else:
+            Notification(DEEP_NOTIF_FATAL, "The following path is not a shard file or directory : %s" % path)
+
+
+class ShardWriter(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Write the items of an entry into a sequence of shards
+    A new shard is started each time the current one exceeds the maximum shard size.
+
+    """
+
+    def __init__(self, directory: str, shard_size: int, metadata: Optional[dict] = None):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.metadata = {} if metadata is None else metadata
+
+        # Current shard
+        self.file = None
+        self.positions = []
+        self.num_shards = 0
+        self.num_items = 0
+
+        # Remove the shards of a previous compilation
+        os.makedirs(directory, exist_ok=True)
+        for f in os.listdir(directory):
+            if f.endswith(DEEP_EXT_SHARD):
+                os.remove("/".join([directory, f]))
+
+    def write(self, data: Union[Any, List[Any]]) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Write an item (or a sequence of items) as a new record (see write_record)
+
+        PARAMETERS:
+        -----------
+
+        :param data (Union[Any, List[Any]]): The item to write
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.file is None:
+            self.__start()
+        elif self.file.tell() >= self.shard_size:
+            self.__finish()
+            self.__start()
+
+        self.positions.append(self.file.tell())
+        write_record(self.file, data)
+        self.num_items += 1
+
+    def close(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Finish the current shard
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.file is not None:
+            self.__finish()
+
+    def __start(self) -> None:
+        filename = "%s/%05i%s" % (self.directory, self.num_shards, DEEP_EXT_SHARD)
+        self.file = open(filename + ".tmp", "wb")
+        self.file.write(SHARD_HEADER.pack(SHARD_MAGIC, SHARD_VERSION, 0, 0, 0, 0))
+        self.__pad()
+        self.positions = []
+
+    def __finish(self) -> None:
+        # Offset table
+        table_position = self.file.tell()
+        self.positions.append(table_position)
+        np.array(self.positions, dtype=np.uint64).tofile(self.file)
+
+        # Metadata
+        metadata_position = self.file.tell()
+        metadata = json.dumps(self.metadata).encode()
+        self.file.write(metadata)
+
+        # Header
+        self.file.seek(0)
+        self.file.write(SHARD_HEADER.pack(
+            SHARD_MAGIC, SHARD_VERSION, len(self.positions) - 1, table_position, metadata_position, len(metadata)
+        ))
+        filename = self.file.name
+        self.file.close()
+        os.replace(filename, filename[:-len(".tmp")])
+
+        self.file = None
+        self.num_shards += 1
+
+    def __pad(self) -> None:
+        pad(self.file)
+
+
+def write_record(file: BinaryIO, data: Union[Any, List[Any]]) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Write an item (or a sequence of items) as a record at the current (aligned) position of a file
+    Each part of the record is written as a small header followed by the aligned raw data
+
+    PARAMETERS:
+    -----------
+
+    :param file (BinaryIO): The file
+    :param data (Union[Any, List[Any]]): The item to write
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    is_sequence = isinstance(data, list)
+    parts = data if is_sequence else [data]
+
+    file.write(SHARD_RECORD.pack(len(parts), int(is_sequence)))
+    for part in parts:
+        kind, array = convert_part(part)
+        if kind in (SHARD_PART_BYTES, SHARD_PART_STRING):
+            raw = part.encode() if kind == SHARD_PART_STRING else bytes(part)
+            shape, dtype = (), b""
+        else:
+            raw = None
+            shape, dtype = array.shape, array.dtype.str.encode()
+        num_bytes = len(raw) if raw is not None else array.nbytes
+        file.write(SHARD_PART.pack(kind, len(shape), len(dtype), num_bytes))
+        file.write(struct.pack("<%iq" % len(shape), *shape))
+        file.write(dtype)
+        pad(file)
+        if raw is not None:
+            file.write(raw)
+        else:
+            file.write(np.ascontiguousarray(array).tobytes())
+        pad(file)
+
+
+def read_record(buffer: Union[mmap.mmap, bytes], position: int) -> Union[Any, List[Any]]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Read the item record at the given position
+    The arrays are zero-copy views on the buffer
+
+    PARAMETERS:
+    -----------
+
+    :param buffer (Union[mmap.mmap, bytes]): The memory map of the file
+    :param position (int): The position of the record in the file
+
+    RETURN:
+    -------
+
+    :return data (Union[Any, List[Any]]): The item (or the sequence of items)
+    """
+    num_parts, is_sequence = SHARD_RECORD.unpack_from(buffer, position)
+    position += SHARD_RECORD.size
+    parts = []
+    for _ in range(num_parts):
+        kind, ndim, dtype_length, num_bytes = SHARD_PART.unpack_from(buffer, position)
+        position += SHARD_PART.size
+        shape = struct.unpack_from("<%iq" % ndim, buffer, position)
+        position += 8 * ndim
+        dtype = bytes(buffer[position:position + dtype_length]).decode()
+        position = align(position + dtype_length)
+        if kind == SHARD_PART_BYTES:
+            part = bytes(buffer[position:position + num_bytes])
+        elif kind == SHARD_PART_STRING:
+            part = bytes(buffer[position:position + num_bytes]).decode()
+        else:
+            part = np.frombuffer(buffer, dtype=np.dtype(dtype), count=int(np.prod(shape)), offset=position)
+            part = part.reshape(shape)
+            if kind == SHARD_PART_SCALAR:
+                part = part.item()
+        parts.append(part)
+        position = align(position + num_bytes)
+    return parts if is_sequence else parts[0]
+
+
+def convert_part(part: Any) -> Tuple[int, Optional[np.array]]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get the kind of a part and convert it to a numpy array if required
+
+    PARAMETERS:
+    -----------
+
+    :param part (Any): The part to write
+
+    RETURN:
+    -------
+
+    :return (Tuple[int, Optional[np.array]]): The kind of the part, the numpy array to write
+    """
+    if isinstance(part, (bytes, bytearray, memoryview)):
+        return SHARD_PART_BYTES, None
+    elif isinstance(part, str):
+        return SHARD_PART_STRING, None
+    elif isinstance(part, np.ndarray) and part.dtype != object:
+        return SHARD_PART_ARRAY, part
+    else:
+        array = np.asarray(part)
+        if array.dtype == object:
+            Notification(DEEP_NOTIF_FATAL, "The following item cannot be written into a shard : %s" % str(part))
+        return SHARD_PART_SCALAR if array.ndim == 0 else SHARD_PART_ARRAY, array
+
+
+def is_writable(data: Union[Any, List[Any]]) -> bool:
+    # Whether an item (or a sequence of items) can be written as a record (see convert_part)
+    for part in data if isinstance(data, list) else [data]:
+        if not isinstance(part, (bytes, bytearray, memoryview, str)):
+            try:
+                if np.asarray(part).dtype == object:
+                    return False
+            except ValueError:
+                return False
+    return True
+
+
+def pad(file: BinaryIO) -> None:
+    # Pad the file up to the next aligned position
+    position = file.tell()
+    file.write(b"\0" * (align(position) - position))
+
+
+def align(position: int) -> int:
+    """
+    DESCRIPTION:
+    ------------
+
+    Align a position in a shard on SHARD_ALIGNMENT bytes
+
+    PARAMETERS:
+    -----------
+
+    :param position (int): The position to align
+
+    RETURN:
+    -------
+
+    :return (int): The aligned position
+    """
+    return (position + SHARD_ALIGNMENT - 1) // SHARD_ALIGNMENT * SHARD_ALIGNMENT
@@ -1,8 +1,11 @@
 # Python imports
 from typing import Any
+from typing import List
 from typing import Tuple
 from typing import Optional
 from typing import Union
+from typing import Iterator
+import itertools
 
 # Deeplodocus imports
 from deeplodocus.utils.notification import Notification
@@ -58,6 +61,26 @@ class Source(object):
     def __len__(self) -> Optional[int]:
         return self.num_instances
 
+    def get_batch(self, indices: List[int]) -> List[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the items at the selected indices
+        Sources able to read several items at once (e.g. in a single pass) should override this method
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected items
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[Any, bool, bool]]): The output of __getitem__ for each index
+        """
+        return [self.__getitem__(index) for index in indices]
+
     def check(self):
         """
         AUTHORS:
@@ -104,6 +127,71 @@ class Source(object):
         if self.checked is False:
             Notification(DEEP_NOTIF_ERROR, "The source with the ID %i is not checked properly, please make sure you used super().check() in the custom check() function of your Source")
 
+    def stream(self, start: int = 0, step: int = 1) -> Iterator[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Yield the items of the indices start, start + step, start + 2 * step, ... (streaming mode)
+        Each DataLoader worker streams its own partition of the Source (different start, same step)
+        Unlimited Sources (e.g. continuous producers) should override this method with a generator
+        yielding the items as they are produced, the indices may then be ignored
+
+        PARAMETERS:
+        -----------
+
+        :param start (int): The index of the first item
+        :param step (int): The step between two indices (number of partitions)
+
+        RETURN:
+        -------
+
+        :return (Iterator[Tuple[Any, bool, bool]]): The output of __getitem__ for each index
+        """
+        for index in itertools.count(start, step):
+            yield self.__getitem__(index)
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the data of the Source
+        Sources reading files should override this method so the cached decoded items are invalidated when the files change
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the Source (constant by default)
+        """
+        return 0
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the files whose size and modification time identify the data of the Source
+        The manifest of the Dataset reuses the length of the Source while these files do not change
+        Sources reading files should override this method, the length of the other Sources is always computed
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the Source (empty by default)
+        """
+        return []
+
     def compute_length(self) -> Optional[int]:
         Notification(DEEP_NOTIF_WARNING, "You forgot to compute the length of a Source instance")
         return None
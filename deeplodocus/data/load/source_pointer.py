@@ -54,6 +54,17 @@ class SourcePointer(Source):
         # Weakref of the Entry instance (set later)
         self.weakref_entry = None
 
+    def __getstate__(self) -> dict:
+        # Weak references cannot be pickled, the Entry is pickled instead (see __setstate__)
+        state = self.__dict__.copy()
+        state["weakref_entry"] = self.weakref_entry() if self.weakref_entry is not None else None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        if state["weakref_entry"] is not None:
+            state["weakref_entry"] = weakref.ref(state["weakref_entry"])
+        self.__dict__.update(state)
+
     def __getitem__(self, index: int) -> Tuple[Any, bool, bool]:
         """
         AUTHORS:
@@ -3,6 +3,8 @@ from typing import Any
 from typing import Tuple
 from typing import Optional
 from typing import List
+from typing import Iterator
+import itertools
 
 # Deeplodocus imports
 from deeplodocus.data.load.source import Source
@@ -82,6 +84,39 @@ class SourceWrapper(Source):
         # Return the items, is_loaded and is_transformed
         return items, self.is_loaded, self.is_transformed
 
+    def stream(self, start: int = 0, step: int = 1) -> Iterator[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Yield the items of a partition of the wrapped module (streaming mode)
+        The items are taken from the stream() method of the module if any,
+        else from the iterator of the module if it cannot be indexed (e.g. an IterableDataset or a generator),
+        else from the indices start, start + step, ...
+
+        PARAMETERS:
+        -----------
+
+        :param start (int): The index of the first item
+        :param step (int): The step between two indices (number of partitions)
+
+        RETURN:
+        -------
+
+        :return (Iterator[Tuple[Any, bool, bool]]): The items, whether they are loaded and whether they are transformed
+        """
+        if hasattr(self.module, "stream"):
+            stream = self.module.stream(start, step)
+        elif not hasattr(self.module, "__getitem__") and hasattr(self.module, "__iter__"):
+            stream = itertools.islice(iter(self.module), start, None, step)
+        else:
+            stream = (self.module.__getitem__(index) for index in itertools.count(start, step))
+
+        for items in stream:
+            if self.instance_indices is not None:
+                items = self.__select_items(items)
+            yield items, self.is_loaded, self.is_transformed
+
     def __select_items(self, items: List[Any]):
         """
         AUTHORS:
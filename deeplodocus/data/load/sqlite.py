@@ -0,0 +1,334 @@
+# Python imports
+import os
+import sqlite3
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Optional
+from urllib.parse import quote
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.data.load.source import Source
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+# Maximum number of rowids in a single "IN (...)" clause (limit of the host parameters of old SQLite versions)
+SQLITE_MAX_VARIABLES = 900
+
+# Connections inherited from the parent process when forked
+# They must not be closed (or garbage collected) in the child as they share the file descriptors and locks of the parent
+_INHERITED_CONNECTIONS = []
+
+
+class SQLite(Source):
+    """
+    DESCRIPTION:
+    ------------
+
+    Load the items of an entry from a column of a table in a local SQLite database
+
+    The instance i is the i-th row of the table in the order of the rowids,
+    or the row given by an index table mapping the instance indices to the rowids (e.g. a split or a fixed shuffle).
+    Each process (e.g. each DataLoader worker) opens its own read-only connection the first time it reads an item.
+    A batch of items is fetched with a single "WHERE rowid IN (...)" query.
+
+    Blobs are returned as bytes and decoded by the Loader of the entry (e.g. encoded images),
+    integer, real and text values are returned as they are stored.
+    """
+
+    def __init__(self,
+                 index: int = -1,
+                 is_loaded: bool = False,
+                 is_transformed: bool = False,
+                 path: str = "",
+                 table: str = "",
+                 column: str = "",
+                 index_table: Optional[str] = None,
+                 num_instances: Optional[int] = None,
+                 instance_id: int = 0
+                 ):
+
+        super().__init__(index=index,
+                         num_instances=num_instances,
+                         is_loaded=is_loaded,
+                         is_transformed=is_transformed,
+                         instance_id=instance_id)
+
+        self.path = path
+        self.table = table
+        self.column = column
+        self.index_table = index_table
+
+        # Rowid of each instance (None if an index table maps the instances to the rows)
+        self.rowids = None
+        self.length = None
+        self.__read_rows()
+
+        # Connection (opened lazily in each process)
+        self.connection = None
+        self.pid = None
+
+    def __getitem__(self, index: int) -> Tuple[Any, bool, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the value of the selected column in the row of the selected instance
+
+        PARAMETERS:
+        -----------
+
+        :param index(int): The index of the selected instance
+
+        RETURN:
+        -------
+
+        :return data: The value, whether it is loaded, whether it is transformed
+        """
+        return self.get_batch([index])[0]
+
+    def get_batch(self, indices: List[int]) -> List[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the values of the selected column in the rows of the selected instances
+        The rows are fetched by chunks of at most SQLITE_MAX_VARIABLES indices in a single query
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected instances
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[Any, bool, bool]]): The output of __getitem__ for each index
+        """
+        if self.pid != os.getpid():
+            self.__connect()
+
+        values = {}
+        keys = list(set(indices))
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            values.update(self.connection.execute(self.__select_query(len(chunk)), self.__get_keys(chunk)).fetchall())
+
+        # The query returns the rows in any order, they are matched by key
+        try:
+            return [(values[key], self.is_loaded, self.is_transformed) for key in self.__get_keys(indices)]
+        except KeyError as e:
+            Notification(DEEP_NOTIF_FATAL, "The row %s of the table %s was not found in the SQLite database %s" % (e, self.table, self.path),
+                         solutions="The database was modified after the dataset was loaded, restart the program")
+
+    def __getstate__(self) -> dict:
+        # Connections cannot be pickled, they are opened again in the new process
+        state = self.__dict__.copy()
+        state["connection"] = None
+        state["pid"] = None
+        return state
+
+    def compute_length(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the length of the source (number of rows of the table, or of the index table)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return length(int): The length of the source
+        """
+        return self.length
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the database (size and modification time of the database and of its write-ahead log)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the database
+        """
+        stats = [os.stat(filename) for filename in (self.path, self.path + "-wal") if os.path.isfile(filename)]
+        return hash((self.table, self.column, self.index_table) + tuple((stat.st_size, stat.st_mtime_ns) for stat in stats))
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the database and its write-ahead log (if any)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return [filename for filename in (self.path, self.path + "-wal") if os.path.isfile(filename)]
+
+    def check(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check the table contains rows
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.length == 0:
+            Notification(DEEP_NOTIF_FATAL, "The table %s of the SQLite database %s is empty" % (self.index_table or self.table, self.path))
+        super().check()
+        Notification(DEEP_NOTIF_SUCCESS, "Source SQLite \"%s\" successfully loaded (%s.%s, %i rows)" % (
+            self.path, self.table, self.column, self.length
+        ))
+
+    def __connect(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Open a read-only connection to the database in the current process
+        A connection inherited from the parent process is kept open but never used
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.connection is not None:
+            _INHERITED_CONNECTIONS.append(self.connection)
+        self.connection = self.__open_connection(self.path)
+        self.pid = os.getpid()
+
+    def __read_rows(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the number of instances and the rowid of each instance (unless an index table is given)
+        The connection is closed so that no connection is inherited by the DataLoader workers
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if not os.path.isfile(self.path):
+            Notification(DEEP_NOTIF_FATAL, "The following SQLite database does not exist : %s" % self.path)
+        connection = self.__open_connection(self.path)
+        try:
+            if self.index_table is None:
+                rows = connection.execute("SELECT rowid FROM %s ORDER BY rowid" % quote_identifier(self.table)).fetchall()
+                self.rowids = np.array([row[0] for row in rows], dtype=np.int64)
+                self.length = len(self.rowids)
+            else:
+                self.length = connection.execute("SELECT COUNT(*) FROM %s" % quote_identifier(self.index_table)).fetchone()[0]
+            # Check the column exists
+            connection.execute(self.__select_query(1), [0]).fetchall()
+        except sqlite3.Error as e:
+            Notification(DEEP_NOTIF_FATAL, "Could not read the SQLite database %s : %s" % (self.path, str(e)),
+                         solutions="An index table must have the columns \"idx\" (instance index) and \"row\" (rowid of the table)"
+                         if self.index_table is not None else None)
+        finally:
+            connection.close()
+
+    def __select_query(self, num_keys: int) -> str:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the query selecting the key and the value of the column for a given number of keys
+        The keys are the rowids of the table, or the instance indices of the index table
+
+        PARAMETERS:
+        -----------
+
+        :param num_keys (int): The number of keys
+
+        RETURN:
+        -------
+
+        :return (str): The query
+        """
+        parameters = ", ".join(["?"] * num_keys)
+        if self.index_table is None:
+            return "SELECT rowid, %s FROM %s WHERE rowid IN (%s)" % (
+                quote_identifier(self.column), quote_identifier(self.table), parameters
+            )
+        return "SELECT i.idx, t.%s FROM %s AS i JOIN %s AS t ON t.rowid = i.row WHERE i.idx IN (%s)" % (
+            quote_identifier(self.column), quote_identifier(self.index_table), quote_identifier(self.table), parameters
+        )
+
+    def __get_keys(self, indices: List[int]) -> List[int]:
+        # Keys of the instances in the select query
+        if self.rowids is None:
+            return [int(index) for index in indices]
+        return self.rowids[indices].tolist()
+
+    @staticmethod
+    def __open_connection(path: str) -> sqlite3.Connection:
+        # Read-only connection, usable by the thread prefetching the batches
+        return sqlite3.connect("file:%s?mode=ro" % quote(os.path.abspath(path)), uri=True, check_same_thread=False)
+
+
+def quote_identifier(name: str) -> str:
+    """
+    DESCRIPTION:
+    ------------
+
+    Quote the name of a table or a column in a SQLite query
+
+    PARAMETERS:
+    -----------
+
+    :param name (str): The name of the table or the column
+
+    RETURN:
+    -------
+
+    :return (str): The quoted name
+    """
+    return "\"%s\"" % name.replace("\"", "\"\"")
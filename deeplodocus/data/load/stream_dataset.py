@@ -0,0 +1,174 @@
+# Python imports
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Iterator
+from typing import Optional
+
+# Third party libs
+from torch.utils.data import IterableDataset
+from torch.utils.data import get_worker_info
+
+# Deeplodocus imports
+from deeplodocus.data.load.dataset import Dataset
+from deeplodocus.utils.notification import Notification
+
+# Deeplodocus flags
+from deeplodocus.flags import *
+
+
+class StreamDataset(IterableDataset):
+    """
+    DESCRIPTION:
+    ------------
+
+    Streaming view of an unlimited Dataset (e.g. data from an Agent, a camera or any continuous producer)
+
+    The instances are not indexed : each Entry streams its items from generators.
+    Each DataLoader worker (of each process in distributed training) streams its own partition of the instances,
+    the partition p of P partitions is made of the instances p, p + P, p + 2P, ...
+    An epoch is made of steps_per_epoch instances in total and the next epoch continues the streams.
+    In distributed training, each process gets ceil(steps_per_epoch / world_size) instances split the same way
+    between its workers, so that all the processes get the same number of batches.
+
+    The memory used stays constant whatever the number of streamed instances.
+    """
+
+    def __init__(self, dataset: Dataset, steps_per_epoch: Optional[int] = None):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the streaming view of a Dataset
+
+        PARAMETERS:
+        -----------
+
+        :param dataset (Dataset): The unlimited Dataset
+        :param steps_per_epoch (Optional[int]): The number of instances in each epoch (steps_per_epoch of the Dataset by default)
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        super(StreamDataset, self).__init__()
+        self.dataset = dataset
+        self.steps_per_epoch = dataset.steps_per_epoch if steps_per_epoch is None else steps_per_epoch
+        self.epoch = 0
+
+        # Sharding of the stream between the processes (see set_shard)
+        self.rank = 0
+        self.world_size = 1
+
+        # Attributes of the Dataset used by the Inferer instances
+        self.name = dataset.name
+        self.type = dataset.type
+        self.entries = dataset.entries
+
+    def __iter__(self) -> Iterator[Tuple[List[Any], List[Any], List[Any]]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Stream the instances of the current epoch in the partition of the current process and DataLoader worker
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (Iterator[Tuple[List[Any], List[Any], List[Any]]]): The inputs, labels and additional data of each instance
+        """
+        worker_info = get_worker_info()
+        worker_id, num_workers = (0, 1) if worker_info is None else (worker_info.id, worker_info.num_workers)
+
+        # One partition for each worker of each process
+        # The instance i of the process is the instance i * world_size + rank of the epoch
+        return self.dataset.stream(
+            start=self.epoch * self.world_size * len(self) + worker_id * self.world_size + self.rank,
+            step=self.world_size * num_workers,
+            num_instances=len(range(worker_id, len(self), num_workers))
+        )
+
+    def __len__(self) -> int:
+        # Number of instances of each process in each epoch (the same for all the processes)
+        return -(-self.steps_per_epoch // self.world_size)
+
+    def get_num_batches(self, batch_size: int, num_workers: int = 0) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the number of batches of each process in each epoch
+        Each DataLoader worker batches its own partition, so the last batch of each worker may be incomplete
+
+        PARAMETERS:
+        -----------
+
+        :param batch_size (int): The number of instances in a batch
+        :param num_workers (int): The number of DataLoader workers
+
+        RETURN:
+        -------
+
+        :return (int): The number of batches
+        """
+        num_workers = max(num_workers, 1)
+        return sum([
+            -(-len(range(worker_id, len(self), num_workers)) // batch_size)
+            for worker_id in range(num_workers)
+        ])
+
+    def set_shard(self, rank: int = 0, world_size: int = 1, seed: Optional[int] = None, drop_last: bool = False) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Split the stream between several processes (e.g. distributed training)
+        The seed and drop_last are ignored : the instances are streamed in the order they are produced
+
+        PARAMETERS:
+        -----------
+
+        :param rank (int): The rank of the current process
+        :param world_size (int): The number of processes
+        :param seed (Optional[int]): Ignored
+        :param drop_last (bool): Ignored
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.rank = rank
+        self.world_size = world_size
+
+    def shuffle(self, method: Flag, verbose: bool = True, epoch: Optional[int] = None, **kwargs) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Move to the next epoch (a stream cannot be shuffled, the instances are streamed in the order they are produced)
+
+        PARAMETERS:
+        -----------
+
+        :param method (Flag): The shuffling method Flag (ignored)
+        :param verbose (bool): Whether to notify the shuffling
+        :param epoch (Optional[int]): The index of the epoch (1 for the first epoch), the next epoch if None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.epoch = self.epoch + 1 if epoch is None else max(epoch - 1, 0)
+        if verbose and not DEEP_SHUFFLE_NONE.corresponds(info=method):
+            Notification(DEEP_NOTIF_INFO, "Dataset %s is streamed : the instances are not shuffled" % self.name)
+
+    def reset(self) -> None:
+        self.dataset.reset()
@@ -0,0 +1,225 @@
+# Python imports
+import os
+import mmap
+import shutil
+import tempfile
+from typing import Any
+from typing import List
+from typing import Union
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.data.load.shard import write_record
+from deeplodocus.data.load.shard import read_record
+from deeplodocus.data.load.shard import is_writable
+
+# Deeplodocus flags
+from deeplodocus.flags.notif import *
+
+# Extensions of the files of the cache
+TRANSFORM_CACHE_SEGMENT = ".seg"
+TRANSFORM_CACHE_INDEX = ".idx"
+
+
+class TransformCache(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    On-disk cache of the output of the deterministic start of a Transformer (see Transformer.get_deterministic_start)
+    for each raw instance of an Entry, reused across the epochs and the runs
+
+    The cache is a directory named after a fingerprint of the transforms and of the Source instances of the Entry :
+    when the transforms (names, modules or kwargs) or the files of the Entry change, a new directory is used
+    and the outdated directories are removed.
+
+    Each process (e.g. DataLoader worker) appends the items it computes to its own segment, written as shard records
+    (see write_record), and appends the index and the position of each item to the index file of its segment
+    once the item is written, so the processes never write the same file and a partially written item is never read.
+    The segments are memory-mapped (copy-on-write) when a process opens the cache, so the cached arrays are zero-copy
+    views which transforms can still modify in place. The items cached by the other processes are read by the processes
+    opening the cache afterwards (e.g. the workers of the next epoch).
+    """
+
+    def __init__(self, directory: str, fingerprint: str, num_keys: int, name: str = "entry"):
+        """
+        DESCRIPTION:
+        ------------
+
+        Create the directory of the cache and remove the outdated caches of the Entry
+
+        PARAMETERS:
+        -----------
+
+        :param directory (str): The directory of the caches of the Entry
+        :param fingerprint (str): The fingerprint of the transforms and of the Source instances of the Entry
+        :param num_keys (int): The number of items that can be cached (number of raw instances in the Entry)
+        :param name (str): The name of the Entry
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.path = "%s/%s" % (directory, fingerprint)
+        self.num_keys = num_keys
+        self.name = name
+
+        # Remove the caches computed with other transforms or other files
+        if os.path.isdir(directory):
+            for f in os.listdir(directory):
+                if f != fingerprint:
+                    shutil.rmtree("%s/%s" % (directory, f), ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+        # State of the current process (opened lazily in each process)
+        self.pid = None
+        self.positions = None   # Segment and position of each cached item (-1 if not cached)
+        self.segments = None    # Path of each segment
+        self.buffers = None     # Memory map of each segment
+        self.file = None        # Segment written by the current process
+        self.index_file = None  # Index file of the segment written by the current process
+
+        self.__open()
+        Notification(DEEP_NOTIF_INFO, "Transform cache of %s : %i / %i items cached in %s" % (
+            name, self.get_num_cached(), num_keys, self.path
+        ))
+
+    def __getstate__(self) -> dict:
+        # Files and memory maps cannot be pickled, the cache is opened again in the new process
+        state = self.__dict__.copy()
+        for key in ("pid", "positions", "segments", "buffers", "file", "index_file"):
+            state[key] = None
+        return state
+
+    def get(self, key: int) -> Optional[Union[Any, List[Any]]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a cached item
+
+        PARAMETERS:
+        -----------
+
+        :param key (int): The index of the raw instance
+
+        RETURN:
+        -------
+
+        :return (Optional[Union[Any, List[Any]]]): The cached item, None if the item is not cached
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        segment, position = self.positions[key]
+        if segment < 0:
+            return None
+        return read_record(self.__get_buffer(segment, position), int(position))
+
+    def put(self, key: int, data: Union[Any, List[Any]]) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Cache an item in the segment of the current process
+
+        PARAMETERS:
+        -----------
+
+        :param key (int): The index of the raw instance
+        :param data (Union[Any, List[Any]]): The item (or the sequence of items)
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the item was cached (only arrays, numbers, strings and bytes can be cached)
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        if not is_writable(data):
+            return False
+        try:
+            if self.file is None:
+                self.__create_segment()
+            position = self.file.tell()
+            write_record(self.file, data)
+            self.file.flush()
+
+            # The item is indexed only once it is written
+            np.array([key, position], dtype=np.int64).tofile(self.index_file)
+            self.index_file.flush()
+        except OSError as e:
+            Notification(DEEP_NOTIF_DEBUG, "Could not write the transform cache %s : %s" % (self.path, str(e)))
+            return False
+        self.positions[key] = (len(self.segments) - 1, position)
+        return True
+
+    def get_num_cached(self) -> int:
+        # Number of items cached when the current process opened the cache
+        return int(np.sum(self.positions["segment"] >= 0))
+
+    def __open(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Read the index files of the segments and memory map the segments in the current process
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.positions = np.full(self.num_keys, -1, dtype=[("segment", np.int64), ("position", np.int64)])
+        self.segments = []
+        self.buffers = []
+        self.file = None
+        self.index_file = None
+        for f in sorted(os.listdir(self.path)):
+            if not f.endswith(TRANSFORM_CACHE_INDEX):
+                continue
+            segment = "%s/%s%s" % (self.path, f[:-len(TRANSFORM_CACHE_INDEX)], TRANSFORM_CACHE_SEGMENT)
+            try:
+                index = np.fromfile("%s/%s" % (self.path, f), dtype=np.int64)
+                buffer = self.__map(segment)
+            except (OSError, ValueError):
+                continue
+            index = index[:len(index) // 2 * 2].reshape(-1, 2)
+            index = index[(index[:, 0] >= 0) & (index[:, 0] < self.num_keys)]
+            self.positions["segment"][index[:, 0]] = len(self.segments)
+            self.positions["position"][index[:, 0]] = index[:, 1]
+            self.segments.append(segment)
+            self.buffers.append(buffer)
+        self.pid = os.getpid()
+
+    def __create_segment(self) -> None:
+        # Segment of the current process (its index file is created empty, the items are indexed once written)
+        fd, segment = tempfile.mkstemp(prefix="%i-" % os.getpid(), suffix=TRANSFORM_CACHE_SEGMENT, dir=self.path)
+        self.file = os.fdopen(fd, "wb")
+        self.index_file = open(segment[:-len(TRANSFORM_CACHE_SEGMENT)] + TRANSFORM_CACHE_INDEX, "wb")
+        self.segments.append(segment)
+        self.buffers.append(None)
+
+    def __get_buffer(self, segment: int, position: int) -> mmap.mmap:
+        # The segment of the current process grows, it is mapped again to read the items written after the last mapping
+        buffer = self.buffers[segment]
+        if buffer is None or position >= len(buffer):
+            buffer = self.__map(self.segments[segment])
+            self.buffers[segment] = buffer
+        return buffer
+
+    @staticmethod
+    def __map(segment: str) -> Optional[mmap.mmap]:
+        with open(segment, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
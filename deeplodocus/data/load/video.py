@@ -0,0 +1,449 @@
+# Python imports
+import os
+import json
+import bisect
+from collections import OrderedDict
+from typing import Any
+from typing import List
+from typing import Tuple
+from typing import Optional
+
+# Third party libs
+import cv2
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+from deeplodocus.utils.generic_utils import sorted_nicely
+from deeplodocus.data.load.source import Source
+
+# Deeplodocus flags
+from deeplodocus.flags.ext import DEEP_EXT_VIDEO_INDEX
+from deeplodocus.flags.notif import *
+
+# Version of the frame index sidecar files
+VIDEO_INDEX_VERSION = 1
+
+# Extensions of the video files searched in a directory
+VIDEO_EXTENSIONS = (".avi", ".mp4", ".mkv", ".mov", ".mpg", ".mpeg", ".webm", ".wmv", ".m4v")
+
+
+class Video(Source):
+    """
+    DESCRIPTION:
+    ------------
+
+    Load windows of frames (clips) from video files without decoding the whole videos
+
+    The frames of each video are indexed once (number of frames and timestamps) and the index is cached next to the video.
+    Each item is a clip of clip_length frames, the clips start every stride frames.
+    Only the frames of the requested clip are decoded, the readers seek to the first frame with CAP_PROP_POS_FRAMES.
+    Each process keeps a small pool of open readers, so consecutive clips of a video are read without seeking.
+    """
+
+    def __init__(self,
+                 index: int = -1,
+                 is_loaded: bool = True,
+                 is_transformed: bool = False,
+                 path: str = "",
+                 clip_length: int = 1,
+                 stride: Optional[int] = None,
+                 step: int = 1,
+                 num_readers: int = 4,
+                 num_instances: Optional[int] = None,
+                 instance_id: int = 0
+                 ):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize a Video Source instance
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): Path to a video file or to a directory of video files
+        :param clip_length (int): The number of frames of each clip (a clip of 1 frame is returned as a single image)
+        :param stride (Optional[int]): The number of frames between the start of two clips (default: clip_length * step)
+        :param step (int): The number of frames between two frames of a clip
+        :param num_readers (int): The number of videos kept open by each process
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        super().__init__(index=index,
+                         num_instances=num_instances,
+                         is_loaded=is_loaded,
+                         is_transformed=is_transformed,
+                         instance_id=instance_id)
+
+        self.path = path
+        self.clip_length = clip_length
+        self.step = step
+        self.stride = clip_length * step if stride is None else stride
+        self.num_readers = num_readers
+
+        # Video files and their frame indices (indexed when the source is checked)
+        self.files = self.__list_files(path)
+        self.frame_indices = None
+
+        # Cumulative number of clips in the videos (used to find the video of a clip)
+        self.offsets = None
+
+        # Open readers of the current process : path -> [cv2.VideoCapture, index of the next frame]
+        self.readers = OrderedDict()
+        self.pid = None
+
+    def __getitem__(self, index: int) -> Tuple[Any, bool, bool]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the clip at the selected index
+
+        PARAMETERS:
+        -----------
+
+        :param index(int): The index of the selected clip
+
+        RETURN:
+        -------
+
+        :return data: The clip (RGB frames), whether it is loaded, whether it is transformed
+        """
+        video_index, start = self.__compute_clip_position(index)
+        return self.__read_clip(video_index, start), self.is_loaded, self.is_transformed
+
+    def get_batch(self, indices: List[int]) -> List[Tuple[Any, bool, bool]]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the clips at the selected indices
+        The clips are read in the order of the videos and of the frames to limit the number of seeks
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the selected clips
+
+        RETURN:
+        -------
+
+        :return (List[Tuple[Any, bool, bool]]): The clip, whether it is loaded, whether it is transformed, for each index
+        """
+        positions = [self.__compute_clip_position(index) for index in indices]
+        outputs = [None] * len(indices)
+        for i in sorted(range(len(indices)), key=lambda i: positions[i]):
+            outputs[i] = (self.__read_clip(*positions[i]), self.is_loaded, self.is_transformed)
+        return outputs
+
+    def get_timestamps(self, index: int) -> List[float]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the timestamps of the frames of a clip
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the clip
+
+        RETURN:
+        -------
+
+        :return (List[float]): The timestamp of each frame of the clip (in ms)
+        """
+        video_index, start = self.__compute_clip_position(index)
+        timestamps = self.frame_indices[video_index]["timestamps"]
+        return timestamps[start:start + (self.clip_length - 1) * self.step + 1:self.step].tolist()
+
+    def __getstate__(self) -> dict:
+        # Video readers cannot be pickled, they are opened again in the new process
+        state = self.__dict__.copy()
+        state["readers"] = OrderedDict()
+        state["pid"] = None
+        return state
+
+    def compute_length(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Compute the length of the source from the frame indices of the videos
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return length(int): The number of clips in the source
+        """
+        return self.offsets[-1]
+
+    def get_fingerprint(self) -> int:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get a fingerprint of the video files (size and modification time)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (int): The fingerprint of the video files
+        """
+        return hash(tuple((i["size"], i["mtime_ns"]) for i in self.frame_indices))
+
+    def get_files(self) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the video files
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[str]): The files of the source
+        """
+        return list(self.files)
+
+    def check(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Index the frames of the videos and compute the number of clips in each video
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if not self.files:
+            Notification(DEEP_NOTIF_FATAL, "No video file found in : %s" % self.path)
+        if self.clip_length < 1 or self.step < 1 or self.stride < 1:
+            Notification(DEEP_NOTIF_FATAL, "The clip_length, stride and step of a Video source must be positive integers")
+
+        self.frame_indices = [self.__get_frame_index(f) for f in self.files]
+
+        # Timestamps are kept in arrays (no Python float per frame in the DataLoader workers)
+        for frame_index in self.frame_indices:
+            frame_index["timestamps"] = np.asarray(frame_index["timestamps"], dtype=np.float64)
+
+        # Number of clips fitting in each video
+        span = (self.clip_length - 1) * self.step + 1
+        self.offsets = [0]
+        for frame_index in self.frame_indices:
+            num_clips = max(0, (frame_index["num_frames"] - span) // self.stride + 1)
+            self.offsets.append(self.offsets[-1] + num_clips)
+
+        super().check()
+        Notification(DEEP_NOTIF_SUCCESS, "Source video \"%s\" successfully loaded (%i videos, %i clips)"
+                     % (self.path, len(self.files), self.offsets[-1]))
+
+    def __compute_clip_position(self, index: int) -> Tuple[int, int]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Find the video of a clip and the index of its first frame
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the clip in the source
+
+        RETURN:
+        -------
+
+        :return (Tuple[int, int]): The index of the video, the index of the first frame of the clip
+        """
+        video_index = bisect.bisect_right(self.offsets, index) - 1
+        return video_index, (index - self.offsets[video_index]) * self.stride
+
+    def __read_clip(self, video_index: int, start: int) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Decode the frames of a clip
+        The reader only seeks if the clip does not start at the next frame of the video
+
+        PARAMETERS:
+        -----------
+
+        :param video_index (int): The index of the video
+        :param start (int): The index of the first frame of the clip
+
+        RETURN:
+        -------
+
+        :return (np.array): The clip (clip_length x H x W x C), or a single frame if clip_length is 1
+        """
+        filename = self.files[video_index]
+        reader = self.__get_reader(filename)
+        if reader[1] != start:
+            reader[0].set(cv2.CAP_PROP_POS_FRAMES, start)
+
+        frames = []
+        span = (self.clip_length - 1) * self.step + 1
+        for i in range(span):
+            # Only the frames of the clip are decoded, the frames in between are skipped
+            if i % self.step == 0:
+                ok, frame = reader[0].read()
+            else:
+                ok, frame = reader[0].grab(), None
+            if not ok:
+                reader[1] = None
+                Notification(DEEP_NOTIF_FATAL, "Could not read the frame %i of the video : %s" % (start + i, filename),
+                             solutions="Delete the frame index %s to index the video again" % (filename + DEEP_EXT_VIDEO_INDEX))
+            if frame is not None:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        reader[1] = start + span
+
+        return frames[0] if self.clip_length == 1 else np.stack(frames)
+
+    def __get_reader(self, filename: str) -> list:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the reader of a video from the pool of the current process
+        The least recently used reader is released if the pool is full
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the video
+
+        RETURN:
+        -------
+
+        :return (list): The reader of the video and the index of the next frame it reads
+        """
+        # Readers are not shared with the parent process
+        if self.pid != os.getpid():
+            self.readers = OrderedDict()
+            self.pid = os.getpid()
+
+        reader = self.readers.get(filename)
+        if reader is None:
+            reader = [cv2.VideoCapture(filename), 0]
+            self.readers[filename] = reader
+            if len(self.readers) > self.num_readers:
+                self.readers.popitem(last=False)[1][0].release()
+        else:
+            self.readers.move_to_end(filename)
+        return reader
+
+    @staticmethod
+    def __get_frame_index(filename: str) -> dict:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the frame index of a video (number of frames and timestamp of each frame in ms)
+        The index is read from its sidecar file if the video did not change, else the video is indexed again
+        The video is indexed by grabbing every frame once (the frames are not converted), the frame count
+        given by the container is not used as it is often wrong
+
+        PARAMETERS:
+        -----------
+
+        :param filename (str): The path to the video
+
+        RETURN:
+        -------
+
+        :return (dict): The frame index of the video
+        """
+        stat = os.stat(filename)
+        index_path = filename + DEEP_EXT_VIDEO_INDEX
+
+        # Reuse the sidecar file
+        try:
+            with open(index_path, "r") as f:
+                frame_index = json.load(f)
+            if frame_index["version"] == VIDEO_INDEX_VERSION \
+                    and frame_index["size"] == stat.st_size \
+                    and frame_index["mtime_ns"] == stat.st_mtime_ns:
+                return frame_index
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # Index the frames
+        Notification(DEEP_NOTIF_INFO, "Indexing the frames of the video : %s" % filename)
+        cap = cv2.VideoCapture(filename)
+        if not cap.isOpened():
+            Notification(DEEP_NOTIF_FATAL, "The following video could not be opened : %s" % filename)
+        timestamps = []
+        while cap.grab():
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+        cap.release()
+
+        frame_index = {
+            "version": VIDEO_INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "num_frames": len(timestamps),
+            "timestamps": timestamps
+        }
+
+        # Cache the index next to the video, kept in memory only if the directory is read-only
+        try:
+            with open(index_path + ".tmp", "w") as f:
+                json.dump(frame_index, f)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError as e:
+            Notification(DEEP_NOTIF_DEBUG, "Could not write the frame index of %s : %s" % (filename, str(e)))
+        return frame_index
+
+    @staticmethod
+    def __list_files(path: str) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        List the video files in the given path
+
+        PARAMETERS:
+        -----------
+
+        :param path (str): Path to a video file or to a directory of video files
+
+        RETURN:
+        -------
+
+        :return (List[str]): The sorted list of video files
+        """
+        if os.path.isfile(path):
+            return [path]
+        elif os.path.isdir(path):
+            return sorted_nicely(
+                ["/".join([path, f]) for f in os.listdir(path) if f.lower().endswith(VIDEO_EXTENSIONS)]
+            )
+        else:
+            Notification(DEEP_NOTIF_FATAL, "The following path is not a video file or directory : %s" % path)
@@ -0,0 +1,71 @@
+# Python imports
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Callable
+import numbers
+
+# Third party libs
+import numpy as np
+
+
+def batched(batch_method: Optional[Callable] = None) -> Callable:
+    """
+    DESCRIPTION:
+    ------------
+
+    Decorator declaring the batched implementation of a transform
+    The batched implementation transforms a whole batch of items stacked along a first axis (e.g. N x H x W x C images)
+    with the same kwargs as the transform, and returns the transformed batch and None.
+    If it takes an info or a rng argument, it is given the list of the info or the random generators of the items,
+    from which it draws the random parameters of each item in the same order as the transform.
+
+    Without batched implementation, the transform itself is used if it works on batches as on single items (e.g. scale)
+
+    PARAMETERS:
+    -----------
+
+    :param batch_method (Optional[Callable]): The batched implementation of the transform (the transform itself if None)
+
+    RETURN:
+    -------
+
+    :return (Callable): The decorator
+    """
+    def decorator(method: Callable) -> Callable:
+        method.batch_method = method if batch_method is None else batch_method
+        return method
+    return decorator
+
+
+def get_batch_method(method: Callable) -> Optional[Callable]:
+    # The batched implementation of a transform, None if the transform has to be applied to each item
+    return getattr(method, "batch_method", None)
+
+
+def stack_items(items: List[Any]) -> Optional[np.array]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Stack the items to transform with a batched implementation
+    Only numpy arrays and numbers with the same shape and the same data type can be stacked
+
+    PARAMETERS:
+    -----------
+
+    :param items (List[Any]): The items
+
+    RETURN:
+    -------
+
+    :return (Optional[np.array]): The batch of items, None if the items cannot be stacked
+    """
+    if not all([isinstance(item, (np.ndarray, np.generic, numbers.Number)) for item in items]):
+        return None
+    items = [np.asarray(item) for item in items]
+    if any([item.dtype.kind not in "biuf" for item in items]):
+        return None
+    if len(set([(item.shape, item.dtype) for item in items])) > 1:
+        return None
+    return np.stack(items)
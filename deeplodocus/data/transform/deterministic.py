@@ -0,0 +1,32 @@
+# Python imports
+from typing import Callable
+
+
+def deterministic(method: Callable) -> Callable:
+    """
+    DESCRIPTION:
+    ------------
+
+    Decorator declaring that a transform always gives the same output for the same data and kwargs (e.g. resize)
+
+    The output of a deterministic transform can be cached (see TransformCache) and the transform is applied as it is
+    to the entries pointing to the same transformer. The global random state is seeded from the random generator of the item
+    around the transforms which are neither deterministic nor take a rng argument (see Transformer.apply_transforms)
+
+    PARAMETERS:
+    -----------
+
+    :param method (Callable): The transform
+
+    RETURN:
+    -------
+
+    :return (Callable): The transform
+    """
+    method.deterministic = True
+    return method
+
+
+def is_deterministic(method: Callable) -> bool:
+    # Whether the transform was declared deterministic
+    return getattr(method, "deterministic", False)
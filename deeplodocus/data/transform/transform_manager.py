@@ -1,6 +1,7 @@
 from typing import Any
 from typing import List
 from typing import Optional
+import numpy as np
 
 # Import transformers
 from deeplodocus.data.transform.transformer.one_of import OneOf
@@ -40,7 +41,8 @@ class TransformManager(object):
     The three transformers are gathered under a generic parent Transformer class.
 
     It is possible to point to another transformer using a pointer.
-    This method is very efficient and allows to have exactly the same output on mulitple inputs (e.g. left and right image of stereo vision)
+    This method is very efficient and allows to have exactly the same output on mulitple inputs (e.g. left and right image of stereo vision) :
+    the entries pointing to the same transformer are given the same random generator (see Dataset.get_random_state)
     """
 
     def __init__(self, name: str, inputs: List[Optional[str]], labels: List[Optional[str]], additional_data: List[Optional[str]], outputs: List[Optional[str]] = None) -> None:
@@ -71,7 +73,7 @@ class TransformManager(object):
         self.list_label_transformers = self.__load_transformers(labels)
         self.list_additional_data_transformers = self.__load_transformers(additional_data)
 
-    def transform(self, data: Any, index: int, entry: PipelineEntry, augment: bool, info=None) -> Any:
+    def transform(self, data: Any, index: int, entry: PipelineEntry, augment: bool, info=None, rng: Optional[np.random.RandomState] = None) -> Any:
         """
         AUTHORS:
         --------
@@ -92,80 +94,94 @@ class TransformManager(object):
         :param data: (Any): The data to transform
         :param index: (int): The index of the data to transform
         :param entry: (PipelineEntry): The entry of the data
-
+        :param augment: (bool): Whether to apply the non mandatory transforms
+        :param info: The information about the instance
+        :param rng: (Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
 
         RETURN:
         -------
 
         :return transformed_data: The transformed data
         """
-        list_transformers = None
+        transformer = self.get_transformer(entry)
 
-        #
-        # Get the list of transformers corresponding to the type of entry
-        #
+        # If it is a NoTransformer instance
+        if transformer is None:
+            return data
 
-        # INPUT
-        if DEEP_ENTRY_INPUT.corresponds(info=entry.get_entry_type()):
-            list_transformers = self.list_input_transformers
+        return transformer.transform(data, index, augment=augment, info=info, rng=rng)
 
-        # LABEL
-        elif DEEP_ENTRY_LABEL.corresponds(info=entry.get_entry_type()):
-            list_transformers = self.list_label_transformers
+    def get_transformer(self, entry: PipelineEntry):
+        """
+        DESCRIPTION:
+        ------------
 
-        # ADDITIONAL DATA
-        elif DEEP_ENTRY_ADDITIONAL_DATA.corresponds(info=entry.get_entry_type()):
-            list_transformers = self.list_additional_data_transformers
+        Get the transformer of an entry
+        If the transformer of the entry is a pointer, the pointed transformer is returned
+        The result does not change once the TransformManager is created, so it can be resolved once per entry
 
-        # OUTPUT
-        elif DEEP_ENTRY_OUTPUT.corresponds(info=entry.get_entry_type()):
-            list_transformers = self.list_output_transformers
+        PARAMETERS:
+        -----------
 
-        # WRONG FLAG
-        else:
-            Notification(DEEP_NOTIF_FATAL, "The following type of entry does not exist : "
-                         + str(entry.get_entry_type().get_description()))
+        :param entry: (PipelineEntry): The entry
+
+        RETURN:
+        -------
+
+        :return transformer: The transformer of the entry, None if the entry has no transform
+        """
+        list_transformers = self.__get_list_transformers(entry.get_entry_type())
+        transformer = list_transformers[entry.get_entry_type_index()]
 
         # If it is a NoTransformer instance
-        if list_transformers[entry.get_entry_type_index()].has_transforms() is False:
-            return data
+        if transformer.has_transforms() is False:
+            return None
 
         # Check if the transformer points to another transformer
-        pointer, pointer_entry_index = list_transformers[entry.get_entry_type_index()].get_pointer()
+        pointer, pointer_entry_index = transformer.get_pointer()
 
-        # If we do not point to another transformer, transform directly the data
-        if pointer is None:
-            transformed_data = list_transformers[entry.get_entry_type_index()].transform(data, index, augment, info)
+        # If we point to another transformer, get the pointed transformer
+        if pointer is not None:
+            transformer = self.__get_list_transformers(pointer)[pointer_entry_index]
 
-        #
-        # If we point to another transformer, load the transformer then transform the data
-        #
-        else:
+        return transformer
 
-            # INPUT
-            if DEEP_ENTRY_INPUT.corresponds(pointer):
-                list_transformers = self.list_input_transformers
+    def __get_list_transformers(self, entry_type: Flag) -> list:
+        """
+        DESCRIPTION:
+        ------------
 
-            # LABEL
-            elif DEEP_ENTRY_LABEL.corresponds(pointer):
-                list_transformers = self.list_label_transformers
+        Get the list of transformers corresponding to a type of entry
 
-            # ADDITIONAL DATA
-            elif DEEP_ENTRY_ADDITIONAL_DATA.corresponds(pointer):
-                list_transformers = self.list_additional_data_transformers
+        PARAMETERS:
+        -----------
 
-            # OUTPUT
-            elif DEEP_ENTRY_OUTPUT.corresponds(pointer):
-                list_transformers = self.list_output_transformers
+        :param entry_type: (Flag): The type of entry
 
-            # WRONG FLAG
-            else:
-                Notification(DEEP_NOTIF_FATAL, "The following type of pointer does not exist : " + str(pointer))
+        RETURN:
+        -------
 
-            # Transform the data with the freshly loaded transformer
-            transformed_data = list_transformers[pointer_entry_index].transform(data, index, augment=augment, info=info)
+        :return (list): The list of transformers of this type of entry
+        """
+        # INPUT
+        if DEEP_ENTRY_INPUT.corresponds(info=entry_type):
+            return self.list_input_transformers
+
+        # LABEL
+        elif DEEP_ENTRY_LABEL.corresponds(info=entry_type):
+            return self.list_label_transformers
+
+        # ADDITIONAL DATA
+        elif DEEP_ENTRY_ADDITIONAL_DATA.corresponds(info=entry_type):
+            return self.list_additional_data_transformers
 
-        return transformed_data
+        # OUTPUT
+        elif DEEP_ENTRY_OUTPUT.corresponds(info=entry_type):
+            return self.list_output_transformers
+
+        # WRONG FLAG
+        else:
+            Notification(DEEP_NOTIF_FATAL, "The following type of entry does not exist : " + str(entry_type))
 
     def reset(self):
         """
@@ -1,9 +1,11 @@
-import random
 from typing import Union
 from typing import List
 from typing import Any
+from typing import Optional
+import numpy as np
 
 from deeplodocus.data.transform.transformer.transformer import Transformer
+from deeplodocus.data.transform.transform_data import TransformData
 from deeplodocus.utils.namespace import Namespace
 
 
@@ -46,7 +48,7 @@ class OneOf(Transformer):
                          transforms=transforms,
                          mandatory_transforms_end=mandatory_transforms_end)
 
-    def transform(self, transformed_data: Any, index: int, augment: bool):
+    def transform(self, transformed_data: Any, index: int, augment: bool, info=None, rng: Optional[np.random.RandomState] = None, cached: bool = False, replay: Optional[dict] = None):
         """
         AUTHORS:
         --------
@@ -64,31 +66,46 @@ class OneOf(Transformer):
         :param data: The data to transform
         :param index: The index of the data
         :param augment(bool): Whether to apply non mondatory transforms to the instance
-
+        :param info: The information about the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
+        :param replay(Optional[dict]): The transforms to replay on the entries pointing to the same transformer (see Transformer.apply_transforms)
 
         RETURN:
         -------
 
         :return transformed_data: The transformed data
         """
-        transforms = []
-        if self.last_index == index:
-            transforms += self.last_transforms
+        # Apply the transforms selected for the item
+        return self.apply_transforms(transformed_data, self.get_transforms(augment, rng=rng, cached=cached), info=info, rng=rng, replay=replay)
 
-        else: # Get ALL the mandatory transforms + one transform randomly selected
-            transforms += self.list_mandatory_transforms_start                                    # Get the mandatory transforms at the start
+    def get_transforms(self, augment: bool, rng: Optional[np.random.RandomState] = None, cached: bool = False) -> List[TransformData]:
+        """
+        DESCRIPTION:
+        ------------
 
-            if augment is True:
-                random_transform_index = random.randint(0, len(self.list_transforms))        # Get a random transform among the ones available in the list
-                transforms += self.list_transforms[random_transform_index]                      # Get the one function
-            transforms += self.list_mandatory_transforms_end                                    # Get the mandatory transforms at the end
+        Select the transforms of an item with the One Of transformer
 
+        PARAMETERS:
+        -----------
 
-        # Reinitialize the last transforms
-        self.last_transforms = []
+        :param augment(bool): Whether to apply non mandatory transforms to the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
 
-        # Apply the transforms
-        transformed_data = self.apply_transforms(transformed_data, transforms)
+        RETURN:
+        -------
+
+        :return (List[TransformData]): The transforms to apply to the item
+        """
+        rng = np.random if rng is None else rng
+
+        # Get ALL the mandatory transforms + one transform randomly selected
+        transforms = []
+        transforms += self.get_mandatory_transforms_start(cached)                           # Get the mandatory transforms at the start
 
-        self.last_index = index
-        return transformed_data
+        if augment is True and len(self.list_transforms) > 0:
+            random_transform_index = rng.randint(len(self.list_transforms))                 # Get a random transform among the ones available in the list
+            transforms.append(self.list_transforms[random_transform_index])                 # Get the one function
+        transforms += self.list_mandatory_transforms_end                                    # Get the mandatory transforms at the end
+        return transforms
@@ -2,9 +2,12 @@
 from typing import Any
 from typing import Union
 from typing import List
+from typing import Optional
+import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.data.transform.transformer.transformer import Transformer
+from deeplodocus.data.transform.transform_data import TransformData
 from deeplodocus.utils.namespace import Namespace
 
 
@@ -56,7 +59,7 @@ class Sequential(Transformer):
             mandatory_transforms_end=mandatory_transforms_end
         )
 
-    def transform(self, transformed_data: Any, index: int, augment: bool, info=None) -> Any:
+    def transform(self, transformed_data: Any, index: int, augment: bool, info=None, rng: Optional[np.random.RandomState] = None, cached: bool = False, replay: Optional[dict] = None) -> Any:
         """
         AUTHORS:
         --------
@@ -73,33 +76,45 @@ class Sequential(Transformer):
 
         :param transformed_data: The data to transform
         :param index: The index of the data
+        :param augment(bool): Whether to apply non mandatory transforms to the instance
+        :param info: The information about the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
+        :param replay(Optional[dict]): The transforms to replay on the entries pointing to the same transformer (see Transformer.apply_transforms)
 
         RETURN:
         -------
 
         :return transformed_data: The transformed data
         """
-        transforms = []
+        # Apply the transforms selected for the item
+        return self.apply_transforms(transformed_data, self.get_transforms(augment, rng=rng, cached=cached), info=info, rng=rng, replay=replay)
 
-        if self.last_index == index:
-            transforms += self.last_transforms
+    def get_transforms(self, augment: bool, rng: Optional[np.random.RandomState] = None, cached: bool = False) -> List[TransformData]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Select the transforms of an item with the Sequential transformer
+
+        PARAMETERS:
+        -----------
+
+        :param augment(bool): Whether to apply non mandatory transforms to the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
+
+        RETURN:
+        -------
 
+        :return (List[TransformData]): The transforms to apply to the item
+        """
+        # Get mandatory transforms + transform
+        if augment is True:
+            transforms = \
+                self.get_mandatory_transforms_start(cached) \
+                + self.list_transforms \
+                + self.list_mandatory_transforms_end
         else:
-            # Get mandatory transforms + transform
-            if augment is True:
-                transforms = \
-                    self.list_mandatory_transforms_start \
-                    + self.list_transforms \
-                    + self.list_mandatory_transforms_end
-            else:
-                transforms = self.list_mandatory_transforms_start + self.list_mandatory_transforms_end
-
-        # Reinitialize the last transforms
-        self.last_transforms = []
-
-        # Apply the transforms
-        transformed_data = self.apply_transforms(transformed_data, transforms, info=info)
-
-        # Update the last index
-        self.last_index = index
-        return transformed_data
+            transforms = self.get_mandatory_transforms_start(cached) + self.list_mandatory_transforms_end
+        return transforms
@@ -1,12 +1,13 @@
 # Python imports
-import random
 from typing import Any
 from typing import Optional
 from typing import Union
 from typing import List
+import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.data.transform.transformer.transformer import Transformer
+from deeplodocus.data.transform.transform_data import TransformData
 from deeplodocus.utils.namespace import Namespace
 
 
@@ -76,7 +77,7 @@ class SomeOf(Transformer):
             self.num_transformations_min = None
             self.num_transformations_max = None
 
-    def transform(self, transformed_data: Any, index: int, augment: bool) -> Any:
+    def transform(self, transformed_data: Any, index: int, augment: bool, info=None, rng: Optional[np.random.RandomState] = None, cached: bool = False, replay: Optional[dict] = None) -> Any:
         """
         AUTHORS:
         --------
@@ -94,50 +95,64 @@ class SomeOf(Transformer):
         :param transformed_data: The data to transform
         :param index(int): The index of the data
         :param augment(bool): Whether to apply non mandatory transforms to the instance
+        :param info: The information about the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
+        :param replay(Optional[dict]): The transforms to replay on the entries pointing to the same transformer (see Transformer.apply_transforms)
 
         RETURN:
         -------
 
         :return transformed_data: The transformed data
         """
-        transforms = []
+        # Apply the transforms selected for the item
+        return self.apply_transforms(transformed_data, self.get_transforms(augment, rng=rng, cached=cached), info=info, rng=rng, replay=replay)
 
-        if self.last_index == index:
-            transforms += self.last_transforms
+    def get_transforms(self, augment: bool, rng: Optional[np.random.RandomState] = None, cached: bool = False) -> List[TransformData]:
+        """
+        DESCRIPTION:
+        ------------
 
-        else:
-            # Add the mandatory transforms at start
-            transforms += self.list_mandatory_transforms_start
+        Select the transforms of an item with the Some Of transformer
 
-            # If we want to applied transforms
-            if augment is True:
-                # If an exact number of transformations is defined
-                if self.num_transformations is not None:
-                    number_transforms_applied = self.num_transformations
+        PARAMETERS:
+        -----------
 
-                # Else pick a random number between the boundaries
-                else:
-                    number_transforms_applied = random.randint(self.num_transformations_min, self.num_transformations_max)
+        :param augment(bool): Whether to apply non mandatory transforms to the instance
+        :param rng(Optional[np.random.RandomState]): The random generator of the item (the global random state if None)
+        :param cached(bool): Whether the deterministic start was already applied to the data (read from the TransformCache)
 
-                # Select random transforms from the list
-                index_transforms_applied = sorted(random.sample(range(len(self.list_transforms)), number_transforms_applied))      # Sort the list numerically
+        RETURN:
+        -------
 
-                # Add the randomly selected transforms to the transform list
-                for index in index_transforms_applied:
-                    transforms.append(self.list_transforms[index])
+        :return (List[TransformData]): The transforms to apply to the item
+        """
+        rng = np.random if rng is None else rng
+        transforms = []
 
-            # Apply mandatory transforms at the end
-            transforms += self.list_mandatory_transforms_end
+        # Add the mandatory transforms at start
+        transforms += self.get_mandatory_transforms_start(cached)
+
+        # If we want to applied transforms
+        if augment is True:
+            # If an exact number of transformations is defined
+            if self.num_transformations is not None:
+                number_transforms_applied = self.num_transformations
+
+            # Else pick a random number between the boundaries
+            else:
+                number_transforms_applied = rng.randint(self.num_transformations_min, self.num_transformations_max + 1)
 
-        # Reinitialize the last transforms
-        self.last_transforms = []
+            # Select random transforms from the list
+            index_transforms_applied = sorted(rng.choice(len(self.list_transforms), number_transforms_applied, replace=False))      # Sort the list numerically
 
-        # Apply the transforms
-        transformed_data = self.apply_transforms(transformed_data, transforms)
+            # Add the randomly selected transforms to the transform list
+            for i in index_transforms_applied:
+                transforms.append(self.list_transforms[i])
 
-        # Update the last index
-        self.last_index = index
-        return transformed_data
+        # Apply mandatory transforms at the end
+        transforms += self.list_mandatory_transforms_end
+        return transforms
 
 
 
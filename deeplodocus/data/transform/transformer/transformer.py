@@ -5,8 +5,10 @@ from typing import Union
 from typing import List
 from typing import Any
 import inspect
+import random
 
 # Third party libs
+import numpy as np
 
 # Deeplodocus imports
 from deeplodocus.utils.generic_utils import get_module, list_namespace2list_dict
@@ -14,6 +16,9 @@ from deeplodocus.utils.notification import Notification
 from deeplodocus.flags import *
 from deeplodocus.utils.namespace import Namespace
 from deeplodocus.data.transform.transform_data import TransformData
+from deeplodocus.data.transform.batched import get_batch_method
+from deeplodocus.data.transform.batched import stack_items
+from deeplodocus.data.transform.deterministic import is_deterministic
 
 # Deeplodocus flags
 from deeplodocus.flags import DEEP_MODULE_TRANSFORMS
@@ -33,6 +38,20 @@ class Transformer(object):
 
     A generic transformer class.
     The transformer loads the transforms in memory and allows the data to be transformed
+
+    The random choices of a transformer and of its transforms are drawn from the random generator given with each item
+    (see Dataset.get_random_state) : the same generator gives the same choices, so an instance can be replayed exactly
+    and the entries pointing to the same transformer (e.g. left and right images of stereo vision) are transformed the same way.
+    The transformer has no state between two items, so the items can be transformed in any order.
+    The transforms which are neither deterministic (see deeplodocus.data.transform.deterministic) nor take a rng argument
+    are given a global random state seeded from the generator of the item, and the transforms they return (TransformData)
+    are replayed on the entries pointing to the same transformer (see apply_transforms).
+
+    The deterministic start of the transformer (see get_deterministic_start) can be read from a TransformCache
+    instead of being computed again at each epoch, the transformer then applies only the following transforms (cached=True).
+
+    A whole batch can be transformed at once (see transform_batch) : the transforms with a batched implementation
+    (see deeplodocus.data.transform.batched) are applied to all the items at once, the other transforms to each item.
     """
 
     def __init__(self,
@@ -62,16 +81,22 @@ class Transformer(object):
         :return: None
         """
         self.name = name
-        self.last_index = None
         self.transformer_entry = None
         self.transformer_index = None
-        self.last_transforms = []
 
         # List of transforms
         self.list_transforms = self.__fill_transform_list(transforms)
         self.list_mandatory_transforms_start = self.__fill_transform_list(mandatory_transforms_start)
         self.list_mandatory_transforms_end = self.__fill_transform_list(mandatory_transforms_end)
 
+        # Number of mandatory transforms at start which always give the same output for the same data
+        self.num_deterministic_start = 0
+        for transform in self.list_mandatory_transforms_start:
+            args = inspect.getfullargspec(transform.method)[0]
+            if not is_deterministic(transform.method) or "rng" in args or "info" in args:
+                break
+            self.num_deterministic_start += 1
+
     def summary(self):
         """
         AUTHORS:
@@ -139,7 +164,32 @@ class Transformer(object):
         """
         return self.transformer_entry, self.transformer_index
 
-    def reset(self):
+    def get_deterministic_start(self) -> List[TransformData]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the deterministic start of the transformer, whose output can be cached (see TransformCache)
+        The deterministic start is made of the mandatory transforms at start up to the first transform which is not
+        declared deterministic (see deeplodocus.data.transform.deterministic) or takes the information about the instance (info)
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (List[TransformData]): The transforms of the deterministic start
+        """
+        return self.list_mandatory_transforms_start[:self.num_deterministic_start]
+
+    def get_mandatory_transforms_start(self, cached: bool = False) -> List[TransformData]:
+        # The mandatory transforms at start still to apply (the deterministic start is skipped if it was read from the cache)
+        return self.list_mandatory_transforms_start[self.num_deterministic_start:] if cached else self.list_mandatory_transforms_start
+
+    def reset(self) -> None:
         """
         AUTHORS:
         --------
@@ -149,7 +199,8 @@ class Transformer(object):
         DESCRIPTION:
         ------------
 
-        Reset the last index and last transforms used after one epoch
+        Reset the transformer after one epoch
+        A transformer has no state between two items anymore (see apply_transforms), this is kept for compatibility
 
         PARAMETERS:
         -----------
@@ -161,9 +212,7 @@ class Transformer(object):
 
         :return: None
         """
-
-        self.last_index = None
-        self.last_transforms = []
+        pass
 
     @staticmethod
     def __fill_transform_list(transforms: Union[Namespace, List[dict]]) -> list:
@@ -226,17 +275,158 @@ class Transformer(object):
 
         return loaded_transforms
 
-    def transform(self, data: Any, index: int, augment: bool)-> Any:
+    def transform(self, data: Any, index: int, augment: bool, info=None, rng: Optional[np.random.RandomState] = None, cached: bool = False, replay: Optional[dict] = None) -> Any:
         """
         Authors : Alix Leroy,
         :param data: data to transform
         :param index: The index of the instance in the Data Frame
         :param augment: bool:
+        :param info: The information about the instance given to the transforms which accept an info argument
+        :param rng: The random generator of the item (the global random state if None)
+        :param cached: Whether the deterministic start was already applied to the data (see get_deterministic_start)
+        :param replay: The transforms to replay on the entries pointing to the same transformer (see apply_transforms)
         :return: The transformed data
         """
         pass # Will be overridden
 
-    def apply_transforms(self, transformed_data, transforms: List[TransformData], info=None) -> Any:
+    def get_transforms(self, augment: bool, rng: Optional[np.random.RandomState] = None, cached: bool = False) -> Optional[List[TransformData]]:
+        """
+        Authors : Alix Leroy,
+        :param augment: Whether to apply non mandatory transforms to the instance
+        :param rng: The random generator of the item (the global random state if None)
+        :param cached: Whether the deterministic start was already applied to the data (see get_deterministic_start)
+        :return: The transforms to apply to an item, None if the transformer cannot tell them before transforming the item
+        """
+        return None  # Will be overridden
+
+    def transform_batch(self,
+                        items: List[Any],
+                        indices: List[int],
+                        augment: List[bool],
+                        info: Optional[List[Any]] = None,
+                        rng: Optional[List[np.random.RandomState]] = None,
+                        cached: Optional[List[bool]] = None,
+                        replay: Optional[List[dict]] = None) -> List[Any]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Transform the items of a batch
+        The transforms of each item are selected as in transform (see get_transforms), so each item is transformed
+        as if it was transformed alone with the same random generator.
+        Items whose transforms cannot be selected in advance are transformed one by one.
+
+        PARAMETERS:
+        -----------
+
+        :param items (List[Any]): The items to transform
+        :param indices (List[int]): The index of each instance
+        :param augment (List[bool]): Whether to apply non mandatory transforms to each instance
+        :param info (Optional[List[Any]]): The information about each instance
+        :param rng (Optional[List[np.random.RandomState]]): The random generator of each item (the global random state if None)
+        :param cached (Optional[List[bool]]): Whether the deterministic start was already applied to each item
+        :param replay (Optional[List[dict]]): The transforms to replay on the entries pointing to the same transformer, for each item
+
+        RETURN:
+        -------
+
+        :return (List[Any]): The transformed items
+        """
+        n = len(items)
+        info = [None] * n if info is None else info
+        rng = [None] * n if rng is None else rng
+        cached = [False] * n if cached is None else cached
+        replay = [None] * n if replay is None else replay
+
+        items = list(items)
+        transforms = [self.get_transforms(augment[i], rng=rng[i], cached=cached[i]) for i in range(n)]
+        batch = [i for i in range(n) if transforms[i] is not None]
+        for i in range(n):
+            if transforms[i] is None:
+                items[i] = self.transform(items[i], indices[i], augment[i], info=info[i], rng=rng[i], cached=cached[i], replay=replay[i])
+
+        transformed = self.apply_batch_transforms(
+            [items[i] for i in batch],
+            [transforms[i] for i in batch],
+            info=[info[i] for i in batch],
+            rng=[rng[i] for i in batch],
+            replay=[replay[i] for i in batch]
+        )
+        for i, item in zip(batch, transformed):
+            items[i] = item
+        return items
+
+    def apply_batch_transforms(self,
+                               items: List[Any],
+                               transforms: List[List[TransformData]],
+                               info: List[Any],
+                               rng: List[Optional[np.random.RandomState]],
+                               replay: Optional[List[Optional[dict]]] = None) -> List[Any]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Apply the list of transforms of each item, step by step
+        At each step, the items going through the same transform are stacked and transformed at once
+        if the transform has a batched implementation and the items can be stacked (same shape and data type)
+        The transforms which are neither deterministic nor take a rng argument are applied to each item (see apply_transforms)
+
+        PARAMETERS:
+        -----------
+
+        :param items (List[Any]): The items to transform
+        :param transforms (List[List[TransformData]]): The transforms to apply to each item
+        :param info (List[Any]): The information about each item
+        :param rng (List[Optional[np.random.RandomState]]): The random generator of each item
+        :param replay (Optional[List[Optional[dict]]]): The transforms to replay on the entries pointing to the same transformer, for each item
+
+        RETURN:
+        -------
+
+        :return (List[Any]): The transformed items
+        """
+        items = list(items)
+        replay = [None] * len(items) if replay is None else replay
+        for step in range(max([len(t) for t in transforms], default=0)):
+            # Group the items by transform (the same TransformData instance)
+            groups = {}
+            for i, item_transforms in enumerate(transforms):
+                if step < len(item_transforms):
+                    groups.setdefault(id(item_transforms[step]), []).append(i)
+
+            for group in groups.values():
+                transform = transforms[group[0]][step]
+                batch_method = get_batch_method(transform.method)
+                if not is_deterministic(transform.method) and "rng" not in inspect.getfullargspec(transform.method)[0]:
+                    batch_method = None
+                batch = stack_items([items[i] for i in group]) if batch_method is not None and len(group) > 1 else None
+                if batch is None:
+                    for i in group:
+                        items[i] = self.apply_transforms(items[i], [transform], info=info[i], rng=rng[i], replay=replay[i])
+                    continue
+
+                args = inspect.getfullargspec(batch_method)[0]
+                kwargs = transform.kwargs
+                if "info" in args:
+                    kwargs = {**kwargs, "info": [info[i] for i in group]}
+                if "rng" in args:
+                    kwargs = {**kwargs, "rng": [np.random if rng[i] is None else rng[i] for i in group]}
+                transform_output = batch_method(batch, **kwargs)
+                try:
+                    batch, _ = transform_output
+                except Exception:
+                    Notification(
+                        DEEP_NOTIF_FATAL,
+                        "%s : %s : unable to unpack the outputs of the batched transform" % (
+                            transform.method.__name__,
+                            transform.method.__module__
+                        )
+                    )
+                for j, i in enumerate(group):
+                    items[i] = batch[j]
+        return items
+
+    def apply_transforms(self, transformed_data, transforms: List[TransformData], info=None, rng: Optional[np.random.RandomState] = None, replay: Optional[dict] = None) -> Any:
         """
         AUTHORS:
         --------
@@ -247,12 +437,21 @@ class Transformer(object):
         ------------
 
         Apply the list of transforms to the data
+        The info and the random generator are given to the transforms which accept an info or a rng argument
+
+        The transforms which are neither deterministic nor take a rng argument (e.g. legacy random transforms) are called
+        with the global random states (random and numpy) seeded from the random generator of the item, so they can be replayed.
+        The transforms they return are stored in the replay dictionary of the instance by the first entry using the transformer,
+        and replayed instead of the transforms on the entries pointing to the same transformer (e.g. a mask transformed as its image).
 
         PARAMETERS:
         -----------
 
-        :param transformed_data:
-        :param transforms:
+        :param transformed_data: The data to transform
+        :param transforms: The transforms to apply
+        :param info: The information about the instance
+        :param rng (Optional[np.random.RandomState]): The random generator of the item
+        :param replay (Optional[dict]): The transforms to replay on the entries pointing to the same transformer, filled by the first entry
 
         RETURN:
         -------
@@ -261,10 +460,22 @@ class Transformer(object):
         """
         # Apply the transforms
         for transform in transforms:
-            kwargs = {**transform.kwargs, "info": info} if "info" in inspect.getfullargspec(transform.method)[0] \
-                else transform.kwargs
-
-            transform_output = transform.method(transformed_data, **kwargs)
+            key = id(transform)
+            legacy = not is_deterministic(transform.method) and "rng" not in inspect.getfullargspec(transform.method)[0]
+            if legacy and replay is not None and key in replay:
+                transform = replay[key]
+
+            args = inspect.getfullargspec(transform.method)[0]
+            kwargs = transform.kwargs
+            if "info" in args:
+                kwargs = {**kwargs, "info": info}
+            if "rng" in args and rng is not None:
+                kwargs = {**kwargs, "rng": rng}
+
+            if legacy and rng is not None:
+                transform_output = self.__call_seeded(transform.method, transformed_data, kwargs, rng)
+            else:
+                transform_output = transform.method(transformed_data, **kwargs)
 
             try:
                 transformed_data, last_method_used = transform_output
@@ -277,14 +488,25 @@ class Transformer(object):
                     )
                 )
 
-            # Update the last transforms used and the last index
-            if last_method_used is None:
-                self.last_transforms.append(transform)
-
-            else:
-                self.last_transforms.append(last_method_used)
+            # Store the transform applied to replay it on the entries pointing to the same transformer
+            if legacy and replay is not None and key not in replay:
+                replay[key] = transform if last_method_used is None else last_method_used
         return transformed_data
 
+    @staticmethod
+    def __call_seeded(method: callable, data: Any, kwargs: dict, rng: np.random.RandomState) -> Any:
+        # Call a transform with the global random states seeded from the random generator of the item, then restore them
+        seed = int(rng.randint(2 ** 31))
+        numpy_state = np.random.get_state()
+        python_state = random.getstate()
+        np.random.seed(seed)
+        random.seed(seed)
+        try:
+            return method(data, **kwargs)
+        finally:
+            np.random.set_state(numpy_state)
+            random.setstate(python_state)
+
     @staticmethod
     def has_transforms():
         return True
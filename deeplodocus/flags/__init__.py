@@ -1,5 +1,6 @@
 from deeplodocus.flags.admin import *
 from deeplodocus.flags.backend import *
+from deeplodocus.flags.bucket import *
 from deeplodocus.flags.cmd import *
 from deeplodocus.flags.dataset import *
 from deeplodocus.flags.load_as import *
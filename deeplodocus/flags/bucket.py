@@ -0,0 +1,15 @@
+from deeplodocus.utils.flag import Flag
+
+#
+# BUCKET
+#
+DEEP_BUCKET_ASPECT = Flag(
+    name="Aspect ratio buckets",
+    description="Group the instances by the aspect ratio (width / height) of their items",
+    names=["aspect", "aspect ratio", "aspect_ratio", "aspect-ratio", "ratio"]
+)
+DEEP_BUCKET_LENGTH = Flag(
+    name="Length buckets",
+    description="Group the instances by the length (size of the first axis) of their items",
+    names=["length", "len", "size"]
+)
@@ -36,3 +36,4 @@ DEEP_ENTRY_MODEL = Flag(
 
 
 DEEP_ENTRY_BASE_FILE_NAME = get_main_path() + "/data/auto-generated_dataset_source_folder_%i.dat"
+DEEP_FOLDER_LISTING_FILE_NAME = get_main_path() + "/data/auto-generated_folder_listing_%s.dat"
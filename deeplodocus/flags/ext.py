@@ -9,3 +9,9 @@ DEEP_EXT_NPY = ".npy"
 DEEP_EXT_NPZ = ".npz"
 DEEP_EXT_ONNX = ".onnx"
 DEEP_EXT_PYTORCH = ".pt"
+DEEP_EXT_LINE_INDEX = ".idx"
+DEEP_EXT_SHARD = ".shard"
+DEEP_EXT_VIDEO_INDEX = ".vidx"
+DEEP_EXT_TAR = ".tar"
+DEEP_EXT_ZIP = ".zip"
+DEEP_EXT_ARCHIVE_INDEX = ".aidx"
@@ -7,6 +7,7 @@ from deeplodocus.flags.entry import *
 from deeplodocus.flags.lib import *
 from deeplodocus.flags.transformer import *
 from deeplodocus.flags.shuffle import *
+from deeplodocus.flags.bucket import *
 from deeplodocus.flags.save import *
 from deeplodocus.flags.verbose import *
 from deeplodocus.flags.event import *
@@ -116,7 +117,14 @@ DEEP_LIST_TRANSFORMERS = [
 DEEP_LIST_SHUFFLE = [
     DEEP_SHUFFLE_NONE,
     DEEP_SHUFFLE_BATCHES,
-    DEEP_SHUFFLE_ALL
+    DEEP_SHUFFLE_ALL,
+    DEEP_SHUFFLE_BLOCKS
+]
+
+# BUCKETS
+DEEP_LIST_BUCKET = [
+    DEEP_BUCKET_ASPECT,
+    DEEP_BUCKET_LENGTH
 ]
 
 # SAVE FORMATS
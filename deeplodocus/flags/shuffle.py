@@ -18,3 +18,8 @@ DEEP_SHUFFLE_ALL = Flag(
     description="Shuffling all the dataset",
     names=["all", "default", "shuffle all", "shuffle_all", "shuffle-all"]
 )
+DEEP_SHUFFLE_BLOCKS = Flag(
+    name="Block shuffling",
+    description="Shuffling blocks of consecutive instances, then the instances within a window",
+    names=["blocks", "block", "shuffle blocks", "shuffle_blocks", "shuffle-blocks"]
+)
@@ -1,5 +1,6 @@
 import __main__
 import os
+import sys
 
 
 def get_main_path():
@@ -13,6 +14,9 @@ def get_main_path():
     ------------
 
     Get the path to the main running file.
+    In a spawned process (e.g. a DataLoader worker), the main file of the parent process is used
+    (the main module of the new process is not a file and the main file of the parent is imported as __mp_main__).
+    The working directory is used if there is no main file (e.g. interactive session).
 
     PARAMETERS:
     -----------
@@ -24,4 +28,7 @@ def get_main_path():
 
     :return: The path to the main file
     """
-    return os.path.dirname(os.path.abspath(__main__.__file__))
+    main = __main__ if hasattr(__main__, "__file__") else sys.modules.get("__mp_main__", __main__)
+    if not hasattr(main, "__file__"):
+        return os.getcwd()
+    return os.path.dirname(os.path.abspath(main.__file__))
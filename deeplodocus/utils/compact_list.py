@@ -0,0 +1,177 @@
+# Python imports
+from typing import Any
+from typing import List
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+
+class CompactList(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    List of items stored in a few numpy arrays instead of one Python object per item
+
+    Items are appended to a Python list, then the list is frozen into a compact representation :
+        - strings and bytes : a single byte array and the offsets of the items
+        - integers, floats and booleans : a numpy array
+        - numpy arrays of the same shape and data type : a single stacked array
+        - tuples of the same length : one CompactList per field
+        - other items : kept in the Python list
+
+    A frozen list holds no Python object per item, so forked DataLoader workers do not copy it when reading it
+    (the reference counts of the items are not touched) and it is pickled quickly for spawned workers.
+    """
+
+    def __init__(self, items: Optional[List[Any]] = None):
+        """
+        DESCRIPTION:
+        ------------
+
+        Initialize the list, the list is frozen if items are given
+
+        PARAMETERS:
+        -----------
+
+        :param items (Optional[List[Any]]): The items of the list
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        self.items = list()      # Items before the list is frozen (or items which cannot be compacted)
+        self.kind = None         # Kind of compact representation (None while the list is not frozen)
+        self.data = None         # Compact data (byte array, array of values, stacked array or list of fields)
+        self.offsets = None      # Offsets of the items in the byte array (strings and bytes only)
+        self.length = 0
+        if items is not None:
+            self.items = list(items)
+            self.freeze()
+
+    def __len__(self) -> int:
+        return self.length if self.kind is not None else len(self.items)
+
+    def __getitem__(self, index: int) -> Any:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get an item of the list (items are rebuilt as the type they were appended with)
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the item
+
+        RETURN:
+        -------
+
+        :return (Any): The item
+        """
+        if self.kind is None or self.kind == "object":
+            return self.items[index]
+        elif self.kind == "str":
+            return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode()
+        elif self.kind == "bytes":
+            return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+        elif self.kind == "scalar":
+            return self.data[index].item()
+        elif self.kind == "array":
+            return self.data[index]
+        else:
+            return tuple(field[index] for field in self.data)
+
+    def append(self, item: Any) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Append an item, a frozen list is unfrozen first
+
+        PARAMETERS:
+        -----------
+
+        :param item (Any): The item to append
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if self.kind is not None:
+            self.items = [self[i] for i in range(len(self))]
+            self.kind = None
+            self.data = None
+            self.offsets = None
+        self.items.append(item)
+
+    def freeze(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Convert the appended items into their compact representation
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        items = self.items
+        self.length = len(items)
+        self.kind = self.__get_kind(items)
+        if self.kind in ("str", "bytes"):
+            encoded = [item.encode() for item in items] if self.kind == "str" else items
+            self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(item) for item in encoded], out=self.offsets[1:])
+            self.data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        elif self.kind in ("scalar", "array"):
+            self.data = np.asarray(items) if self.kind == "scalar" else np.stack(items)
+        elif self.kind == "tuple":
+            self.data = [CompactList([item[i] for item in items]) for i in range(len(items[0]))]
+        if self.kind != "object":
+            self.items = list()
+
+    @staticmethod
+    def __get_kind(items: List[Any]) -> str:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the compact representation suiting all the items
+
+        PARAMETERS:
+        -----------
+
+        :param items (List[Any]): The items
+
+        RETURN:
+        -------
+
+        :return (str): The kind of representation (str, bytes, scalar, array, tuple or object)
+        """
+        if not items:
+            return "object"
+        first = items[0]
+        if all(type(item) is type(first) for item in items):
+            if isinstance(first, str):
+                return "str"
+            elif isinstance(first, bytes):
+                return "bytes"
+            elif isinstance(first, (bool, int, float, np.number, np.bool_)):
+                return "scalar"
+            elif isinstance(first, np.ndarray) \
+                    and first.dtype != object \
+                    and all(item.shape == first.shape and item.dtype == first.dtype for item in items):
+                return "array"
+            elif isinstance(first, tuple) and all(len(item) == len(first) for item in items):
+                return "tuple"
+        return "object"
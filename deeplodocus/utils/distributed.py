@@ -0,0 +1,193 @@
+"""
+This script contains the functions used to run Deeplodocus in several processes (distributed training)
+
+The processes are started by a launcher setting the usual environment variables of torch.distributed
+(e.g. torchrun : RANK, WORLD_SIZE, LOCAL_RANK, MASTER_ADDR and MASTER_PORT).
+Without process group, each function behaves as if there was a single process.
+"""
+
+import os
+from typing import Any
+from typing import List
+
+import torch
+import torch.distributed as dist
+
+from deeplodocus.flags.notif import *
+from deeplodocus.utils.notification import Notification
+
+
+def init_distributed(backend: str = "auto") -> bool:
+    """
+    DESCRIPTION:
+    ------------
+
+    Initialize the default process group if the process was started by a distributed launcher (WORLD_SIZE > 1)
+
+    PARAMETERS:
+    -----------
+
+    :param backend (str): The backend of torch.distributed ("auto" : nccl with CUDA, gloo otherwise)
+
+    RETURN:
+    -------
+
+    :return (bool): Whether the process is part of a process group
+    """
+    if is_distributed():
+        return True
+    if int(os.environ.get("WORLD_SIZE", 1)) <= 1 or not dist.is_available():
+        return False
+    if backend == "auto":
+        backend = "nccl" if torch.cuda.is_available() else "gloo"
+    dist.init_process_group(backend=backend)
+    Notification(DEEP_NOTIF_SUCCESS, "Distributed process group initialized : rank %i of %i (%s)" % (
+        get_rank(), get_world_size(), backend
+    ))
+    return True
+
+
+def is_distributed() -> bool:
+    return dist.is_available() and dist.is_initialized() and dist.get_world_size() > 1
+
+
+def get_rank() -> int:
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size() -> int:
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def get_local_rank() -> int:
+    return int(os.environ.get("LOCAL_RANK", get_rank())) if is_distributed() else 0
+
+
+def is_main_process() -> bool:
+    return get_rank() == 0
+
+
+def broadcast_object(obj: Any, src: int = 0) -> Any:
+    """
+    DESCRIPTION:
+    ------------
+
+    Send a picklable object from a process to all the others
+
+    PARAMETERS:
+    -----------
+
+    :param obj (Any): The object to send (only used in the source process)
+    :param src (int): The rank of the source process
+
+    RETURN:
+    -------
+
+    :return (Any): The object of the source process
+    """
+    if not is_distributed():
+        return obj
+    objects = [obj]
+    dist.broadcast_object_list(objects, src=src)
+    return objects[0]
+
+
+def gather_values(values: dict) -> dict:
+    """
+    DESCRIPTION:
+    ------------
+
+    Gather lists of values (e.g. the value of a metric at each batch) from all the processes
+    The lists of each key are concatenated in the order of the ranks
+
+    PARAMETERS:
+    -----------
+
+    :param values (dict): The list of values of each key in the current process
+
+    RETURN:
+    -------
+
+    :return (dict): The list of values of each key in all the processes
+    """
+    if not is_distributed():
+        return values
+    gathered = [None] * get_world_size()
+    dist.all_gather_object(gathered, values)
+    merged = {}
+    for rank_values in gathered:
+        for key, items in rank_values.items():
+            merged.setdefault(key, []).extend(items)
+    return merged
+
+
+def broadcast_parameters(model: torch.nn.Module, src: int = 0) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Copy the parameters and buffers of the model of a process to all the others
+
+    PARAMETERS:
+    -----------
+
+    :param model (torch.nn.Module): The model
+    :param src (int): The rank of the source process
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    if not is_distributed():
+        return
+    with torch.no_grad():
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            dist.broadcast(tensor.data, src=src)
+
+
+def average_gradients(model: torch.nn.Module, bucket_size: int = 25 * 1024 * 1024) -> None:
+    """
+    DESCRIPTION:
+    ------------
+
+    Average the gradients of the model over all the processes
+    The gradients are flattened in buckets so that each all-reduce sends many gradients at once
+
+    PARAMETERS:
+    -----------
+
+    :param model (torch.nn.Module): The model
+    :param bucket_size (int): The maximum size of a bucket (in bytes)
+
+    RETURN:
+    -------
+
+    :return: None
+    """
+    if not is_distributed():
+        return
+    world_size = get_world_size()
+    bucket = []
+    size = 0
+    for grad in [p.grad for p in model.parameters() if p.grad is not None]:
+        if bucket and (grad.dtype != bucket[0].dtype or grad.device != bucket[0].device or size >= bucket_size):
+            _all_reduce_bucket(bucket, world_size)
+            bucket = []
+            size = 0
+        bucket.append(grad)
+        size += grad.numel() * grad.element_size()
+    if bucket:
+        _all_reduce_bucket(bucket, world_size)
+
+
+def _all_reduce_bucket(bucket: List[torch.Tensor], world_size: int) -> None:
+    # Sum a bucket of gradients over the processes and divide them by the number of processes
+    flat = torch.cat([grad.reshape(-1) for grad in bucket])
+    dist.all_reduce(flat, op=dist.ReduceOp.SUM)
+    flat /= world_size
+    offset = 0
+    for grad in bucket:
+        grad.copy_(flat[offset:offset + grad.numel()].view_as(grad))
+        offset += grad.numel()
+
@@ -1,3 +1,315 @@
+# Python imports
+import os
+import mmap
+from typing import List
+from typing import Optional
+
+# Third party libs
+import numpy as np
+
+# Deeplodocus imports
+from deeplodocus.utils.notification import Notification
+
+# Deeplodocus flags
+from deeplodocus.flags.ext import DEEP_EXT_LINE_INDEX, DEEP_EXT_NPY
+from deeplodocus.flags.notif import DEEP_NOTIF_DEBUG
+
+# Size of the chunks read when building a line index
+LINE_INDEX_CHUNK_SIZE = 1 << 24
+
+# Header of a line index sidecar file : magic number, version, file size, file modification time (ns)
+LINE_INDEX_MAGIC = 0x58444e49454e494c
+LINE_INDEX_VERSION = 1
+LINE_INDEX_HEADER_SIZE = 4
+
+
+class LineIndex(object):
+    """
+    DESCRIPTION:
+    ------------
+
+    Byte-offset index of the lines of a text file
+    The offsets of the line starts are computed once and stored in a sidecar file next to the indexed file.
+    The sidecar file is rebuilt whenever the size or the modification time of the indexed file changes.
+    Lines are then read in O(1) by slicing a memory map of the indexed file.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.sidecar = filename + DEEP_EXT_LINE_INDEX
+
+        # Offsets of the line starts followed by the size of the file
+        self.offsets = None
+
+        # Size and modification time of the indexed file when the index was loaded
+        self.signature = None
+
+        # Memory map of the indexed file (opened lazily in each process)
+        self.mmap = None
+        self.pid = None
+
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.get_line(index)
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, they are reopened in the new process
+        state = self.__dict__.copy()
+        state["offsets"] = np.array(self.offsets)
+        state["mmap"] = None
+        state["pid"] = None
+        return state
+
+    def get_line(self, index: int) -> str:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the content of a specific line of the indexed file
+
+        PARAMETERS:
+        -----------
+
+        :param index (int): The index of the line (0-indexed)
+
+        RETURN:
+        -------
+
+        :return (str): The specific line desired
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        start = int(self.offsets[index])
+        end = int(self.offsets[index + 1])
+        return self.mmap[start:end].decode().rstrip()   # Get the line and remove the \n at the end
+
+    def get_lines(self, indices: List[int]) -> List[str]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Get the content of several lines of the indexed file
+        The lines are read in the order of the file (one forward pass) and returned in the requested order
+
+        PARAMETERS:
+        -----------
+
+        :param indices (List[int]): The indices of the lines (0-indexed)
+
+        RETURN:
+        -------
+
+        :return (List[str]): The desired lines
+        """
+        if self.pid != os.getpid():
+            self.__open()
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        ends = self.offsets[indices + 1]
+        lines = [None] * len(indices)
+        for i in np.argsort(starts, kind="stable"):
+            lines[i] = self.mmap[int(starts[i]):int(ends[i])].decode().rstrip()
+        return lines
+
+    def load(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Load the index from the sidecar file if it is up to date with the indexed file, build it otherwise
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        stat = os.stat(self.filename)
+        offsets = self.__read_sidecar(stat)
+        if offsets is None:
+            offsets = self.__build(stat.st_size)
+            self.__write_sidecar(stat, offsets)
+        self.offsets = offsets
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        self.mmap = None
+        self.pid = None
+
+    def is_up_to_date(self) -> bool:
+        """
+        DESCRIPTION:
+        ------------
+
+        Check whether the indexed file has been modified since the index was loaded
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return (bool): Whether the index is up to date
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self.signature
+
+    def __open(self) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Open the memory map of the indexed file in the current process
+
+        PARAMETERS:
+        -----------
+
+        None
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        if int(self.offsets[-1]) == 0:
+            self.mmap = b""
+        else:
+            with open(self.filename, "rb") as f:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.pid = os.getpid()
+
+    def __build(self, size: int) -> np.array:
+        """
+        DESCRIPTION:
+        ------------
+
+        Scan the file once and compute the offsets of the line starts
+
+        PARAMETERS:
+        -----------
+
+        :param size (int): The size of the file in bytes
+
+        RETURN:
+        -------
+
+        :return offsets (np.array): The offsets of the line starts followed by the size of the file
+        """
+        starts = [np.zeros(1 if size > 0 else 0, dtype=np.uint64)]
+        position = 0
+        with open(self.filename, "rb") as f:
+            while True:
+                chunk = f.read(LINE_INDEX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                starts.append((newlines + position + 1).astype(np.uint64))
+                position += len(chunk)
+        offsets = np.concatenate(starts)
+
+        # A trailing new line does not start a new line
+        if len(offsets) > 0 and offsets[-1] == size:
+            offsets = offsets[:-1]
+        return np.append(offsets, np.uint64(size))
+
+    def __read_sidecar(self, stat: os.stat_result) -> Optional[np.array]:
+        """
+        DESCRIPTION:
+        ------------
+
+        Memory map the offsets stored in the sidecar file if it matches the indexed file
+
+        PARAMETERS:
+        -----------
+
+        :param stat (os.stat_result): The status of the indexed file
+
+        RETURN:
+        -------
+
+        :return offsets (Optional[np.array]): The offsets, None if the sidecar file is missing or outdated
+        """
+        try:
+            header = np.fromfile(self.sidecar, dtype=np.uint64, count=LINE_INDEX_HEADER_SIZE)
+        except (OSError, ValueError):
+            return None
+        expected = [LINE_INDEX_MAGIC, LINE_INDEX_VERSION, stat.st_size, stat.st_mtime_ns]
+        if len(header) != LINE_INDEX_HEADER_SIZE or [int(h) for h in header] != expected:
+            return None
+        # Plain ndarray view of the memory map (indexing a np.memmap is much slower)
+        return np.memmap(self.sidecar, dtype=np.uint64, mode="r", offset=LINE_INDEX_HEADER_SIZE * 8).view(np.ndarray)
+
+    def __write_sidecar(self, stat: os.stat_result, offsets: np.array) -> None:
+        """
+        DESCRIPTION:
+        ------------
+
+        Store the offsets in the sidecar file
+        The index is only kept in memory if the sidecar file cannot be written
+
+        PARAMETERS:
+        -----------
+
+        :param stat (os.stat_result): The status of the indexed file
+        :param offsets (np.array): The offsets to store
+
+        RETURN:
+        -------
+
+        :return: None
+        """
+        header = np.array([LINE_INDEX_MAGIC, LINE_INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.uint64)
+        temp = "%s.%i.tmp" % (self.sidecar, os.getpid())
+        try:
+            with open(temp, "wb") as f:
+                header.tofile(f)
+                offsets.tofile(f)
+            os.replace(temp, self.sidecar)
+        except OSError as e:
+            Notification(DEEP_NOTIF_DEBUG, "Could not write the line index of %s : %s" % (self.filename, str(e)))
+
+
+# Line indices of the files read with get_specific_line and compute_num_lines
+line_indices = {}
+
+
+def get_line_index(filename: str) -> LineIndex:
+    """
+    DESCRIPTION:
+    ------------
+
+    Get the line index of a file, the index is (re)built if the file changed since the last call
+
+    PARAMETERS:
+    -----------
+
+    :param filename (str): The name of the file
+
+    RETURN:
+    -------
+
+    :return (LineIndex): The line index of the file
+    """
+    line_index = line_indices.get(filename)
+    if line_index is None:
+        line_index = LineIndex(filename)
+        line_indices[filename] = line_index
+    elif not line_index.is_up_to_date():
+        line_index.load()
+    return line_index
+
+
 def get_specific_line(filename: str, index: int) -> str:
     """
     AUTHORS:
@@ -21,12 +333,7 @@ def get_specific_line(filename: str, index: int) -> str:
 
     :return (str): The specific line desired
     """
-    with open(filename) as f:
-        for i, line in enumerate(f):
-            if i == index:
-                return line.rstrip()            # Get the line and remove the \n at the end
-            elif i > index:
-                break
+    return get_line_index(filename).get_line(index)
 
 
 def compute_num_lines(filename: str) -> int:
@@ -51,7 +358,43 @@ def compute_num_lines(filename: str) -> int:
 
     :return num_lines (int): Number of lines in a file
     """
-    with open(filename) as f:
-        for i, _ in enumerate(f):
-            pass
-    return i + 1
+    return len(get_line_index(filename))
+
+
+def convert_npz_to_npy(filename: str, directory: Optional[str] = None) -> List[str]:
+    """
+    DESCRIPTION:
+    ------------
+
+    Convert a .npz file into uncompressed .npy files which can be memory-mapped
+    A file with a single array is converted into <name>.npy, else each array is converted into <name>_<key>.npy
+    The arrays already converted (.npy file more recent than the .npz file) are not converted again
+
+    PARAMETERS:
+    -----------
+
+    :param filename (str): The path to the .npz file
+    :param directory (Optional[str]): The directory to write the .npy files into (default: the directory of the .npz file)
+
+    RETURN:
+    -------
+
+    :return (List[str]): The paths to the .npy files
+    """
+    if directory is None:
+        directory = os.path.dirname(filename)
+    os.makedirs(directory or ".", exist_ok=True)
+    name = os.path.splitext(os.path.basename(filename))[0]
+    mtime = os.stat(filename).st_mtime_ns
+
+    paths = []
+    with np.load(filename) as npz_file:
+        for key in npz_file.files:
+            if len(npz_file.files) == 1:
+                path = os.path.join(directory, name + DEEP_EXT_NPY)
+            else:
+                path = os.path.join(directory, "%s_%s%s" % (name, key, DEEP_EXT_NPY))
+            if not os.path.isfile(path) or os.stat(path).st_mtime_ns < mtime:
+                np.save(path, npz_file[key])
+            paths.append(path)
+    return paths
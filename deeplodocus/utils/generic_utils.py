@@ -172,16 +172,29 @@ def convert_namespace(namespace):
         return namespace
 
 
+# Pattern splitting the digits from the rest of a string for natural sorting
+NATURAL_SORT_PATTERN = re.compile('([0-9]+)')
+
+
+def natural_sort_key(text: str) -> list:
+    """ Key for sorting strings in the way that is expected (e.g. "2" before "10").
+
+    Required arguments:
+    text -- The string to compute the key of.
+
+    """
+    return [int(c) if c.isdigit() else c for c in NATURAL_SORT_PATTERN.split(text)]
+
+
 def sorted_nicely(l):
     """ Sorts the given iterable in the way that is expected.
+    The key of each item is computed once.
 
     Required arguments:
     l -- The iterable to be sorted.
 
     """
-    to_convert = lambda text: int(text) if text.isdigit() else text
-    alpha_num_key = lambda key: [to_convert(c) for c in re.split('([0-9]+)', key)]
-    return sorted(l, key=alpha_num_key)
+    return sorted(l, key=natural_sort_key)
 
 
 def is_string_an_integer(string: str) -> bool:
@@ -127,7 +127,7 @@ class Notification(object):
 
         Display the given message with a RED background, preceded by 'DEEP FATAL : '.
         Write to log file if required.
-        Raise a DeepError.
+        Raise a DeepError with the given message.
 
         PARAMETERS:
         -----------
@@ -141,6 +141,7 @@ class Notification(object):
 
         """
         # Print deep fatal errror
+        error = message
         message = "DEEP FATAL ERROR : %s" % message
         print("%s%s%s" % (CREDBG, message, CEND))
         if self.log is True:
@@ -158,7 +159,7 @@ class Notification(object):
                 print("%s%s%s" % (CBLUE, message, CEND))
                 if self.log is True:
                     self.__add_log(message)
-        raise DeepError
+        raise DeepError(error)
 
     def __error(self, message: str) -> None:
         """
@@ -0,0 +1,96 @@
+"""
+Synthetic data for the tests of the data pipeline
+The data is written into a temporary directory which is also the working directory of the test
+The datasets keep no manifest, so that nothing is written into the main path (the directory of the test)
+"""
+import os
+import atexit
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+from deeplodocus.data.load.dataset import Dataset
+from deeplodocus.utils.namespace import Namespace
+
+
+def setup_directory():
+    """
+    Create a temporary working directory, removed when the test ends
+    """
+    directory = tempfile.mkdtemp(prefix="deeplodocus-test-")
+    os.chdir(directory)
+    atexit.register(shutil.rmtree, directory, True)
+    return directory
+
+
+def write_images(num_images, shapes=None, seed=0, name="images"):
+    """
+    Write random images (all 16 x 24 x 3 if no shapes are given) and a random label for each image
+    Return the path of the list of the images and the path of the list of the labels
+    """
+    random_state = np.random.RandomState(seed)
+    os.makedirs(name, exist_ok=True)
+    paths = []
+    for i in range(num_images):
+        shape = (16, 24, 3) if shapes is None else shapes[i]
+        path = os.path.abspath("%s/%03d.png" % (name, i))
+        cv2.imwrite(path, random_state.randint(0, 256, shape).astype(np.uint8))
+        paths.append(path)
+    with open("%s.txt" % name, "w") as f:
+        f.write("\n".join(paths) + "\n")
+    with open("%s_labels.txt" % name, "w") as f:
+        f.write("\n".join([str(label) for label in random_state.randint(0, 10, num_images)]) + "\n")
+    return os.path.abspath("%s.txt" % name), os.path.abspath("%s_labels.txt" % name)
+
+
+def source(name, **kwargs):
+    """
+    Configuration of a default Source
+    """
+    return {"name": name, "module": None, "kwargs": kwargs}
+
+
+def make_dataset(image_sources, label_sources, input_options=None, label_options=None, **kwargs):
+    """
+    Dataset of an image input entry and an integer label entry (without manifest)
+    """
+    image_entry = {"name": "image", "type": "input", "load_as": "image", "convert_to": "float32",
+                   "move_axis": [2, 0, 1], "enable_cache": False, "sources": image_sources}
+    label_entry = {"name": "label", "type": "label", "load_as": "integer", "convert_to": None,
+                   "move_axis": None, "enable_cache": False, "sources": label_sources}
+    image_entry.update(input_options or {})
+    label_entry.update(label_options or {})
+    return Dataset(
+        name=kwargs.pop("name", "test"),
+        type=kwargs.pop("type", "train"),
+        entries=[Namespace(image_entry), Namespace(label_entry)],
+        num_instances=kwargs.pop("num_instances", None),
+        transform_manager=kwargs.pop("transform_manager", None),
+        manifest=kwargs.pop("manifest", False),
+        **kwargs
+    )
+
+
+def assert_equal(a, b, atol=0):
+    """
+    Check that two (nested lists of) arrays or tensors are equal (up to atol), with the same data type
+    """
+    if isinstance(a, (list, tuple)):
+        assert len(a) == len(b), (len(a), len(b))
+        for x, y in zip(a, b):
+            assert_equal(x, y, atol)
+    else:
+        a, b = np.asarray(a), np.asarray(b)
+        assert a.dtype == b.dtype and a.shape == b.shape, (a.dtype, b.dtype, a.shape, b.shape)
+        assert np.array_equal(a, b) if atol == 0 else np.allclose(a, b, atol=atol)
+
+
+def stack(items):
+    """
+    Stack the (nested lists of) arrays of several instances, as in a batch of the Dataset (see Dataset.get_batch)
+    """
+    if isinstance(items[0], (list, tuple)):
+        return [stack([item[i] for item in items]) for i in range(len(items[0]))]
+    return np.stack([np.asarray(item) for item in items])
@@ -0,0 +1,72 @@
+"""
+Test the reading of the members of tar and zip archives (Archive source) against the original files
+"""
+import io
+import os
+import tarfile
+import zipfile
+
+from torch.utils.data import DataLoader
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+
+
+def setup_module():
+    setup_directory()
+
+
+def write_archives(images, labels):
+    # The members of an instance share their name ("s/00001.png" and "s/00001.cls"), the members are not in order
+    with open(images) as f:
+        paths = f.read().splitlines()
+    with open(labels) as f:
+        classes = f.read().splitlines()
+    os.makedirs("archives", exist_ok=True)
+    with tarfile.open("archives/a.tar", "w") as tar, zipfile.ZipFile("archives/b.zip", "w") as zip_file:
+        for i in reversed(range(len(paths))):
+            tar.add(paths[i], arcname="s/%i.png" % i)
+            info = tarfile.TarInfo("s/%i.cls" % i)
+            info.size = len(classes[i].encode())
+            tar.addfile(info, io.BytesIO(classes[i].encode()))
+
+            # Stored and deflated members
+            compression = zipfile.ZIP_DEFLATED if i % 2 else zipfile.ZIP_STORED
+            zip_file.write(paths[i], arcname="s/%i.png" % i, compress_type=compression)
+            zip_file.writestr("s/%i.cls" % i, classes[i], compress_type=compression)
+
+
+def test_archive():
+    # More than 10 instances, so that the natural order of the names differs from the lexical order
+    images, labels = write_images(12)
+    write_archives(images, labels)
+    reference = make_dataset([source("File", path=images)], [source("File", path=labels)])
+
+    # A single archive of each type, and a directory of archives
+    for path, num_instances in (("archives/a.tar", 12), ("archives/b.zip", 12), ("archives", 24)):
+        dataset = make_dataset([source("Archive", path=os.path.abspath(path), pattern="*.png")],
+                               [source("Archive", path=os.path.abspath(path), pattern="*.cls")])
+        assert len(dataset) == num_instances
+        for i in range(num_instances):
+            assert_equal(dataset[i][:2], reference[i % 12][:2])
+
+        # Batches of members in any order
+        archive = dataset.entries[0].sources[0]
+        indices = list(range(num_instances))[::-1]
+        assert [bytes(item[0]) for item in archive.get_batch(indices)] == [bytes(archive[i][0]) for i in indices]
+
+        # The index of the archives is cached next to them
+        assert os.path.isfile(path + ".aidx") or os.path.isdir(path)
+
+    # The archives are memory-mapped again in each worker
+    batches = list(DataLoader(dataset, batch_size=5, num_workers=2))
+    assert sum([len(batch[1][0]) for batch in batches]) == 24
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_archive()
+    print("Archive : OK")
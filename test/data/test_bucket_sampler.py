@@ -0,0 +1,71 @@
+"""
+Test the batches of the BucketBatchSampler : batch counts, buckets and padding of the batches
+"""
+import numpy as np
+from torch.utils.data import DataLoader
+
+from deeplodocus.data.load.bucket_sampler import BucketBatchSampler
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+
+
+def setup_module():
+    setup_directory()
+
+
+def make_bucket_dataset():
+    # Images of 5 aspect ratios
+    random_state = np.random.RandomState(0)
+    shapes = [(10, int(width), 3) for width in random_state.choice([5, 8, 10, 15, 20], 37)]
+    images, labels = write_images(37, shapes=shapes, name="buckets")
+    return make_dataset([source("File", path=images)], [source("File", path=labels)],
+                        input_options={"move_axis": None, "pad_value": -1})
+
+
+def test_batch_counts():
+    dataset = make_bucket_dataset()
+    for drop_last in (False, True):
+        sampler = BucketBatchSampler(dataset, batch_size=4, num_buckets=3, seed=1, drop_last=drop_last)
+        counts = np.bincount(sampler.buckets, minlength=sampler.num_buckets)
+        expected = np.sum(counts // 4) if drop_last else np.sum(-(-counts // 4))
+        for epoch in range(2):
+            batches = list(sampler)
+            assert len(batches) == len(sampler) == expected, (len(batches), len(sampler), expected)
+
+            # Each batch is taken from a single bucket
+            assert all([len(set(sampler.buckets[batch])) == 1 for batch in batches])
+            instances = sorted(sum(batches, []))
+            if drop_last:
+                assert all([len(batch) == 4 for batch in batches])
+                assert len(instances) == len(set(instances))
+            else:
+                assert instances == list(range(len(dataset)))
+
+    # The same seed gives the same batches
+    first = list(BucketBatchSampler(dataset, batch_size=4, num_buckets=3, seed=5))
+    second = list(BucketBatchSampler(dataset, batch_size=4, num_buckets=3, seed=5))
+    assert first == second
+
+
+def test_padding():
+    dataset = make_bucket_dataset()
+    shapes = dataset.get_item_shapes(0)
+    sampler = BucketBatchSampler(dataset, batch_size=4, num_buckets=3, seed=1, shuffle=False)
+    dataset.set_padding(True)
+    loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=dataset.create_collate(), num_workers=0)
+    for batch, indices in zip(loader, list(sampler)):
+        images = batch[0][0][0]
+        width = max([shapes[i][1] for i in indices])
+        assert tuple(images.shape) == (len(indices), 10, width, 3), (images.shape, width)
+        for k, i in enumerate(indices):
+            assert (images[k, :, shapes[i][1]:] == -1).all()
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_batch_counts()
+    test_padding()
+    print("BucketBatchSampler : OK")
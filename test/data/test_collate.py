@@ -0,0 +1,69 @@
+"""
+Test the Collate of the Dataset against the default collate of PyTorch,
+and the formatting of whole batches (Formatter.format_batch) against the formatting of each item (Formatter.format)
+"""
+import numpy as np
+from torch.utils.data import DataLoader
+from torch.utils.data import BatchSampler
+from torch.utils.data import SequentialSampler
+from torch.utils.data.dataloader import default_collate
+
+from deeplodocus.data.load.collate import get_batch_layout
+from deeplodocus.data.load.collate import write_batch
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+
+
+def setup_module():
+    setup_directory()
+
+
+def test_collate():
+    images, labels = write_images(19)
+
+    # The instances of the reference are formatted one by one by the Dataset
+    reference = make_dataset([source("File", path=images)], [source("File", path=labels)])
+    expected = [default_collate([reference[i] for i in range(j, min(j + 8, 19))]) for j in range(0, 19, 8)]
+
+    for num_workers in (0, 2):
+        dataset = make_dataset([source("File", path=images)], [source("File", path=labels)])
+        loader = DataLoader(dataset, batch_size=8, collate_fn=dataset.create_collate(), num_workers=num_workers)
+        batches = list(loader)
+        assert_equal(batches, expected)
+        assert batches[0][0][0][0].is_contiguous()
+
+    # Batches fetched at once by the Dataset (Dataset.get_batch)
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)])
+    loader = DataLoader(dataset, batch_size=None, sampler=BatchSampler(SequentialSampler(dataset), 8, False))
+    assert_equal(list(loader), expected)
+
+
+def test_formatter():
+    images, labels = write_images(6)
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)],
+                           input_options={"convert_to": "float16", "move_axis": [2, 0, 1]})
+    pipeline_entry = dataset.pipeline_entries[0]
+    items = [np.random.RandomState(i).randint(0, 256, (5, 7, 3)).astype(np.uint8) for i in range(6)]
+    batch = pipeline_entry.format_batch(items)
+    assert_equal(batch, np.stack([pipeline_entry.format(item.copy()) for item in items]))
+    assert batch.dtype == np.float16 and batch.shape == (6, 3, 5, 7)
+
+    # Items of different shapes are padded to the largest item
+    items = [np.ones((2, 3), np.uint8), np.ones((4, 1), np.uint8)]
+    shape, dtype = get_batch_layout(items, None, [-1, 0], -1)
+    batch = np.full(shape, -1, dtype)
+    write_batch(batch, items, [-1, 0])
+    assert shape == (2, 3, 4) and dtype == np.int16
+    assert_equal(batch[0], np.pad(np.ones((3, 2), np.int16), ((0, 0), (0, 2)), constant_values=-1))
+    assert_equal(batch[1], np.pad(np.ones((1, 4), np.int16), ((0, 2), (0, 0)), constant_values=-1))
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_collate()
+    test_formatter()
+    print("Collate : OK")
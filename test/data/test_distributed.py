@@ -0,0 +1,116 @@
+"""
+Test the distributed training on CPU with several local processes (gloo backend) :
+sharding of the Dataset, gathering of values, averaging of the gradients and equalized batches of the BucketBatchSampler
+"""
+import os
+import socket
+
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from deeplodocus.data.load.bucket_sampler import BucketBatchSampler
+from deeplodocus.utils import distributed
+from deeplodocus.flags import DEEP_SHUFFLE_ALL
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+
+
+WORLD_SIZE = 3
+
+
+def setup_module():
+    setup_directory()
+
+
+def get_free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(rank, port, directory, images, labels, queue):
+    os.chdir(directory)
+    os.environ.update(RANK=str(rank), LOCAL_RANK=str(rank), WORLD_SIZE=str(WORLD_SIZE),
+                      MASTER_ADDR="127.0.0.1", MASTER_PORT=str(port))
+    assert distributed.init_distributed("gloo")
+    results = {"rank": distributed.get_rank()}
+
+    # Sharding of the instances with a seed shared by all the processes
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)],
+                           input_options={"move_axis": None})
+    seed = distributed.broadcast_object(1234 if rank == 0 else None)
+    dataset.set_shard(rank=rank, world_size=WORLD_SIZE, seed=seed)
+    for epoch in (1, 2):
+        dataset.shuffle(DEEP_SHUFFLE_ALL, verbose=False, epoch=epoch)
+        results[epoch] = dataset.get_instance_indices().tolist()
+    results["length"] = len(dataset)
+
+    # Gathering of values
+    results["gathered"] = distributed.gather_values({"rank": [rank, rank]})
+
+    # Parameters broadcast from the first process, gradients averaged between the processes
+    torch.manual_seed(rank)
+    model = torch.nn.Linear(3, 2)
+    distributed.broadcast_parameters(model)
+    model(torch.ones(4, 3) * (rank + 1)).sum().backward()
+    results["local_gradient"] = model.weight.grad.clone().numpy()
+    distributed.average_gradients(model)
+    results["gradient"] = model.weight.grad.numpy()
+    results["weight"] = model.weight.detach().numpy()
+
+    # Batches of the buckets equalized between the processes
+    sampler = BucketBatchSampler(dataset, batch_size=2, num_buckets=3, seed=seed)
+    results["batches"] = (len(sampler), len(list(sampler)))
+
+    dist.destroy_process_group()
+    queue.put(results)
+
+
+def test_distributed():
+    directory = os.getcwd()
+    shapes = [(10, 5 + 3 * (i % 4), 3) for i in range(23)]
+    images, labels = write_images(23, shapes=shapes, name="distributed")
+
+    context = mp.get_context("spawn")
+    queue = context.Queue()
+    port = get_free_port()
+    processes = [context.Process(target=run, args=(rank, port, directory, images, labels, queue)) for rank in range(WORLD_SIZE)]
+    for process in processes:
+        process.start()
+    results = [queue.get(timeout=300) for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    results = sorted(results, key=lambda r: r["rank"])
+
+    # Each process gets the same number of instances, all the instances are used at each epoch
+    for epoch in (1, 2):
+        shards = [r[epoch] for r in results]
+        assert len(set([len(shard) for shard in shards])) == 1
+        assert set(sum(shards, [])) == set(range(23))
+    assert results[0][1] != results[0][2]
+    assert len(set([r["length"] for r in results])) == 1
+
+    # The values of all the processes are gathered in the order of the ranks
+    assert all([r["gathered"] == {"rank": [0, 0, 1, 1, 2, 2]} for r in results])
+
+    # The gradients are the mean of the gradients of the processes, the parameters are the same
+    mean_gradient = np.mean([r["local_gradient"] for r in results], axis=0)
+    for r in results:
+        assert np.allclose(r["gradient"], mean_gradient)
+        assert np.array_equal(r["weight"], results[0]["weight"])
+
+    # All the processes get the same number of batches
+    assert len(set([r["batches"] for r in results])) == 1
+    assert all([r["batches"][0] == r["batches"][1] for r in results])
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_distributed()
+    print("Distributed : OK")
@@ -0,0 +1,88 @@
+"""
+Test the batched fetch of the instances (Dataset.get_batch) against the instances fetched one by one (Dataset.__getitem__),
+without transforms and with transforms applied to whole batches (batched implementations) or item by item
+"""
+import numpy as np
+
+from deeplodocus.data.transform.transform_manager import TransformManager
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+from synthetic import stack
+
+
+def setup_module():
+    setup_directory()
+
+
+def transform(name, **kwargs):
+    return {name: {"name": name, "module": None, "kwargs": kwargs}}
+
+
+def make_transform_manager(method):
+    # Batched deterministic transforms, batched random transforms and transforms applied item by item
+    inputs = {
+        "method": method,
+        "name": "images",
+        "mandatory_transforms_start": [transform("resize", shape=[12, 12])],
+        "transforms": [transform("random_flip", horizontal=0.5, vertical=0.5),
+                       transform("random_channel_shift", shift=20),
+                       transform("random_blur", kernel_size_min=1, kernel_size_max=5)],
+        "mandatory_transforms_end": [transform("normalize_image", mean=None, standard_deviation=None),
+                                     transform("scale", multiply=2)]
+    }
+    if method == "someof":
+        inputs["num_transformations_min"] = 1
+    labels = {
+        "method": "sequential",
+        "name": "labels",
+        "mandatory_transforms_start": [transform("one_hot_encode", num_classes=10)],
+        "transforms": None,
+        "mandatory_transforms_end": None
+    }
+    return TransformManager("transforms", inputs=[inputs], labels=[labels], additional_data=[None])
+
+
+def check_batch(dataset, indices, atol=0):
+    batch = dataset.get_batch(indices)
+    items = [dataset[i] for i in indices]
+    assert_equal(batch[:2], stack([item[:2] for item in items]), atol=atol)
+
+
+def test_get_batch():
+    images, labels = write_images(16)
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)])
+    check_batch(dataset, list(range(16)))
+    check_batch(dataset, [5, 3, 3, 0])
+
+
+def test_get_batch_transforms():
+    images, labels = write_images(16)
+    for method in ("sequential", "oneof", "someof"):
+        # The instances beyond the raw instances are augmented
+        dataset = make_dataset(
+            [source("File", path=images)],
+            [source("File", path=labels)],
+            input_options={"load_as": "image", "convert_to": "float32"},
+            num_instances=32,
+            transform_manager=make_transform_manager(method)
+        )
+        dataset.set_shard(seed=7)
+        check_batch(dataset, list(range(8)), atol=1e-5)
+        check_batch(dataset, list(range(16, 32)), atol=1e-5)
+        check_batch(dataset, [30, 2, 17, 17], atol=1e-5)
+
+        # The random transforms are seeded by instance : the batch does not change the augmentation
+        first = np.asarray(dataset.get_batch([20, 21])[0][0])
+        second = np.asarray(dataset.get_batch([21, 20])[0][0])
+        assert np.allclose(first[0, 0], second[0, 1]) and np.allclose(first[0, 1], second[0, 0])
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_get_batch()
+    test_get_batch_transforms()
+    print("Dataset.get_batch : OK")
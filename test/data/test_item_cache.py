@@ -0,0 +1,91 @@
+"""
+Test the cache of decoded items shared by the DataLoader workers (ItemCache) : eviction, versioning and use by an Entry
+"""
+import gc
+import os
+import time
+
+import cv2
+import numpy as np
+from torch.utils.data import DataLoader
+
+from deeplodocus.data.load.item_cache import ItemCache
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+
+
+def setup_module():
+    setup_directory()
+
+
+def test_eviction():
+    # Three slots of one page
+    cache = ItemCache(budget=3 * 4096, num_keys=10, slot_size=4000, name="eviction")
+    assert cache.num_slots == 3
+    for key in range(10):
+        assert cache.put(key, np.full(10, key, np.int32))
+        # The item read again gets a second chance and is never evicted
+        assert cache.get(0) is not None
+    resident = [key for key in range(10) if cache.keys[key] >= 0]
+    assert len(resident) == 3 and 0 in resident and 9 in resident, resident
+    assert np.array_equal(cache.get(9), np.full(10, 9, np.int32))
+
+    # Only numpy arrays fitting in a slot are cached
+    assert not cache.put(1, np.zeros(2000, np.float32))
+    assert not cache.put(1, ["not", "an", "array"])
+
+    # The file of the cache is removed with the cache
+    path = cache.path
+    del cache
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_versioning():
+    cache = ItemCache(budget=4 * 4096, num_keys=4, slot_size=4096, name="versioning")
+    item = np.arange(12, dtype=np.float64).reshape(3, 4)
+    cache.put(2, item, version=1)
+    cached = cache.get(2, version=1)
+    assert_equal(cached, item)
+
+    # A copy is returned, the cached item is not modified
+    cached[:] = -1
+    assert_equal(cache.get(2, version=1), item)
+
+    # The item is dropped when its Source changed
+    assert cache.get(2, version=2) is None
+    assert cache.keys[2] == -1 and cache.get(2, version=1) is None
+
+
+def test_entry_cache():
+    images, labels = write_images(12)
+    reference = make_dataset([source("File", path=images)], [source("File", path=labels)])
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)],
+                           input_options={"decoded_cache_size": 1})
+    cache = dataset.entries[0].item_cache
+    assert cache is not None
+
+    # The items decoded by the workers are cached in the file shared by all the processes
+    batches = list(DataLoader(dataset, batch_size=4, num_workers=2))
+    assert int((cache.keys >= 0).sum()) == 12
+    assert_equal(batches, list(DataLoader(reference, batch_size=4)))
+    assert_equal(dataset[5][:2], reference[5][:2])
+
+    # A modified image is decoded again
+    time.sleep(0.01)
+    with open(images) as f:
+        path = f.read().splitlines()[3]
+    cv2.imwrite(path, np.full((16, 24, 3), 7, np.uint8))
+    assert (np.asarray(dataset[3][0][0]) == 7).all()
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_eviction()
+    test_versioning()
+    test_entry_cache()
+    print("ItemCache : OK")
@@ -0,0 +1,83 @@
+"""
+Test the LineIndex of the text files : lines read through the index and round-trip of the sidecar file
+"""
+import os
+import time
+import pickle
+
+import numpy as np
+
+from deeplodocus.utils.file import LineIndex
+from deeplodocus.utils.file import compute_num_lines
+from deeplodocus.utils.file import get_specific_line
+from deeplodocus.flags.ext import DEEP_EXT_LINE_INDEX
+
+from synthetic import setup_directory
+
+
+CONTENTS = ["a\nb\n\nc", "a\r\nb\r\n", "", "x", "\n\n", "é,1\nß,2\n", "".join(["line %i\n" % i for i in range(1000)])]
+
+
+def setup_module():
+    setup_directory()
+
+
+def read_lines(filename):
+    with open(filename, newline="") as f:
+        return [line.rstrip() for line in f.read().splitlines(True)]
+
+
+def test_lines():
+    for content in CONTENTS:
+        with open("lines.txt", "w", newline="") as f:
+            f.write(content)
+        line_index = LineIndex("lines.txt")
+        lines = read_lines("lines.txt")
+        assert len(line_index) == len(lines), (content, len(line_index), len(lines))
+        assert [line_index[i] for i in range(len(line_index))] == lines, content
+        indices = list(range(len(lines)))[::-1] * 2
+        assert line_index.get_lines(indices) == [lines[i] for i in indices]
+        if lines:
+            assert compute_num_lines("lines.txt") == len(lines)
+            assert get_specific_line("lines.txt", len(lines) - 1) == lines[-1]
+
+
+def test_sidecar_round_trip():
+    with open("lines.txt", "w") as f:
+        f.write("".join(["/data/image_%05d.png\n" % i for i in range(5000)]))
+    sidecar = "lines.txt" + DEEP_EXT_LINE_INDEX
+
+    # The sidecar file is written when the index is built, then loaded as it is
+    built = LineIndex("lines.txt")
+    assert os.path.isfile(sidecar)
+    mtime = os.stat(sidecar).st_mtime_ns
+    loaded = LineIndex("lines.txt")
+    assert os.stat(sidecar).st_mtime_ns == mtime
+    assert np.array_equal(np.asarray(built.offsets), np.asarray(loaded.offsets))
+    assert loaded[4321] == "/data/image_04321.png" and loaded.is_up_to_date()
+
+    # The index is rebuilt when the file changes
+    time.sleep(0.01)
+    with open("lines.txt", "a") as f:
+        f.write("/data/new.png\n")
+    assert not loaded.is_up_to_date()
+    rebuilt = LineIndex("lines.txt")
+    assert len(rebuilt) == 5001 and rebuilt[5000] == "/data/new.png"
+
+    # A corrupted sidecar file is ignored and rewritten
+    with open(sidecar, "wb") as f:
+        f.write(b"not an index")
+    repaired = LineIndex("lines.txt")
+    assert len(repaired) == 5001 and repaired[0] == "/data/image_00000.png"
+    assert LineIndex("lines.txt")[5000] == "/data/new.png"
+
+    # The index can be sent to another process (e.g. a DataLoader worker)
+    copy = pickle.loads(pickle.dumps(repaired))
+    assert copy[17] == "/data/image_00017.png"
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_lines()
+    test_sidecar_round_trip()
+    print("LineIndex : OK")
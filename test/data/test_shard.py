@@ -0,0 +1,44 @@
+"""
+Test the compilation of a dataset into shards (Dataset.compile) and the reading of the shards (Shard source)
+"""
+import pickle
+
+from deeplodocus.data.load.shard import Shard
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+
+
+def setup_module():
+    setup_directory()
+
+
+def test_compile():
+    images, labels = write_images(12)
+    dataset = make_dataset([source("File", path=images)], [source("File", path=labels)])
+    reference = [dataset[i] for i in range(len(dataset))]
+
+    # Decoded items (the Loader is skipped) and raw content of the files (decoded when the shards are read)
+    for decoded in (True, False):
+        directory = "shards_%s" % ("decoded" if decoded else "raw")
+        sources = dataset.compile(directory, decoded=decoded, shard_size=0)
+        compiled = make_dataset(sources[0], sources[1])
+        assert len(compiled) == len(dataset)
+        for i in range(len(dataset)):
+            assert_equal(compiled[i][:2], reference[i][:2])
+        image_shard = compiled.entries[0].sources[0]
+        assert isinstance(image_shard, Shard)
+        assert image_shard[0][1] is decoded
+
+        # The shards are memory-mapped again in another process (e.g. a DataLoader worker)
+        copy = pickle.loads(pickle.dumps(image_shard))
+        assert bytes(copy[3][0]) == bytes(image_shard[3][0])
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_compile()
+    print("Shard : OK")
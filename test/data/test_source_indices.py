@@ -0,0 +1,55 @@
+"""
+Test the computation of the Source of each instance of an Entry (Entry.compute_source_indices)
+against the linear scan of the Source instances it replaces
+"""
+import numpy as np
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+
+
+def setup_module():
+    setup_directory()
+
+
+def linear_scan(entry, index):
+    # Previous computation : scan the Source instances until the index is reached
+    temp_index = 0
+    prev_temp_index = 0
+    for i, s in enumerate(entry.sources):
+        temp_index += s.get_num_instances()
+        if index < temp_index:
+            return i, index - prev_temp_index
+        prev_temp_index = temp_index
+
+
+def test_source_indices():
+    images, labels = write_images(9)
+
+    # Sources of different lengths, including a Source of a single instance (the same in both Entry instances)
+    image_sources = [source("File", path=images, num_instances=n) for n in (2, 1, 6, 9)]
+    label_sources = [source("File", path=labels, num_instances=n) for n in (2, 1, 6, 9)]
+    dataset = make_dataset(image_sources, label_sources)
+    assert len(dataset) == 18
+
+    for entry in dataset.entries:
+        indices = np.arange(len(dataset))
+        expected = np.array([linear_scan(entry, i) for i in indices])
+        for order in (indices, indices[::-1], np.random.RandomState(0).permutation(indices)):
+            source_indices, instance_indices = entry.compute_source_indices(order)
+            assert np.array_equal(source_indices, expected[order, 0])
+            assert np.array_equal(instance_indices, expected[order, 1])
+
+    # The items are read from the right Source
+    with open(labels) as f:
+        lines = [int(line) for line in f]
+    expected_labels = lines[:2] + lines[:1] + lines[:6] + lines[:9]
+    assert [int(dataset[i][1][0]) for i in range(len(dataset))] == expected_labels
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_source_indices()
+    print("Source indices : OK")
@@ -0,0 +1,73 @@
+"""
+Test the reading of the rows of a SQLite database (SQLite source) against the original files
+"""
+import os
+import sqlite3
+
+import numpy as np
+from torch.utils.data import DataLoader
+
+from synthetic import setup_directory
+from synthetic import write_images
+from synthetic import source
+from synthetic import make_dataset
+from synthetic import assert_equal
+
+
+def setup_module():
+    setup_directory()
+
+
+def write_database(images, labels):
+    # A table of samples with a gap in the row IDs, and a table giving the order of the rows
+    with open(images) as f:
+        paths = f.read().splitlines()
+    with open(labels) as f:
+        classes = [int(line) for line in f]
+    connection = sqlite3.connect("samples.sqlite")
+    connection.execute("CREATE TABLE samples (image BLOB, label INTEGER)")
+    connection.execute("CREATE TABLE shuffled (idx INTEGER PRIMARY KEY, row INTEGER)")
+    for path, label in zip(paths, classes):
+        with open(path, "rb") as f:
+            connection.execute("INSERT INTO samples VALUES (?, ?)", (f.read(), label))
+    connection.execute("DELETE FROM samples WHERE rowid = 5")
+    rows = [row[0] for row in connection.execute("SELECT rowid FROM samples")]
+    order = np.random.RandomState(0).permutation(rows).tolist()
+    connection.executemany("INSERT INTO shuffled VALUES (?, ?)", list(enumerate(order)))
+    connection.commit()
+    connection.close()
+    return os.path.abspath("samples.sqlite"), order
+
+
+def test_sqlite():
+    images, labels = write_images(12)
+    path, order = write_database(images, labels)
+    reference = make_dataset([source("File", path=images)], [source("File", path=labels)])
+
+    def sources(column, index_table=None):
+        return [source("SQLite", path=path, table="samples", column=column, index_table=index_table)]
+
+    # Rows in the order of their IDs (the row 5 is missing)
+    dataset = make_dataset(sources("image"), sources("label"))
+    kept = [i for i in range(12) if i != 4]
+    assert len(dataset) == 11
+    for j, i in enumerate(kept):
+        assert_equal(dataset[j][:2], reference[i][:2])
+
+    # Rows in the order of an index table
+    shuffled = make_dataset(sources("image", "shuffled"), sources("label", "shuffled"))
+    for j in range(len(shuffled)):
+        assert_equal(shuffled[j][:2], reference[order[j] - 1][:2])
+    label_source = shuffled.entries[1].sources[0]
+    indices = [3, 1, 3, 0]
+    assert [item[0] for item in label_source.get_batch(indices)] == [label_source[i][0] for i in indices]
+
+    # Each worker opens its own connection
+    batches = list(DataLoader(shuffled, batch_size=4, num_workers=2))
+    assert sum([len(batch[1][0]) for batch in batches]) == 11
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_sqlite()
+    print("SQLite : OK")